@@ -1,12 +1,20 @@
 from flask import Flask
 from .config import Config
 from .extensions import db, jwt, cors
+from .utils.helpers import UPLOAD_FOLDERS
+from .utils.json_provider import UTF8JSONProvider
 import os
 
 
 def create_app(config_class=Config):
     app = Flask(__name__, instance_relative_config=True)
     app.config.from_object(config_class)
+    app.json = UTF8JSONProvider(app)
+
+    # Logging first, so everything after it (and each request's other
+    # hooks) runs with it in place
+    from .middleware.request_logging import register_logging
+    register_logging(app)
 
     # Ensure instance folder exists
     try:
@@ -16,16 +24,23 @@ def create_app(config_class=Config):
 
     # Ensure upload folders exist
     upload_base = app.config.get('UPLOAD_FOLDER', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'uploads'))
-    for folder in ['screenshots', 'investigations', 'payment_proofs']:
+    for folder in UPLOAD_FOLDERS:
         os.makedirs(os.path.join(upload_base, folder), exist_ok=True)
 
-    # Initialize extensions
+    # Initialize extensions (the archive bind and engine options must be
+    # configured first)
+    from .services import archive_service, write_coordinator
+    from .utils import engine_profiles
+    archive_service.init_app(app)
+    engine_profiles.init_app(app)
     db.init_app(app)
+    engine_profiles.register_connect_hooks(app, db)
+    write_coordinator.init_app(app)
     jwt.init_app(app)
     cors.init_app(app, resources={r"/api/*": {"origins": "*"}})
 
     # Register blueprints
-    from .routes import auth, users, cases, research, approvals, finance, images, notifications, dashboard
+    from .routes import auth, users, cases, research, approvals, finance, images, notifications, dashboard, audit, admin
 
     app.register_blueprint(auth.bp)
     app.register_blueprint(users.bp)
@@ -36,14 +51,40 @@ def create_app(config_class=Config):
     app.register_blueprint(images.bp)
     app.register_blueprint(notifications.bp)
     app.register_blueprint(dashboard.bp)
+    app.register_blueprint(audit.bp)
+    app.register_blueprint(admin.bp)
 
     # Register error handlers
     from .middleware.error_handlers import register_error_handlers
     register_error_handlers(app)
 
-    # Create database tables
+    from .middleware.compression import register_compression
+    register_compression(app)
+
+    from .middleware.query_instrumentation import register_query_instrumentation
+    register_query_instrumentation(app, db)
+
+    from .middleware.metrics import register_metrics
+    register_metrics(app, db)
+
+    from .middleware.profiler import register_profiler
+    register_profiler(app, db)
+
+    from .middleware.memory import register_memory_monitor
+    register_memory_monitor(app)
+
+    # Register CLI commands
+    from .commands import register_commands
+    register_commands(app)
+
+    # Create database tables (the archive is created when first used, but
+    # an existing one is migrated now, before anything reads from it)
     with app.app_context():
-        db.create_all()
+        db.create_all(bind_key=None)
+        from .utils.schema import ensure_schema
+        ensure_schema(db)
+        if archive_service.is_available():
+            archive_service.ensure_schema()
         # Create default accounts if not exists
         from .models.user import User
         from .utils.constants import UserRole
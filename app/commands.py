@@ -0,0 +1,129 @@
+import click
+from flask.cli import AppGroup
+from .utils.helpers import UPLOAD_FOLDERS
+
+
+images_cli = AppGroup('images', help='Case image maintenance.')
+
+
+@images_cli.command('backfill-metadata')
+@click.option('--batch-size', default=500, show_default=True, help='Rows per transaction.')
+def backfill_image_metadata(batch_size):
+    """Capture size, type, dimensions and digest for older uploads"""
+    from .services import image_service
+
+    result = image_service.backfill_metadata(batch_size=batch_size)
+    click.echo(f"Updated {result['updated']} image(s), {result['missing']} file(s) missing")
+
+
+uploads_cli = AppGroup('uploads', help='Upload storage maintenance.')
+
+
+@uploads_cli.command('gc')
+@click.option('--folder', 'folders', multiple=True, type=click.Choice(UPLOAD_FOLDERS),
+              help='Only collect this folder (repeatable). Defaults to all.')
+@click.option('--grace-minutes', default=60, show_default=True,
+              help='Leave files younger than this alone (in-flight uploads).')
+@click.option('--batch-size', default=500, show_default=True, help='Files removed per batch.')
+@click.option('--delete', 'delete', is_flag=True, help='Delete orphans instead of quarantining them.')
+@click.option('--dry-run', is_flag=True, help='Only report what would be reclaimed.')
+def collect_uploads(folders, grace_minutes, batch_size, delete, dry_run):
+    """Remove upload files that no case, image or payment references"""
+    from .services import upload_gc_service
+
+    total = 0
+    for folder in folders or UPLOAD_FOLDERS:
+        result = upload_gc_service.collect_folder(
+            folder,
+            grace_seconds=grace_minutes * 60,
+            batch_size=batch_size,
+            quarantine=not delete,
+            dry_run=dry_run
+        )
+        total += result['reclaimed_bytes']
+        click.echo(f"{folder}: {result['orphans']} orphan(s), {result['reclaimed_bytes']} bytes")
+
+    verb = 'Would reclaim' if dry_run else 'Reclaimed'
+    click.echo(f'{verb} {total} bytes')
+
+
+audit_cli = AppGroup('audit', help='Audit log maintenance.')
+
+
+@audit_cli.command('backfill-actors')
+@click.option('--batch-size', default=1000, show_default=True, help='Rows per transaction.')
+def backfill_audit_actors(batch_size):
+    """Snapshot actor name and role on audit rows written before snapshots existed"""
+    from .services import audit_service
+
+    updated = audit_service.backfill_actors(batch_size=batch_size)
+    click.echo(f'Updated {updated} audit log(s)')
+
+
+archive_cli = AppGroup('archive', help='Cold archive for closed cases.')
+
+
+@archive_cli.command('run')
+@click.option('--months', type=int, default=None,
+              help='Archive cases closed before this many months ago. Defaults to ARCHIVE_AFTER_MONTHS.')
+@click.option('--batch-size', default=200, show_default=True, help='Cases per transaction.')
+@click.option('--limit', type=int, default=None, help='Stop after this many cases.')
+def archive_cases(months, batch_size, limit):
+    """Move old closed cases and their rows to the archive database"""
+    from .services import archive_service
+
+    archived = archive_service.archive_closed_cases(months=months, batch_size=batch_size, limit=limit)
+    click.echo(f'Archived {archived} case(s)')
+
+
+@archive_cli.command('restore')
+@click.argument('case_numbers', nargs=-1, required=True)
+def restore_cases(case_numbers):
+    """Move archived cases back into the live database"""
+    from .services import archive_service
+
+    for case_number in case_numbers:
+        try:
+            restored = archive_service.restore_case(case_number)
+        except ValueError as e:
+            click.echo(f'{case_number}: {e}', err=True)
+            continue
+
+        if restored:
+            click.echo(f'Restored {case_number}')
+        else:
+            click.echo(f'{case_number} not found in archive', err=True)
+
+
+notifications_cli = AppGroup('notifications', help='Notification inbox maintenance.')
+
+
+@notifications_cli.command('prune')
+@click.option('--days', type=int, default=None,
+              help='Remove read notifications older than this. Defaults to NOTIFICATION_RETENTION_DAYS.')
+@click.option('--batch-size', default=1000, show_default=True, help='Rows per transaction.')
+@click.option('--archive', is_flag=True, help='Copy them to the archive database before deleting.')
+def prune_notifications(days, batch_size, archive):
+    """Apply the retention policy to read notifications"""
+    from .services import notification_service
+
+    removed = notification_service.prune_read_notifications(days=days, batch_size=batch_size, archive=archive)
+    click.echo(f'Removed {removed} notification(s)')
+
+
+@notifications_cli.command('backfill-case-numbers')
+def backfill_notification_case_numbers():
+    """Copy case numbers onto notifications created before they were stored"""
+    from .services import notification_service
+
+    updated = notification_service.backfill_case_numbers()
+    click.echo(f'Updated {updated} notification(s)')
+
+
+def register_commands(app):
+    """Register CLI commands for the application"""
+    app.cli.add_command(images_cli)
+    app.cli.add_command(uploads_cli)
+    app.cli.add_command(audit_cli)
+    app.cli.add_command(archive_cli)
+    app.cli.add_command(notifications_cli)
@@ -1,4 +1,5 @@
 import os
+import json
 from datetime import timedelta
 from dotenv import load_dotenv
 
@@ -13,6 +14,84 @@ class Config:
     # Database - use absolute path for PythonAnywhere compatibility
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', f'sqlite:///{os.path.join(BASE_DIR, "charity.db")}')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        # Keep Arabic text in JSON columns readable (and smaller) in the database
+        'json_serializer': lambda obj: json.dumps(obj, ensure_ascii=False)
+    }
+
+    # Engine profile: auto, sqlite, server or none (see app/utils/engine_profiles.py)
+    DATABASE_PROFILE = os.getenv('DATABASE_PROFILE', 'auto')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 268435456))  # 256MB
+    SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', 65536))  # 64MB
+    DATABASE_POOL_SIZE = int(os.getenv('DATABASE_POOL_SIZE', 10))
+    DATABASE_MAX_OVERFLOW = int(os.getenv('DATABASE_MAX_OVERFLOW', 20))
+    DATABASE_POOL_TIMEOUT = int(os.getenv('DATABASE_POOL_TIMEOUT', 30))  # seconds
+    DATABASE_POOL_RECYCLE = int(os.getenv('DATABASE_POOL_RECYCLE', 1800))  # seconds
+    DATABASE_STATEMENT_TIMEOUT_MS = int(os.getenv('DATABASE_STATEMENT_TIMEOUT_MS', 30000))
+
+    # Group commit for small independent writes (notification reads, FCM
+    # tokens); see app/services/write_coordinator.py
+    WRITE_COORDINATOR_ENABLED = os.getenv('WRITE_COORDINATOR_ENABLED', 'false').lower() == 'true'
+    # Extra wait for more writes once a group has its first; at 0 a group is
+    # what queued up while the previous one was committing
+    WRITE_COORDINATOR_MAX_DELAY_MS = float(os.getenv('WRITE_COORDINATOR_MAX_DELAY_MS', 0))
+    WRITE_COORDINATOR_MAX_BATCH = int(os.getenv('WRITE_COORDINATOR_MAX_BATCH', 200))
+    WRITE_COORDINATOR_WAIT_TIMEOUT = float(os.getenv('WRITE_COORDINATOR_WAIT_TIMEOUT', 10))  # seconds
+
+    # Cold archive for closed cases (a separate SQLite file)
+    ARCHIVE_DATABASE_URI = os.getenv('ARCHIVE_DATABASE_URL', f'sqlite:///{os.path.join(BASE_DIR, "charity_archive.db")}')
+    ARCHIVE_AFTER_MONTHS = int(os.getenv('ARCHIVE_AFTER_MONTHS', 12))
+
+    # Read notifications older than this are pruned by `flask notifications prune`
+    NOTIFICATION_RETENTION_DAYS = int(os.getenv('NOTIFICATION_RETENTION_DAYS', 90))
+
+    # Response compression (brotli is used when installed and accepted)
+    COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'true').lower() == 'true'
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))  # bytes
+    COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', 6))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 4))
+    COMPRESSION_BROTLI_ENABLED = os.getenv('COMPRESSION_BROTLI_ENABLED', 'true').lower() == 'true'
+
+    # Per-request SQL instrumentation (Server-Timing header and a JSON log
+    # line); sample a share of requests in production
+    QUERY_INSTRUMENTATION_ENABLED = os.getenv('QUERY_INSTRUMENTATION_ENABLED', 'false').lower() == 'true'
+    QUERY_INSTRUMENTATION_SAMPLE_RATE = float(os.getenv('QUERY_INSTRUMENTATION_SAMPLE_RATE', 1.0))
+    SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 100))
+    N_PLUS_ONE_THRESHOLD = int(os.getenv('N_PLUS_ONE_THRESHOLD', 5))  # same statement shape per request
+
+    # Prometheus metrics at /metrics (needs prometheus_client); set a token
+    # to require "Authorization: Bearer <token>" from the scraper
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'false').lower() == 'true'
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+    # Sampling profiler: requests sent with an owner's X-Profile-Token (from
+    # POST /api/admin/profile-token), plus a random share, are written as
+    # collapsed stacks to PROFILER_DIR
+    PROFILER_ENABLED = os.getenv('PROFILER_ENABLED', 'false').lower() == 'true'
+    PROFILER_SAMPLE_RATE = float(os.getenv('PROFILER_SAMPLE_RATE', 0))
+    PROFILER_INTERVAL_MS = float(os.getenv('PROFILER_INTERVAL_MS', 5))
+    PROFILER_DIR = os.getenv('PROFILER_DIR', os.path.join(BASE_DIR, 'profiles'))
+    PROFILER_MAX_FILES = int(os.getenv('PROFILER_MAX_FILES', 200))
+    PROFILER_TOKEN_MAX_AGE = int(os.getenv('PROFILER_TOKEN_MAX_AGE', 3600))  # seconds
+
+    # tracemalloc peaks per endpoint and snapshot diffs under
+    # /api/admin/memory (slows allocations; enable while hunting a leak)
+    MEMORY_MONITOR_ENABLED = os.getenv('MEMORY_MONITOR_ENABLED', 'false').lower() == 'true'
+    MEMORY_TRACE_FRAMES = int(os.getenv('MEMORY_TRACE_FRAMES', 1))
+    MEMORY_TOP_SITES = int(os.getenv('MEMORY_TOP_SITES', 10))
+    # gunicorn recycles a worker above this resident size once its current
+    # requests finish; 0 disables
+    MEMORY_MAX_RSS_MB = int(os.getenv('MEMORY_MAX_RSS_MB', 0))
+
+    # Logging (see app/middleware/request_logging.py): json or text lines on
+    # stdout, written by a background thread. LOG_SAMPLE_RATES keeps a share
+    # of a logger's records below WARNING: "logger=rate,..."
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))  # records; more are dropped
+    LOG_SAMPLE_RATES = os.getenv('LOG_SAMPLE_RATES', 'app.services.fcm_service.sent=0.1')
+    LOG_REQUESTS = os.getenv('LOG_REQUESTS', 'true').lower() == 'true'
 
     # JWT
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'jwt-secret-key')
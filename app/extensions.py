@@ -2,6 +2,8 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 
-db = SQLAlchemy()
+# Requests commit once and then serialize what they wrote, so committed
+# objects keep their loaded state instead of being re-read
+db = SQLAlchemy(session_options={'expire_on_commit': False})
 jwt = JWTManager()
 cors = CORS()
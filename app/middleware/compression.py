@@ -0,0 +1,122 @@
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+
+# Text formats worth compressing; images, PDFs, ZIP and XLSX are already
+# compressed and are left alone
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'application/xml',
+    'text/csv',
+    'text/html',
+    'text/plain',
+    'text/xml',
+}
+
+
+class _GzipStream:
+    def __init__(self, level):
+        # wbits 31 = gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+def choose_encoding(accept_encodings, brotli_enabled=True):
+    """Pick 'br' or 'gzip' from an Accept-Encoding header, or None"""
+    if brotli_enabled and brotli is not None and accept_encodings['br']:
+        return 'br'
+    if accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+
+def _new_stream(encoding, config):
+    if encoding == 'br':
+        return _BrotliStream(config['COMPRESSION_BROTLI_QUALITY'])
+    return _GzipStream(config['COMPRESSION_GZIP_LEVEL'])
+
+
+def _compress_iter(chunks, stream):
+    """Compress a response iterable chunk by chunk, without buffering it"""
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = stream.compress(chunk)
+            if data:
+                yield data
+        yield stream.finish()
+    finally:
+        # Let the wrapped generator run its cleanup (stream_with_context)
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+def _should_compress(response):
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    if response.direct_passthrough or 'Content-Encoding' in response.headers:
+        return False
+    return response.mimetype in COMPRESSIBLE_MIMETYPES
+
+
+def register_compression(app):
+    """Compress text responses with brotli or gzip per Accept-Encoding"""
+
+    @app.after_request
+    def compress_response(response):
+        config = app.config
+        if not config['COMPRESSION_ENABLED'] or request.method == 'HEAD':
+            return response
+        if not _should_compress(response):
+            return response
+
+        response.vary.add('Accept-Encoding')
+
+        encoding = choose_encoding(request.accept_encodings, config['COMPRESSION_BROTLI_ENABLED'])
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            # Exports and other generators: compress as chunks are produced
+            response.response = _compress_iter(response.response, _new_stream(encoding, config))
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < config['COMPRESSION_MIN_SIZE']:
+                return response
+            stream = _new_stream(encoding, config)
+            response.set_data(stream.compress(data) + stream.finish())
+
+        response.headers['Content-Encoding'] = encoding
+
+        # The compressed body is a different representation of the same
+        # resource, so a strong validator no longer matches byte for byte
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+
+        return response
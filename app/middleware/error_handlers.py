@@ -1,4 +1,10 @@
+import logging
 from flask import jsonify
+from sqlalchemy.orm.exc import StaleDataError
+from werkzeug.exceptions import HTTPException
+from ..extensions import db
+
+logger = logging.getLogger(__name__)
 
 
 def register_error_handlers(app):
@@ -20,6 +26,12 @@ def register_error_handlers(app):
     def not_found(error):
         return jsonify({'error': 'Not found', 'message': 'Resource not found'}), 404
 
+    @app.errorhandler(StaleDataError)
+    def conflict(error):
+        # Optimistic version check failed: another request changed the case
+        db.session.rollback()
+        return jsonify({'error': 'Conflict', 'message': 'The case was changed by another request, reload and retry'}), 409
+
     @app.errorhandler(413)
     def request_entity_too_large(error):
         return jsonify({'error': 'File too large', 'message': 'Maximum file size is 1MB'}), 413
@@ -30,5 +42,10 @@ def register_error_handlers(app):
 
     @app.errorhandler(Exception)
     def handle_exception(error):
-        # Log the error here if needed
+        # 405, 415 and other HTTP errors without a handler keep their status
+        # and headers (e.g. Allow), answered in JSON like the rest of the API
+        if isinstance(error, HTTPException):
+            headers = [(name, value) for name, value in error.get_headers() if name.lower() != 'content-type']
+            return jsonify({'error': error.name, 'message': error.description}), error.code, headers
+        logger.exception('Unhandled error')
         return jsonify({'error': 'Error', 'message': str(error)}), 500
@@ -0,0 +1,159 @@
+import os
+import threading
+import tracemalloc
+from flask import g, request
+from .profiler import short_path
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+# Allocations made by tracemalloc itself and the import system are noise
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+def rss_bytes():
+    """Resident memory of this process (the peak where /proc is missing)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if os.uname().sysname == 'Darwin' else peak * 1024
+
+
+def over_budget(app):
+    """True when MEMORY_MAX_RSS_MB is set and this process is above it"""
+    budget = app.config.get('MEMORY_MAX_RSS_MB')
+    if not budget:
+        return False
+    rss = rss_bytes()
+    return rss is not None and rss > budget * 1024 * 1024
+
+
+def _site(frame):
+    return f'{short_path(frame.filename)}:{frame.lineno}'
+
+
+def take_snapshot():
+    return tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+
+def top_sites(snapshot, limit):
+    """The source lines holding the most traced memory"""
+    return [
+        {'site': _site(stat.traceback[0]), 'size': stat.size, 'count': stat.count}
+        for stat in snapshot.statistics('lineno')[:limit]
+    ]
+
+
+def diff_sites(snapshot, previous, limit):
+    """The source lines whose traced memory grew the most since `previous`"""
+    return [
+        {'site': _site(stat.traceback[0]), 'size': stat.size, 'size_diff': stat.size_diff,
+         'count': stat.count, 'count_diff': stat.count_diff}
+        for stat in snapshot.compare_to(previous, 'lineno')[:limit]
+    ]
+
+
+class MemoryMonitor:
+    """Peak traced allocation per endpoint, with the top allocation sites
+    seen when an endpoint set its peak
+
+    tracemalloc has one peak per process, so under threaded workers a
+    request's peak can include allocations of requests running beside
+    it; with sync workers it is exact.
+    """
+
+    def __init__(self, top_limit):
+        self.top_limit = top_limit
+        self._lock = threading.Lock()
+        self._active = 0
+        self.endpoints = {}
+        self.last_snapshot = None
+
+    def request_started(self):
+        with self._lock:
+            # Only restart the peak when no other request is measuring it
+            if self._active == 0:
+                tracemalloc.reset_peak()
+            self._active += 1
+        return tracemalloc.get_traced_memory()[0]
+
+    def request_finished(self, endpoint, start_bytes):
+        peak = max(tracemalloc.get_traced_memory()[1] - start_bytes, 0)
+        with self._lock:
+            self._active -= 1
+            stats = self.endpoints.setdefault(endpoint, {'requests': 0, 'total_peak': 0, 'max_peak': 0, 'top_sites': []})
+            stats['requests'] += 1
+            stats['total_peak'] += peak
+            new_max = peak > stats['max_peak']
+            if new_max:
+                stats['max_peak'] = peak
+
+        # The request's loaded objects are still in its session here
+        if new_max:
+            sites = top_sites(take_snapshot(), self.top_limit)
+            with self._lock:
+                stats['top_sites'] = sites
+
+    def report(self):
+        with self._lock:
+            endpoints = [
+                {
+                    'endpoint': endpoint,
+                    'requests': stats['requests'],
+                    'max_peak_bytes': stats['max_peak'],
+                    'avg_peak_bytes': stats['total_peak'] // stats['requests'],
+                    'top_sites': stats['top_sites'],
+                }
+                for endpoint, stats in self.endpoints.items()
+            ]
+        endpoints.sort(key=lambda item: -item['max_peak_bytes'])
+        return endpoints
+
+    def snapshot_diff(self, limit):
+        """Snapshot now and diff against the previous snapshot of this process"""
+        snapshot = take_snapshot()
+        with self._lock:
+            previous, self.last_snapshot = self.last_snapshot, snapshot
+        if previous is None:
+            return None, top_sites(snapshot, limit)
+        return diff_sites(snapshot, previous, limit), top_sites(snapshot, limit)
+
+
+def register_memory_monitor(app):
+    """Trace allocations and record each endpoint's peak
+
+    Enabled with MEMORY_MONITOR_ENABLED; tracing slows every allocation,
+    so turn it on while hunting a leak. Owners read the results and diff
+    snapshots under /api/admin/memory. The worker memory budget
+    (MEMORY_MAX_RSS_MB) is enforced by gunicorn.conf.py, monitor or not.
+    """
+    app.extensions['memory_monitor'] = None
+    if not app.config.get('MEMORY_MONITOR_ENABLED'):
+        return
+
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(app.config['MEMORY_TRACE_FRAMES'])
+    monitor = MemoryMonitor(app.config['MEMORY_TOP_SITES'])
+    app.extensions['memory_monitor'] = monitor
+
+    @app.before_request
+    def start_memory_peak():
+        g.memory_start = monitor.request_started()
+
+    @app.teardown_request
+    def record_memory_peak(exc):
+        start = g.pop('memory_start', None)
+        if start is not None:
+            monitor.request_finished(request.endpoint or 'unmatched', start)
@@ -0,0 +1,162 @@
+import hmac
+import logging
+import os
+import time
+from flask import Response, abort, g, has_request_context, request
+from sqlalchemy import event
+
+try:
+    import prometheus_client
+    from prometheus_client import Counter, Gauge, Histogram, CollectorRegistry, multiprocess
+    from prometheus_client.core import GaugeMetricFamily
+except ImportError:  # pragma: no cover - prometheus_client is optional
+    prometheus_client = None
+
+logger = logging.getLogger(__name__)
+
+# Set by register_metrics; the observers below do nothing until then
+_enabled = False
+
+# Under gunicorn, PROMETHEUS_MULTIPROC_DIR (set by gunicorn.conf.py before
+# the app is imported) makes every worker write its samples to files
+# there, and /metrics adds them up across workers.
+
+if prometheus_client is not None:
+    HTTP_SECONDS = Histogram(
+        'charity_http_request_duration_seconds', 'API request latency',
+        ['blueprint', 'endpoint', 'method', 'status']
+    )
+    DB_SECONDS = Histogram(
+        'charity_db_request_duration_seconds', 'Database time per request', ['endpoint'],
+        buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+    )
+    DB_QUERIES = Counter('charity_db_queries_total', 'SQL statements executed by requests', ['endpoint'])
+    UPLOAD_BYTES = Counter('charity_upload_bytes_total', 'Bytes of uploaded files saved', ['image_type'])
+    UPLOAD_SECONDS = Histogram('charity_upload_duration_seconds', 'Time to save an uploaded file', ['image_type'])
+    PUSH_OUTBOX = Gauge(
+        'charity_push_outbox', 'Push notifications waiting for their commit or being sent',
+        multiprocess_mode='livesum'
+    )
+    FCM_SECONDS = Histogram('charity_fcm_send_duration_seconds', 'FCM send latency')
+    FCM_SENDS = Counter('charity_fcm_sends_total', 'FCM sends by result', ['result'])
+
+
+def observe_upload(image_type, size, seconds):
+    """Record a saved upload"""
+    if not _enabled:
+        return
+    UPLOAD_BYTES.labels(image_type.value).inc(size)
+    UPLOAD_SECONDS.labels(image_type.value).observe(seconds)
+
+
+def observe_fcm_send(result, seconds=None):
+    """Record an FCM send: 'success', 'failure' or 'skipped'"""
+    if not _enabled:
+        return
+    FCM_SENDS.labels(result).inc()
+    if seconds is not None:
+        FCM_SECONDS.observe(seconds)
+
+
+def push_outbox_changed(delta):
+    """Track pushes queued (positive) or sent/dropped (negative)"""
+    if _enabled and delta:
+        PUSH_OUTBOX.inc(delta)
+
+
+class CaseStatusCollector:
+    """Cases per status, counted in the database at scrape time"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def collect(self):
+        from ..models.case import Case
+
+        gauge = GaugeMetricFamily('charity_cases', 'Cases per status', labels=['status'])
+        rows = self.db.session.execute(
+            self.db.select(Case.status, self.db.func.count()).group_by(Case.status)
+        ).all()
+        for status, count in rows:
+            gauge.add_metric([status.value], count)
+        yield gauge
+
+
+class _ProcessCollector:
+    """The default registry's metrics, for a single-process server"""
+
+    def collect(self):
+        return prometheus_client.REGISTRY.collect()
+
+
+def _scrape_registry(db):
+    registry = CollectorRegistry()
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry.register(_ProcessCollector())
+    registry.register(CaseStatusCollector(db))
+    return registry
+
+
+def _register_db_hooks(engine):
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_metrics_timer(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and 'metrics_db' in g:
+            conn.info.setdefault('metrics_started', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def record_metrics_query(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and 'metrics_db' in g and conn.info.get('metrics_started'):
+            g.metrics_db[0] += 1
+            g.metrics_db[1] += time.perf_counter() - conn.info['metrics_started'].pop()
+
+
+def register_metrics(app, db):
+    """Record request, database, upload and push metrics and serve /metrics
+
+    Needs prometheus_client and METRICS_ENABLED. /metrics is open unless
+    METRICS_TOKEN is set, in which case scrapers send it as a bearer token.
+    """
+    if prometheus_client is None or not app.config.get('METRICS_ENABLED'):
+        return
+    if not app.config.get('METRICS_TOKEN') and not app.debug:
+        logger.warning('METRICS_TOKEN is not set; /metrics is open to anyone who can reach the app')
+
+    global _enabled
+    _enabled = True
+
+    with app.app_context():
+        for engine in db.engines.values():
+            _register_db_hooks(engine)
+
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_started = time.perf_counter()
+        g.metrics_db = [0, 0.0]
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.pop('metrics_started', None)
+        queries, db_seconds = g.pop('metrics_db', (0, 0.0))
+        if started is None or request.endpoint == 'metrics':
+            return response
+
+        # Unmatched URLs share one label so scanners cannot blow up cardinality
+        endpoint = request.endpoint or 'unmatched'
+        HTTP_SECONDS.labels(
+            request.blueprint or '', endpoint, request.method, str(response.status_code)
+        ).observe(time.perf_counter() - started)
+        DB_SECONDS.labels(endpoint).observe(db_seconds)
+        if queries:
+            DB_QUERIES.labels(endpoint).inc(queries)
+        return response
+
+    def metrics():
+        token = app.config.get('METRICS_TOKEN')
+        if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            abort(401)
+        registry = _scrape_registry(db)
+        return Response(prometheus_client.generate_latest(registry), content_type=prometheus_client.CONTENT_TYPE_LATEST)
+
+    app.add_url_rule('/metrics', 'metrics', metrics)
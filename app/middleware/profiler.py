@@ -0,0 +1,188 @@
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from functools import lru_cache
+from flask import current_app, g, has_request_context, request
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from sqlalchemy import event
+
+PROFILE_HEADER = 'X-Profile-Token'
+PROFILE_SUFFIX = '.folded'
+
+_TOKEN_SALT = 'request-profiler'
+_UNSAFE = re.compile(r'[^A-Za-z0-9_.-]+')
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class Sampler:
+    """Background thread that samples the stacks of profiled threads
+
+    One per process, started on first use (and again in a forked worker).
+    Only the threads of profiled requests are looked at, and the thread
+    sleeps on a condition while none is running, so requests that are
+    not profiled pay nothing.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = threading.Condition()
+        self._stacks = {}
+        self._thread = None
+        self._pid = None
+
+    def start(self, thread_id):
+        with self._lock:
+            self._stacks[thread_id] = Counter()
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+                self._thread.start()
+            self._lock.notify()
+
+    def stop(self, thread_id):
+        with self._lock:
+            return self._stacks.pop(thread_id, Counter())
+
+    def _run(self):
+        while True:
+            with self._lock:
+                self._lock.wait_for(lambda: self._stacks)
+            time.sleep(self.interval)
+            with self._lock:
+                frames = sys._current_frames()
+                for thread_id, stacks in self._stacks.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        stacks[_collapse(frame)] += 1
+                del frames
+
+
+def short_path(filename):
+    """A source path relative to the project, or to its sys.path entry
+    for libraries (sqlalchemy/orm/...)"""
+    if filename.startswith(_PROJECT_ROOT):
+        return os.path.relpath(filename, _PROJECT_ROOT)
+    for path in sorted(sys.path, key=len, reverse=True):
+        if path and filename.startswith(path + os.sep):
+            return filename[len(path) + 1:]
+    return filename
+
+
+@lru_cache(maxsize=8192)
+def _frame_label(code):
+    return f'{code.co_name} ({short_path(code.co_filename)}:{code.co_firstlineno})'
+
+
+def _collapse(frame):
+    """One stack in collapsed form: root first, frames joined by ';'"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+def _serializer(app):
+    return URLSafeTimedSerializer(app.config['SECRET_KEY'], salt=_TOKEN_SALT)
+
+
+def issue_token(user):
+    """A signed token that profiles requests sent with it in PROFILE_HEADER"""
+    return _serializer(current_app).dumps({'user_id': user.id})
+
+
+def _token_valid(app, token):
+    try:
+        _serializer(app).loads(token, max_age=app.config['PROFILER_TOKEN_MAX_AGE'])
+    except BadSignature:
+        return False
+    return True
+
+
+def profile_dir(app):
+    return app.config['PROFILER_DIR']
+
+
+def list_profiles(app):
+    """Saved profiles, newest first"""
+    directory = profile_dir(app)
+    if not os.path.isdir(directory):
+        return []
+    entries = [entry for entry in os.scandir(directory) if entry.name.endswith(PROFILE_SUFFIX)]
+    entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    return entries
+
+
+def _write_profile(app, stacks, endpoint, queries, seconds):
+    directory = profile_dir(app)
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')
+    name = f'{stamp}_{_UNSAFE.sub("-", endpoint)}_{queries}q_{seconds * 1000:.0f}ms_{os.getpid()}{PROFILE_SUFFIX}'
+    with open(os.path.join(directory, name), 'w', encoding='utf-8') as f:
+        for stack, count in stacks.most_common():
+            f.write(f'{stack} {count}\n')
+
+    # Keep the directory bounded: drop the oldest beyond PROFILER_MAX_FILES
+    for entry in list_profiles(app)[app.config['PROFILER_MAX_FILES']:]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+    return name
+
+
+def _register_db_hooks(engine):
+    @event.listens_for(engine, 'after_cursor_execute')
+    def count_profiled_query(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and 'profile_queries' in g:
+            g.profile_queries += 1
+
+
+def register_profiler(app, db):
+    """Sample the call stacks of chosen requests into flamegraph files
+
+    A request is profiled when it carries a token from
+    POST /api/admin/profile-token in the X-Profile-Token header, or at
+    random for a PROFILER_SAMPLE_RATE share of requests. Its stacks are
+    sampled every PROFILER_INTERVAL_MS and written in collapsed format
+    (flamegraph.pl, speedscope) to PROFILER_DIR, named after the
+    endpoint, query count and duration; only the newest
+    PROFILER_MAX_FILES are kept.
+    """
+    if not app.config.get('PROFILER_ENABLED'):
+        return
+
+    sampler = Sampler(app.config['PROFILER_INTERVAL_MS'] / 1000)
+
+    with app.app_context():
+        for engine in db.engines.values():
+            _register_db_hooks(engine)
+
+    @app.before_request
+    def start_profile():
+        token = request.headers.get(PROFILE_HEADER)
+        if token:
+            if not _token_valid(app, token):
+                return
+        elif random.random() >= app.config['PROFILER_SAMPLE_RATE']:
+            return
+        g.profile_started = time.perf_counter()
+        g.profile_queries = 0
+        sampler.start(threading.get_ident())
+
+    # Teardown runs after a streamed body is produced and after errors,
+    # so the whole request is covered
+    @app.teardown_request
+    def finish_profile(exc):
+        started = g.pop('profile_started', None)
+        if started is None:
+            return
+        stacks = sampler.stop(threading.get_ident())
+        queries = g.pop('profile_queries', 0)
+        if stacks:
+            _write_profile(app, stacks, request.endpoint or 'unmatched', queries, time.perf_counter() - started)
@@ -0,0 +1,179 @@
+import logging
+import random
+import re
+import time
+from contextlib import contextmanager
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Placeholder lists of expanded IN clauses and literal numbers vary
+# between otherwise identical statements
+_IN_LIST = re.compile(r'\((?:\s*\?\s*,)+\s*\?\s*\)|\((?:\s*%\(\w+\)s\s*,)+\s*%\(\w+\)s\s*\)')
+_NUMBER = re.compile(r'\b\d+\b')
+_SPACE = re.compile(r'\s+')
+
+EXPLAIN_PREFIX = {
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+    'postgresql': 'EXPLAIN ',
+    'mysql': 'EXPLAIN ',
+    'mariadb': 'EXPLAIN ',
+}
+
+
+class RequestQueryStats:
+    """Database work and timings of one sampled request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.shapes = {}
+        self.slow = []
+        self.timings = {'serialize': 0.0, 'push': 0.0}
+
+    def add_query(self, shape, seconds):
+        self.queries += 1
+        self.db_seconds += seconds
+        self.shapes[shape] = self.shapes.get(shape, 0) + 1
+
+    def repeated(self, threshold):
+        """Statement shapes run at least `threshold` times: likely N+1"""
+        return sorted(
+            ({'statement': shape, 'count': count} for shape, count in self.shapes.items() if count >= threshold),
+            key=lambda item: -item['count']
+        )
+
+
+def statement_shape(statement):
+    """Normalize a statement so repeats with other parameters compare equal"""
+    shape = _IN_LIST.sub('(?)', statement)
+    shape = _NUMBER.sub('N', shape)
+    return _SPACE.sub(' ', shape).strip()
+
+
+def current_stats():
+    """The sampled request's stats, or None outside one"""
+    if not has_request_context():
+        return None
+    return g.get('query_stats')
+
+
+@contextmanager
+def timed(name):
+    """Add the block's duration to a Server-Timing entry of the request"""
+    stats = current_stats()
+    if stats is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.timings[name] = stats.timings.get(name, 0.0) + time.perf_counter() - start
+
+
+def _explain(cursor, dialect_name, statement, parameters):
+    prefix = EXPLAIN_PREFIX.get(dialect_name)
+    if prefix is None or not statement.lstrip().upper().startswith('SELECT'):
+        return None
+    try:
+        explain = cursor.connection.cursor()
+        explain.execute(prefix + statement, parameters)
+        plan = [' '.join(str(value) for value in row) for row in explain.fetchall()]
+        explain.close()
+        return plan
+    except Exception as e:
+        return [f'EXPLAIN failed: {e}']
+
+
+def _register_engine_hooks(app, engine):
+    slow_seconds = app.config['SLOW_QUERY_MS'] / 1000
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+        if current_stats() is not None:
+            conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def record_query(conn, cursor, statement, parameters, context, executemany):
+        stats = current_stats()
+        if stats is None or not conn.info.get('query_started'):
+            return
+        seconds = time.perf_counter() - conn.info['query_started'].pop()
+        stats.add_query(statement_shape(statement), seconds)
+
+        if seconds >= slow_seconds and not executemany:
+            stats.slow.append({
+                'statement': _SPACE.sub(' ', statement).strip(),
+                'ms': round(seconds * 1000, 2),
+                'plan': _explain(cursor, conn.dialect.name, statement, parameters),
+            })
+
+
+def _server_timing(stats, total_seconds):
+    entries = [f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries"']
+    entries += [f'{name};dur={seconds * 1000:.1f}' for name, seconds in stats.timings.items()]
+    entries.append(f'total;dur={total_seconds * 1000:.1f}')
+    return ', '.join(entries)
+
+
+def register_query_instrumentation(app, db):
+    """Count and time SQL per request, flag N+1 patterns and slow queries
+
+    Enabled with QUERY_INSTRUMENTATION_ENABLED for a share of requests
+    (QUERY_INSTRUMENTATION_SAMPLE_RATE). Sampled requests get a
+    Server-Timing header (db, serialize, push, total) and one log
+    record with the counts and timings as fields, logged as a warning
+    when it flags an N+1 pattern or a query slower than SLOW_QUERY_MS
+    (with its EXPLAIN plan). Streamed bodies are produced after the
+    header is sent, so their queries are not counted.
+    """
+    if not app.config.get('QUERY_INSTRUMENTATION_ENABLED'):
+        return
+
+    with app.app_context():
+        for engine in db.engines.values():
+            _register_engine_hooks(app, engine)
+
+    # Time JSON encoding of responses
+    json_response = app.json.response
+
+    def timed_json_response(*args, **kwargs):
+        with timed('serialize'):
+            return json_response(*args, **kwargs)
+
+    app.json.response = timed_json_response
+
+    @app.before_request
+    def start_query_stats():
+        if random.random() < app.config['QUERY_INSTRUMENTATION_SAMPLE_RATE']:
+            g.query_stats = RequestQueryStats()
+
+    @app.after_request
+    def report_query_stats(response):
+        stats = g.pop('query_stats', None)
+        if stats is None:
+            return response
+
+        total_seconds = time.perf_counter() - stats.started
+        response.headers['Server-Timing'] = _server_timing(stats, total_seconds)
+
+        repeated = stats.repeated(app.config['N_PLUS_ONE_THRESHOLD'])
+        record = {
+            'event': 'request_queries',
+            'path': request.path,
+            'status': response.status_code,
+            'queries': stats.queries,
+            'db_ms': round(stats.db_seconds * 1000, 2),
+            'total_ms': round(total_seconds * 1000, 2),
+            **{f'{name}_ms': round(seconds * 1000, 2) for name, seconds in stats.timings.items()},
+            'n_plus_one': repeated,
+            'slow_queries': stats.slow,
+        }
+        level = logging.WARNING if repeated or stats.slow else logging.INFO
+        logger.log(level, '%d queries in %.1f ms for %s %s', stats.queries, stats.db_seconds * 1000,
+                   request.method, request.path, extra=record)
+
+        return response
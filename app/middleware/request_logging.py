@@ -0,0 +1,232 @@
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from flask import g, has_request_context, request
+from flask_jwt_extended import get_jwt_identity
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+# Attributes every LogRecord has; anything else was passed in `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+access_logger = logging.getLogger('app.access')
+
+# The handler and listener installed on the root logger, if any
+_installed = {}
+
+
+def _user_id():
+    try:
+        return get_jwt_identity()
+    except RuntimeError:  # the request has not verified a token
+        return None
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamp records with the request they were logged in
+
+    Runs on the thread that logs, before the record is queued.
+    """
+
+    def filter(self, record):
+        if has_request_context():
+            record.request_id = g.get('request_id')
+            record.user_id = _user_id()
+            record.method = request.method
+            record.endpoint = request.endpoint
+            started = g.get('request_started')
+            if started is not None and not hasattr(record, 'duration_ms'):
+                record.duration_ms = round((time.perf_counter() - started) * 1000, 2)
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a share of a logger's records below WARNING
+
+    `rates` maps logger names to the share kept; a name also covers its
+    child loggers, and the longest match wins.
+    """
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+        self._cache = {}
+
+    def rate_for(self, name):
+        rate = self._cache.get(name)
+        if rate is None:
+            rate = 1.0
+            parts = name.split('.')
+            for end in range(len(parts), 0, -1):
+                prefix = '.'.join(parts[:end])
+                if prefix in self.rates:
+                    rate = self.rates[prefix]
+                    break
+            self._cache[name] = rate
+        return rate
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate_for(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record):
+        data = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'pid': record.process,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and value is not None:
+                data[key] = value
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines for development, with the extra fields appended"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    def format(self, record):
+        line = super().format(record)
+        extra = {key: value for key, value in vars(record).items()
+                 if key not in _RECORD_ATTRIBUTES and value is not None}
+        if extra:
+            line += ' ' + json.dumps(extra, ensure_ascii=False, default=str)
+        return line
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Never block the caller: drop records while the queue is full
+
+    The number dropped is reported with the next record that fits.
+    """
+
+    dropped = 0
+
+    def enqueue(self, record):
+        try:
+            if self.dropped:
+                self.queue.put_nowait(logging.makeLogRecord({
+                    'name': __name__, 'levelno': logging.WARNING, 'levelname': 'WARNING',
+                    'msg': 'Dropped %d log records, the log queue was full', 'args': (self.dropped,),
+                }))
+                self.dropped = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record):
+        # Merge the message on the calling thread (its arguments may be
+        # ORM objects bound to this thread's session) but keep exc_info
+        # and the extra fields for the formatter on the listener thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def _parse_rates(value):
+    rates = {}
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        name, _, rate = item.partition('=')
+        rates[name.strip()] = float(rate)
+    return rates
+
+
+def _start_listener(handler, output):
+    handler.queue = queue.Queue(handler.queue.maxsize)
+    listener = QueueListener(handler.queue, output, respect_handler_level=True)
+    listener.start()
+    _installed['listener'] = listener
+
+
+def _restart_after_fork():
+    # The parent's listener thread does not exist in a forked child, and
+    # its queue may have been locked mid-put; start over with a new one
+    if _installed:
+        _start_listener(_installed['handler'], _installed['output'])
+
+
+def _stop_listener():
+    listener = _installed.get('listener')
+    if listener is not None:
+        listener.stop()
+
+
+def _install(app):
+    root = logging.getLogger()
+    if _installed:
+        _stop_listener()
+        root.removeHandler(_installed['handler'])
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if app.config['LOG_FORMAT'] == 'json' else TextFormatter())
+
+    handler = DroppingQueueHandler(queue.Queue(app.config['LOG_QUEUE_SIZE']))
+    handler.addFilter(SamplingFilter(_parse_rates(app.config['LOG_SAMPLE_RATES'])))
+    handler.addFilter(RequestContextFilter())
+
+    _installed.update(handler=handler, output=output)
+    _start_listener(handler, output)
+    root.addHandler(handler)
+    root.setLevel(app.config['LOG_LEVEL'])
+
+
+def register_logging(app):
+    """Structured logging for the whole app, written off the request thread
+
+    Records go through a QueueHandler on the root logger to a
+    QueueListener thread that writes them to stdout, as JSON lines
+    (LOG_FORMAT=json) or text. Records logged during a request carry its
+    request id (X-Request-ID, echoed back), user id, method, endpoint
+    and elapsed time, and every request ends with one app.access line.
+    LOG_SAMPLE_RATES keeps only a share of a busy logger's records below
+    WARNING, e.g. "app.services.fcm_service.sent=0.1".
+    """
+    _install(app)
+
+    @app.before_request
+    def start_request_log():
+        g.request_started = time.perf_counter()
+        request_id = request.headers.get(REQUEST_ID_HEADER, '')
+        g.request_id = request_id if _REQUEST_ID.match(request_id) else uuid.uuid4().hex
+
+    @app.after_request
+    def add_request_id(response):
+        if 'request_id' in g:
+            response.headers[REQUEST_ID_HEADER] = g.request_id
+        return response
+
+    if app.config['LOG_REQUESTS']:
+        @app.after_request
+        def log_request(response):
+            if 'request_started' in g:
+                access_logger.info('%s %s %s', request.method, request.path, response.status_code,
+                                   extra={'status': response.status_code, 'path': request.path})
+            return response
+
+
+os.register_at_fork(after_in_child=_restart_after_fork)
+atexit.register(_stop_listener)
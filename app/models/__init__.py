@@ -6,6 +6,8 @@ from .manager_approval import ManagerApproval
 from .finance_action import FinanceAction
 from .audit_log import AuditLog
 from .notification import Notification
+from .archived_case_rollup import ArchivedCaseRollup
+from . import versioning  # noqa: F401 - registers the case version hook
 
 __all__ = [
     'User',
@@ -15,5 +17,6 @@ __all__ = [
     'ManagerApproval',
     'FinanceAction',
     'AuditLog',
-    'Notification'
+    'Notification',
+    'ArchivedCaseRollup'
 ]
@@ -0,0 +1,30 @@
+from ..extensions import db
+from ..utils.constants import CaseType
+
+
+class ArchivedCaseRollup(db.Model):
+    """Totals of closed cases moved to the archive database
+
+    Dashboard statistics add these to the live counts so they stay
+    correct after cases leave the hot tables.
+    """
+    __tablename__ = 'archived_case_rollups'
+
+    id = db.Column(db.Integer, primary_key=True)
+    case_type = db.Column(db.Enum(CaseType), nullable=False)
+    assigned_to = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+
+    # Month the case was closed (its updated_at, as the dashboard uses)
+    closed_year = db.Column(db.Integer, nullable=False)
+    closed_month = db.Column(db.Integer, nullable=False)
+
+    case_count = db.Column(db.Integer, default=0, nullable=False)
+    amount_total = db.Column(db.Float, default=0, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('case_type', 'assigned_to', 'closed_year', 'closed_month',
+                            name='unique_archived_case_rollup'),
+    )
+
+    def __repr__(self):
+        return f'<ArchivedCaseRollup {self.case_type} {self.closed_year}-{self.closed_month}>'
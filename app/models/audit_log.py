@@ -1,7 +1,7 @@
 from datetime import datetime
 from ..extensions import db
 from ..utils.constants import AuditAction
-import json
+from ..utils.sql import json_field
 
 
 class AuditLog(db.Model):
@@ -11,26 +11,52 @@ class AuditLog(db.Model):
     case_id = db.Column(db.Integer, db.ForeignKey('cases.id'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     action = db.Column(db.Enum(AuditAction), nullable=False)
-    details = db.Column(db.Text, nullable=True)  # JSON string
+    details = db.Column(db.JSON, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Actor snapshot taken at write time, so history survives renames
+    # and reads need no join to users
+    actor_name = db.Column(db.String(100), nullable=True)
+    actor_role = db.Column(db.String(20), nullable=True)
+
+    # Generated from details for the fields we filter on
+    detail_amount = db.Column(db.Float, db.Computed(json_field('details', 'amount', db.Float())))
+    detail_manager_role = db.Column(db.String(20), db.Computed(json_field('details', 'manager_role', db.String(20))))
+    detail_image_type = db.Column(db.String(30), db.Computed(json_field('details', 'image_type', db.String(30))))
+
+    # Composite indexes matching the audit query filters; each ends with
+    # (created_at, id) so keyset pages are served straight from the index
+    __table_args__ = (
+        db.Index('ix_audit_logs_created_at_id', 'created_at', 'id'),
+        db.Index('ix_audit_logs_case_created_at', 'case_id', 'created_at', 'id'),
+        db.Index('ix_audit_logs_user_created_at', 'user_id', 'created_at', 'id'),
+        db.Index('ix_audit_logs_action_created_at', 'action', 'created_at', 'id'),
+        db.Index('ix_audit_logs_detail_amount', 'detail_amount'),
+        db.Index('ix_audit_logs_detail_manager_role', 'detail_manager_role', 'created_at'),
+        db.Index('ix_audit_logs_detail_image_type', 'detail_image_type', 'created_at'),
+    )
+
     def set_details(self, details_dict):
         """Set details from a dictionary"""
-        self.details = json.dumps(details_dict, ensure_ascii=False)
+        self.details = details_dict
 
     def get_details(self):
         """Get details as a dictionary"""
-        if self.details:
-            return json.loads(self.details)
-        return {}
+        return self.details or {}
+
+    def set_actor(self, user):
+        """Snapshot the acting user's name and role"""
+        self.user_id = user.id
+        self.actor_name = user.full_name
+        self.actor_role = user.role.value if user.role else None
 
     def to_dict(self):
         return {
             'id': self.id,
             'case_id': self.case_id,
             'user_id': self.user_id,
-            'user_name': self.user.full_name if self.user else None,
-            'user_role': self.user.role.value if self.user and self.user.role else None,
+            'user_name': self.actor_name,
+            'user_role': self.actor_role,
             'action': self.action.value if self.action else None,
             'details': self.get_details(),
             'created_at': self.created_at.isoformat() if self.created_at else None
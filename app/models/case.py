@@ -31,6 +31,10 @@ class Case(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Bumped on every change to the case or its children (see versioning.py);
+    # backs ETags and guards concurrent updates
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+
     # Relationships
     images = db.relationship('CaseImage', backref='case', cascade='all, delete-orphan')
     report = db.relationship('ResearcherReport', backref='case', uselist=False, cascade='all, delete-orphan')
@@ -39,12 +43,43 @@ class Case(db.Model):
     audit_logs = db.relationship('AuditLog', backref='case', cascade='all, delete-orphan', order_by='AuditLog.created_at')
     notifications = db.relationship('Notification', backref='case', cascade='all, delete-orphan')
 
-    def to_dict(self, include_details=False):
+    __mapper_args__ = {
+        'version_id_col': version,
+        # Set by the before_flush hook, which also bumps it for child changes
+        'version_id_generator': False,
+    }
+
+    # include= names, in output order, and the relationship behind each
+    INCLUDES = {
+        'creator': 'creator',
+        'researcher': 'researcher',
+        'images': 'images',
+        'report': 'report',
+        'approvals': 'approvals',
+        'finance': 'finance_action',
+        'timeline': 'audit_logs',
+    }
+
+    # Scalar fields selectable with fields=
+    FIELDS = (
+        'id', 'case_number', 'case_type', 'status', 'initial_screenshot',
+        'beneficiary_name', 'beneficiary_phone', 'beneficiary_id_number', 'beneficiary_address',
+        'amount_approved', 'created_by', 'assigned_to', 'created_at', 'updated_at', 'version'
+    )
+
+    def to_dict(self, include_details=False, include=None, fields=None):
+        """Serialize the case
+
+        include_details adds every relationship (the full dossier).
+        Otherwise `include` names the relationships to add (see INCLUDES).
+        `fields`, if given, limits the scalar fields; id is always kept.
+        """
         data = {
             'id': self.id,
             'case_number': self.case_number,
             'case_type': self.case_type.value if self.case_type else None,
             'status': self.status.value if self.status else None,
+            'initial_screenshot': self.initial_screenshot,
             'beneficiary_name': self.beneficiary_name,
             'beneficiary_phone': self.beneficiary_phone,
             'beneficiary_id_number': self.beneficiary_id_number,
@@ -53,17 +88,33 @@ class Case(db.Model):
             'created_by': self.created_by,
             'assigned_to': self.assigned_to,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'version': self.version
         }
 
         if include_details:
-            data['initial_screenshot'] = self.initial_screenshot
+            include = self.INCLUDES
+
+        if fields:
+            data = {key: value for key, value in data.items() if key == 'id' or key in fields}
+        elif not include:
+            # The flat list view has never carried the screenshot path
+            del data['initial_screenshot']
+
+        include = include or ()
+        if 'creator' in include:
             data['creator'] = self.creator.to_dict() if self.creator else None
+        if 'researcher' in include:
             data['researcher'] = self.researcher.to_dict() if self.researcher else None
+        if 'images' in include:
             data['images'] = [img.to_dict() for img in self.images]
+        if 'report' in include:
             data['report'] = self.report.to_dict() if self.report else None
+        if 'approvals' in include:
             data['approvals'] = [a.to_dict() for a in self.approvals]
+        if 'finance' in include:
             data['finance_action'] = self.finance_action.to_dict() if self.finance_action else None
+        if 'timeline' in include:
             data['audit_logs'] = [log.to_dict() for log in self.audit_logs]
 
         return data
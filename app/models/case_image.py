@@ -11,17 +11,41 @@ class CaseImage(db.Model):
     image_path = db.Column(db.String(500), nullable=False)
     image_type = db.Column(db.Enum(ImageType), nullable=False)
     uploaded_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+
+    # File metadata captured at upload time (NULL until backfilled for older rows)
+    file_size = db.Column(db.BigInteger, nullable=True)
+    mime_type = db.Column(db.String(100), nullable=True)
+    width = db.Column(db.Integer, nullable=True)
+    height = db.Column(db.Integer, nullable=True)
+    page_count = db.Column(db.Integer, nullable=True)  # PDFs only
+    sha256 = db.Column(db.String(64), nullable=True)
+
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Relationship to uploader
     uploader = db.relationship('User', backref='uploaded_images')
 
+    def set_metadata(self, metadata):
+        """Set file metadata from a dictionary"""
+        self.file_size = metadata.get('file_size')
+        self.mime_type = metadata.get('mime_type')
+        self.width = metadata.get('width')
+        self.height = metadata.get('height')
+        self.page_count = metadata.get('page_count')
+        self.sha256 = metadata.get('sha256')
+
     def to_dict(self):
         return {
             'id': self.id,
             'case_id': self.case_id,
             'image_path': self.image_path,
             'image_type': self.image_type.value if self.image_type else None,
+            'file_size': self.file_size,
+            'mime_type': self.mime_type,
+            'width': self.width,
+            'height': self.height,
+            'page_count': self.page_count,
+            'sha256': self.sha256,
             'uploaded_by': self.uploaded_by,
             'uploader_name': self.uploader.full_name if self.uploader else None,
             'created_at': self.created_at.isoformat() if self.created_at else None
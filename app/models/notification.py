@@ -8,17 +8,26 @@ class Notification(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     case_id = db.Column(db.Integer, db.ForeignKey('cases.id'), nullable=True)
+    # Copied from the case when the notification is created, so listing
+    # the inbox needs no join
+    case_number = db.Column(db.String(50), nullable=True)
     title = db.Column(db.String(200), nullable=False)
     message = db.Column(db.Text, nullable=False)
     is_read = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Covers the inbox listing, unread count and retention queries
+    __table_args__ = (
+        db.Index('ix_notifications_user_read_created', 'user_id', 'is_read', 'created_at'),
+        db.Index('ix_notifications_case_id', 'case_id'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
             'user_id': self.user_id,
             'case_id': self.case_id,
-            'case_number': self.case.case_number if self.case else None,
+            'case_number': self.case_number,
             'title': self.title,
             'message': self.message,
             'is_read': self.is_read,
@@ -0,0 +1,65 @@
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from .case import Case
+from .case_image import CaseImage
+from .researcher_report import ResearcherReport
+from .manager_approval import ManagerApproval
+from .finance_action import FinanceAction
+from .audit_log import AuditLog
+
+
+# Rows that are part of a case's dossier; changing one changes the case
+CASE_CHILDREN = (CaseImage, ResearcherReport, ManagerApproval, FinanceAction, AuditLog)
+
+
+def _parent_case(session, obj):
+    case = obj.__dict__.get('case')
+    if case is None and obj.case_id is not None:
+        case = session.get(Case, obj.case_id)
+    return case
+
+
+def _version_changed(case):
+    return inspect(case).attrs.version.history.has_changes()
+
+
+def touch(case):
+    """Bump a case's version at the next flush
+
+    For changes made with bulk statements, which the flush hook cannot see.
+    """
+    if not _version_changed(case):
+        case.version = (case.version or 0) + 1
+
+
+def _touched_cases(session):
+    touched = set()
+
+    for obj in session.dirty:
+        if isinstance(obj, Case) and session.is_modified(obj):
+            touched.add(obj)
+
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, CASE_CHILDREN):
+            continue
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        case = _parent_case(session, obj)
+        if case is not None:
+            touched.add(case)
+
+    return touched
+
+
+@event.listens_for(Session, 'before_flush')
+def bump_case_versions(session, flush_context, instances):
+    """Give each changed case, or case with changed children, a new version
+
+    Only ORM changes are seen; code changing these tables with bulk
+    statements calls touch() on the case.
+    """
+    with session.no_autoflush:
+        for case in _touched_cases(session):
+            if case in session.new or case in session.deleted or _version_changed(case):
+                continue
+            case.version = (case.version or 0) + 1
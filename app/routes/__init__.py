@@ -1,4 +1,4 @@
-from . import auth, users, cases, research, approvals, finance, images, notifications, dashboard
+from . import auth, users, cases, research, approvals, finance, images, notifications, dashboard, audit, admin
 
 __all__ = [
     'auth',
@@ -9,5 +9,7 @@ __all__ = [
     'finance',
     'images',
     'notifications',
-    'dashboard'
+    'dashboard',
+    'audit',
+    'admin'
 ]
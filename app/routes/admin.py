@@ -0,0 +1,96 @@
+import os
+import tracemalloc
+from flask import Blueprint, current_app, request, jsonify, send_from_directory
+from flask_jwt_extended import jwt_required
+from ..utils.decorators import owner_only, get_current_user
+from ..middleware import memory, profiler
+
+bp = Blueprint('admin', __name__, url_prefix='/api/admin')
+
+
+def _profiler_disabled():
+    return jsonify({'error': 'Profiler is disabled'}), 404
+
+
+@bp.route('/profile-token', methods=['POST'])
+@jwt_required()
+@owner_only
+def create_profile_token():
+    """Issue a token that profiles the requests it is sent with"""
+    if not current_app.config.get('PROFILER_ENABLED'):
+        return _profiler_disabled()
+
+    return jsonify({
+        'token': profiler.issue_token(get_current_user()),
+        'header': profiler.PROFILE_HEADER,
+        'expires_in': current_app.config['PROFILER_TOKEN_MAX_AGE']
+    }), 200
+
+
+@bp.route('/profiles', methods=['GET'])
+@jwt_required()
+@owner_only
+def list_profiles():
+    """Saved request profiles, newest first"""
+    if not current_app.config.get('PROFILER_ENABLED'):
+        return _profiler_disabled()
+
+    return jsonify({
+        'profiles': [
+            {'name': entry.name, 'size': entry.stat().st_size}
+            for entry in profiler.list_profiles(current_app)
+        ]
+    }), 200
+
+
+@bp.route('/profiles/<name>', methods=['GET'])
+@jwt_required()
+@owner_only
+def download_profile(name):
+    """Download one profile in collapsed-stack format"""
+    if not current_app.config.get('PROFILER_ENABLED') or not name.endswith(profiler.PROFILE_SUFFIX):
+        return jsonify({'error': 'Profile not found'}), 404
+
+    return send_from_directory(profiler.profile_dir(current_app), name, mimetype='text/plain', as_attachment=True)
+
+
+def _memory_monitor():
+    return current_app.extensions.get('memory_monitor')
+
+
+@bp.route('/memory', methods=['GET'])
+@jwt_required()
+@owner_only
+def memory_report():
+    """Worker memory, and peak allocation per endpoint when monitored"""
+    monitor = _memory_monitor()
+    traced, traced_peak = tracemalloc.get_traced_memory() if monitor else (None, None)
+    budget = current_app.config.get('MEMORY_MAX_RSS_MB')
+    return jsonify({
+        'pid': os.getpid(),
+        'rss_bytes': memory.rss_bytes(),
+        'budget_bytes': budget * 1024 * 1024 if budget else None,
+        'monitor_enabled': monitor is not None,
+        'traced_bytes': traced,
+        'traced_peak_bytes': traced_peak,
+        'endpoints': monitor.report() if monitor else []
+    }), 200
+
+
+@bp.route('/memory/snapshots', methods=['POST'])
+@jwt_required()
+@owner_only
+def memory_snapshot():
+    """Snapshot traced memory and diff it against this worker's previous one"""
+    monitor = _memory_monitor()
+    if monitor is None:
+        return jsonify({'error': 'Memory monitor is disabled'}), 404
+
+    limit = min(request.args.get('limit', 25, type=int), 200)
+    diff, top = monitor.snapshot_diff(limit)
+    return jsonify({
+        'pid': os.getpid(),
+        'traced_bytes': tracemalloc.get_traced_memory()[0],
+        'diff': diff,
+        'top_sites': top
+    }), 200
@@ -1,16 +1,30 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
 from ..extensions import db
 from ..models.case import Case
 from ..models.manager_approval import ManagerApproval
 from ..models.user import User
 from ..utils.constants import UserRole, CaseStatus, CaseType, ApprovalDecision
 from ..utils.decorators import role_required, get_current_user
-from ..services import approval_service, audit_service, notification_service
+from ..utils.http_cache import is_fresh, not_modified, with_etag
+from ..services import approval_service, audit_service, case_service, notification_service
 
 bp = Blueprint('approvals', __name__, url_prefix='/api/approvals')
 
 
+def _conflict(case_id):
+    """409 response carrying the case's current approval state"""
+    case = Case.query.get(case_id)
+
+    return jsonify({
+        'error': 'تم تعديل الحالة من قبل مدير آخر، يرجى المراجعة والمحاولة مرة أخرى',
+        'case': case.to_dict(include=('approvals',)) if case else None,
+        'approvals': approval_service.get_approval_status(case) if case else []
+    }), 409
+
+
 @bp.route('/pending', methods=['GET'])
 @jwt_required()
 @role_required(UserRole.MANAGER_1, UserRole.MANAGER_2, UserRole.MANAGER_3, UserRole.MANAGER_4)
@@ -21,6 +35,11 @@ def get_pending_approvals():
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
 
+    try:
+        fields, include = case_service.parse_expansion(request.args, default_include=Case.INCLUDES)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
     # Get cases where this manager needs to approve
     if current_user.role == UserRole.MANAGER_3:
         # Manager 3 only approves donation cases
@@ -47,14 +66,22 @@ def get_pending_approvals():
     query = query.filter(~Case.id.in_(subquery))
     query = query.order_by(Case.created_at.desc())
 
+    # Answer conditional requests from the page's (id, version) pairs
+    page, per_page = case_service.page_args(page, per_page)
+    etag = case_service.page_etag(query, page, per_page, fields, include)
+    if is_fresh(etag):
+        return not_modified(etag)
+
+    query = case_service.with_includes(query, include)
     pagination = query.paginate(page=page, per_page=per_page, error_out=False)
 
-    return jsonify({
-        'cases': [case.to_dict(include_details=True) for case in pagination.items],
+    response = jsonify({
+        'cases': [case.to_dict(include=include, fields=fields) for case in pagination.items],
         'total': pagination.total,
         'pages': pagination.pages,
         'current_page': page
-    }), 200
+    })
+    return with_etag(response, etag)
 
 
 @bp.route('/cases/<int:case_id>/status', methods=['GET'])
@@ -100,55 +127,26 @@ def approve_case(case_id):
     if amount is None or amount <= 0:
         return jsonify({'error': 'Valid amount is required'}), 400
 
-    # Get or create approval record
-    approval = ManagerApproval.query.filter_by(
-        case_id=case.id,
-        manager_role=current_user.role.value
-    ).first()
-
-    if not approval:
-        approval = ManagerApproval(
-            case_id=case.id,
-            manager_id=current_user.id,
-            manager_role=current_user.role.value
-        )
-        db.session.add(approval)
-
-    # Check if all other approvals have the same amount
-    other_approvals = ManagerApproval.query.filter(
-        ManagerApproval.case_id == case.id,
-        ManagerApproval.manager_role != current_user.role.value,
-        ManagerApproval.decision == ApprovalDecision.APPROVED
-    ).all()
+    approval, finalized, error = approval_service.record_approval(case, current_user, amount)
+    if error:
+        return jsonify({'error': error}), 400
 
-    for other in other_approvals:
-        if other.amount_suggested != amount:
-            return jsonify({
-                'error': f'Amount must match other approvals. Expected: {other.amount_suggested}'
-            }), 400
-
-    approval.manager_id = current_user.id
-    approval.decision = ApprovalDecision.APPROVED
-    approval.amount_suggested = amount
-    approval.rejection_reason = None
-    approval.suggestion = None
-
-    db.session.commit()
-
-    # Log
     audit_service.log_case_approved(case, current_user, amount)
+    if finalized:
+        notification_service.notify_case_approved(case)
 
-    # Check if all managers have approved
-    if approval_service.check_all_approved(case):
-        approval_service.finalize_approval(case)
-        case.status = CaseStatus.PENDING_PAYMENT
+    # One commit for the approval, the finalization, the audit entry and
+    # the finance manager's notification, guarded by the case version
+    try:
         db.session.commit()
-        notification_service.notify_case_approved(case)
+    except (StaleDataError, IntegrityError):
+        db.session.rollback()
+        return _conflict(case_id)
 
     return jsonify({
         'message': 'Case approved successfully',
         'approval': approval.to_dict(),
-        'all_approved': case.status == CaseStatus.PENDING_PAYMENT
+        'all_approved': finalized
     }), 200
 
 
@@ -175,43 +173,23 @@ def reject_case(case_id):
     if not reason:
         return jsonify({'error': 'Rejection reason is required'}), 400
 
-    # Get or create approval record
-    approval = ManagerApproval.query.filter_by(
-        case_id=case.id,
-        manager_role=current_user.role.value
-    ).first()
-
-    if not approval:
-        approval = ManagerApproval(
-            case_id=case.id,
-            manager_id=current_user.id,
-            manager_role=current_user.role.value
-        )
-        db.session.add(approval)
+    # One commit for the rejection, the reset, the audit entry and the
+    # notifications, guarded by the case version
+    try:
+        approval = approval_service.record_rejection(case, current_user, reason, suggestion)
+        audit_service.log_case_rejected(case, current_user, reason, suggestion)
 
-    approval.manager_id = current_user.id
-    approval.decision = ApprovalDecision.REJECTED
-    approval.rejection_reason = reason
-    approval.suggestion = suggestion
-    approval.amount_suggested = None
+        # Notify managers 1 and 2 about rejection
+        managers = User.query.filter(
+            User.role.in_([UserRole.MANAGER_1, UserRole.MANAGER_2]),
+            User.is_active == True
+        ).all()
+        notification_service.notify_case_rejected(case, [m.id for m in managers])
 
-    # Reset all other approvals
-    approval_service.reset_approvals(case)
-
-    # Update case status
-    case.status = CaseStatus.REJECTED
-
-    db.session.commit()
-
-    # Log and notify
-    audit_service.log_case_rejected(case, current_user, reason, suggestion)
-
-    # Notify managers 1 and 2 about rejection
-    managers = User.query.filter(
-        User.role.in_([UserRole.MANAGER_1, UserRole.MANAGER_2]),
-        User.is_active == True
-    ).all()
-    notification_service.notify_case_rejected(case, [m.id for m in managers])
+        db.session.commit()
+    except (StaleDataError, IntegrityError):
+        db.session.rollback()
+        return _conflict(case_id)
 
     return jsonify({
         'message': 'Case rejected',
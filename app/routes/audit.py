@@ -0,0 +1,85 @@
+from datetime import datetime
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from flask_jwt_extended import jwt_required
+from ..utils.constants import UserRole, AuditAction
+from ..utils.decorators import role_required
+from ..services import audit_service
+
+bp = Blueprint('audit', __name__, url_prefix='/api/audit')
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+EXPORT_YIELD_PER = 500
+
+
+def _parse_datetime(value, name):
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'Invalid {name}. Use ISO 8601, e.g. 2026-01-31T00:00:00')
+
+
+def _parse_filters(args):
+    """Parse audit filters from query args; raises ValueError on bad input"""
+    filters = {
+        'case_id': args.get('case_id', type=int),
+        'user_id': args.get('user_id', type=int),
+        'manager_role': args.get('manager_role') or None,
+        'image_type': args.get('image_type') or None,
+        'min_amount': args.get('min_amount', type=float),
+        'max_amount': args.get('max_amount', type=float),
+    }
+
+    action = args.get('action')
+    if action:
+        try:
+            filters['action'] = AuditAction(action)
+        except ValueError:
+            raise ValueError('Invalid action')
+
+    if args.get('since'):
+        filters['since'] = _parse_datetime(args['since'], 'since')
+    if args.get('until'):
+        filters['until'] = _parse_datetime(args['until'], 'until')
+
+    if args.get('cursor'):
+        filters['cursor'] = audit_service.decode_cursor(args['cursor'])
+
+    return filters
+
+
+@bp.route('', methods=['GET'])
+@jwt_required()
+@role_required(UserRole.OWNER, UserRole.MANAGER_1, UserRole.MANAGER_2)
+def list_audit_logs():
+    """Query audit logs with keyset pagination, or export them as NDJSON"""
+    try:
+        filters = _parse_filters(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    query = audit_service.query_logs(**filters)
+
+    if request.args.get('format') == 'ndjson':
+        def generate():
+            for log in query.yield_per(EXPORT_YIELD_PER):
+                yield current_app.json.dumps(log.to_dict()) + '\n'
+
+        return Response(
+            stream_with_context(generate()),
+            mimetype='application/x-ndjson',
+            headers={'Content-Disposition': 'attachment; filename="audit-logs.ndjson"'}
+        )
+
+    limit = min(max(request.args.get('limit', DEFAULT_LIMIT, type=int), 1), MAX_LIMIT)
+
+    # Fetch one extra row to know whether another page exists
+    logs = query.limit(limit + 1).all()
+    has_more = len(logs) > limit
+    logs = logs[:limit]
+
+    return jsonify({
+        'audit_logs': [log.to_dict() for log in logs],
+        'next_cursor': audit_service.encode_cursor(logs[-1]) if has_more else None,
+        'limit': limit
+    }), 200
@@ -8,6 +8,7 @@ from ..models.user import User
 from ..utils.constants import UserRole
 from ..utils.validators import validate_password
 from ..utils.decorators import get_current_user as get_user
+from ..services import notification_service
 
 bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
@@ -58,8 +59,7 @@ def logout():
     # Clear FCM token on logout
     current_user = get_user()
     if current_user:
-        current_user.fcm_token = None
-        current_user.fcm_platform = None
+        notification_service.clear_fcm_token(current_user)
         db.session.commit()
 
     return jsonify({'message': 'Successfully logged out'}), 200
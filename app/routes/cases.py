@@ -1,16 +1,22 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from datetime import datetime
 from flask_jwt_extended import jwt_required
 from ..extensions import db
 from ..models.case import Case
 from ..models.user import User
+from ..models.audit_log import AuditLog
 from ..utils.constants import UserRole, CaseType, CaseStatus
 from ..utils.decorators import role_required, get_current_user
 from ..utils.helpers import save_uploaded_file
+from ..utils.http_cache import make_etag, is_fresh, not_modified, with_etag
 from ..utils.constants import ImageType
-from ..services import case_service, audit_service, notification_service
+from ..services import case_service, audit_service, notification_service, export_service, archive_service
 
 bp = Blueprint('cases', __name__, url_prefix='/api/cases')
 
+TIMELINE_LIMIT = 50
+TIMELINE_MAX_LIMIT = 200
+
 
 @bp.route('', methods=['GET'])
 @jwt_required()
@@ -24,38 +30,94 @@ def list_cases():
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
 
-    query = case_service.get_cases_for_user(current_user)
+    try:
+        fields, include = case_service.parse_expansion(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    # Apply filters
-    if status:
-        try:
-            query = query.filter(Case.status == CaseStatus(status))
-        except ValueError:
-            pass
+    query = case_service.get_cases_for_user(current_user)
+    query = case_service.filter_cases(query, status, case_type)
 
-    if case_type:
-        try:
-            query = query.filter(Case.case_type == CaseType(case_type))
-        except ValueError:
-            pass
+    # Answer conditional requests from the page's (id, version) pairs
+    page, per_page = case_service.page_args(page, per_page)
+    etag = case_service.page_etag(query, page, per_page, fields, include)
+    if is_fresh(etag):
+        return not_modified(etag)
 
     # Paginate
+    query = case_service.with_includes(query, include)
     pagination = query.paginate(page=page, per_page=per_page, error_out=False)
 
-    return jsonify({
-        'cases': [case.to_dict() for case in pagination.items],
+    response = jsonify({
+        'cases': [case.to_dict(include=include, fields=fields) for case in pagination.items],
         'total': pagination.total,
         'pages': pagination.pages,
         'current_page': page
-    }), 200
+    })
+    return with_etag(response, etag)
+
+
+@bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_cases():
+    """Export all cases matching the list filters as CSV or XLSX"""
+    current_user = get_current_user()
+
+    status = request.args.get('status')
+    case_type = request.args.get('type')
+    export_format = request.args.get('format', 'csv').lower()
+
+    if export_format not in ('csv', 'xlsx'):
+        return jsonify({'error': 'Invalid format. Must be "csv" or "xlsx"'}), 400
+
+    query = case_service.get_cases_for_user(current_user)
+    query = case_service.filter_cases(query, status, case_type)
+
+    if export_format == 'xlsx':
+        mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    else:
+        mimetype = 'text/csv'
+
+    filename = f"cases-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.{export_format}"
+
+    # Rows are read from the database while the response is being sent
+    return Response(
+        stream_with_context(export_service.stream_cases(query, export_format)),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
 
 
 @bp.route('/<int:case_id>', methods=['GET'])
 @jwt_required()
 def get_case(case_id):
-    """Get case with full details"""
+    """Get case with full details, or the parts named by fields= and include="""
     current_user = get_current_user()
-    case = Case.query.get(case_id)
+
+    try:
+        fields, include = case_service.parse_expansion(request.args, default_include=Case.INCLUDES)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # A conditional request is answered from the version alone, without
+    # loading or serializing the case
+    current = case_service.get_case_version(case_id)
+    if current:
+        version, assigned_to = current
+        if current_user.role == UserRole.RESEARCHER and assigned_to != current_user.id:
+            return jsonify({'error': 'Access denied'}), 403
+
+        etag = make_etag(case_id, version, False, fields, include)
+        if is_fresh(etag):
+            return not_modified(etag)
+
+    case = case_service.with_includes(Case.query, include).filter(Case.id == case_id).first()
+    archived = False
+
+    # Closed cases may have been moved to the cold archive
+    if not case:
+        case = archive_service.get_case(case_id)
+        archived = case is not None
 
     if not case:
         return jsonify({'error': 'Case not found'}), 404
@@ -64,7 +126,53 @@ def get_case(case_id):
     if current_user.role == UserRole.RESEARCHER and case.assigned_to != current_user.id:
         return jsonify({'error': 'Access denied'}), 403
 
-    return jsonify({'case': case.to_dict(include_details=True)}), 200
+    etag = make_etag(case.id, case.version, archived, fields, include)
+    if is_fresh(etag):
+        return not_modified(etag)
+
+    response = jsonify({'case': case.to_dict(include=include, fields=fields), 'archived': archived})
+    return with_etag(response, etag)
+
+
+@bp.route('/<int:case_id>/timeline', methods=['GET'])
+@jwt_required()
+def get_case_timeline(case_id):
+    """Get a case's audit trail, newest first, with keyset pagination"""
+    current_user = get_current_user()
+    case = Case.query.get(case_id)
+    base_query = None
+
+    if not case:
+        case = archive_service.get_case(case_id)
+        if case:
+            base_query = archive_service.get_session().query(AuditLog)
+
+    if not case:
+        return jsonify({'error': 'Case not found'}), 404
+
+    if current_user.role == UserRole.RESEARCHER and case.assigned_to != current_user.id:
+        return jsonify({'error': 'Access denied'}), 403
+
+    cursor = None
+    if request.args.get('cursor'):
+        try:
+            cursor = audit_service.decode_cursor(request.args['cursor'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+    limit = min(max(request.args.get('limit', TIMELINE_LIMIT, type=int), 1), TIMELINE_MAX_LIMIT)
+    query = audit_service.query_logs(case_id=case_id, cursor=cursor, base_query=base_query)
+
+    # Fetch one extra row to know whether another page exists
+    logs = query.limit(limit + 1).all()
+    has_more = len(logs) > limit
+    logs = logs[:limit]
+
+    return jsonify({
+        'audit_logs': [log.to_dict() for log in logs],
+        'next_cursor': audit_service.encode_cursor(logs[-1]) if has_more else None,
+        'limit': limit
+    }), 200
 
 
 @bp.route('', methods=['POST'])
@@ -127,6 +235,7 @@ def create_case():
     # Log and notify
     audit_service.log_case_created(case, current_user)
     notification_service.notify_case_created(case)
+    db.session.commit()
 
     return jsonify({
         'message': 'Case created successfully',
@@ -155,6 +264,7 @@ def update_case(case_id):
 
     if changes:
         audit_service.log_case_updated(case, current_user, changes)
+    db.session.commit()
 
     return jsonify({
         'message': 'Case updated successfully',
@@ -193,6 +303,7 @@ def assign_case(case_id):
 
     audit_service.log_case_assigned(case, current_user, researcher)
     notification_service.notify_case_assigned(case, researcher)
+    db.session.commit()
 
     return jsonify({
         'message': 'Case assigned successfully',
@@ -235,6 +346,7 @@ def reassign_case(case_id):
 
     audit_service.log_case_reassigned(case, current_user, old_researcher, new_researcher)
     notification_service.notify_case_reassigned(case, old_researcher, new_researcher)
+    db.session.commit()
 
     return jsonify({
         'message': 'Case reassigned successfully',
@@ -258,11 +370,28 @@ def search_cases():
 
     results = case_service.search_cases(query, current_user)
     pagination = results.paginate(page=page, per_page=per_page, error_out=False)
+    cases = [case.to_dict() for case in pagination.items]
+    total = pagination.total
+
+    # Archived matches follow the live ones, as if they were one result set
+    archived_query = archive_service.get_cases_query()
+    if archived_query is not None:
+        archived_results = case_service.search_cases(query, current_user, base_query=archived_query)
+        archived_total = archived_results.count()
+        offset = max((page - 1) * per_page - pagination.total, 0)
+        remaining = per_page - len(cases)
+
+        if archived_total and remaining > 0:
+            for case in archived_results.offset(offset).limit(remaining):
+                case_data = case.to_dict()
+                case_data['archived'] = True
+                cases.append(case_data)
+        total += archived_total
 
     return jsonify({
-        'cases': [case.to_dict() for case in pagination.items],
-        'total': pagination.total,
-        'pages': pagination.pages,
+        'cases': cases,
+        'total': total,
+        'pages': -(-total // per_page) if per_page > 0 else 0,
         'current_page': page,
         'query': query
     }), 200
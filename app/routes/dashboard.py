@@ -8,6 +8,7 @@ from ..models.user import User
 from ..models.finance_action import FinanceAction
 from ..utils.constants import UserRole, CaseStatus, CaseType, FinanceStatus
 from ..utils.decorators import role_required
+from ..services import archive_service
 
 bp = Blueprint('dashboard', __name__, url_prefix='/api/dashboard')
 
@@ -17,25 +18,30 @@ bp = Blueprint('dashboard', __name__, url_prefix='/api/dashboard')
 @role_required(UserRole.OWNER, UserRole.MANAGER_1, UserRole.MANAGER_2)
 def get_statistics():
     """Get full dashboard statistics"""
+    # Closed cases moved to the archive are counted through their rollups
+    archived = archive_service.get_rollups()
+
     # Total cases
-    total_cases = Case.query.count()
+    total_cases = Case.query.count() + archived['count']
 
     # Cases by status
     cases_by_status = {}
     for status in CaseStatus:
         count = Case.query.filter_by(status=status).count()
         cases_by_status[status.value] = count
+    cases_by_status[CaseStatus.CLOSED.value] += archived['count']
 
     # Cases by type
     cases_by_type = {}
     for case_type in CaseType:
         count = Case.query.filter_by(case_type=case_type).count()
-        cases_by_type[case_type.value] = count
+        cases_by_type[case_type.value] = count + archived['by_type'].get(case_type, 0)
 
     # Total money spent
     total_spent = db.session.query(
         func.sum(Case.amount_approved)
     ).filter(Case.status == CaseStatus.CLOSED).scalar() or 0
+    total_spent += archived['amount']
 
     # Cases this month
     first_day_of_month = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
@@ -57,6 +63,12 @@ def get_statistics():
         Case.updated_at >= first_day_of_month
     ).scalar() or 0
 
+    archived_count, archived_amount = archived['by_month'].get(
+        (first_day_of_month.year, first_day_of_month.month), (0, 0)
+    )
+    closed_this_month += archived_count
+    spent_this_month += archived_amount
+
     # Active researchers
     active_researchers = User.query.filter_by(
         role=UserRole.RESEARCHER,
@@ -96,12 +108,16 @@ def get_statistics():
 def get_cases_summary():
     """Get cases summary by status"""
     summary = []
+    archived = archive_service.get_rollups()
 
     for status in CaseStatus:
         cases = Case.query.filter_by(status=status).order_by(Case.created_at.desc()).limit(5).all()
+        count = Case.query.filter_by(status=status).count()
+        if status == CaseStatus.CLOSED:
+            count += archived['count']
         summary.append({
             'status': status.value,
-            'count': Case.query.filter_by(status=status).count(),
+            'count': count,
             'recent_cases': [c.to_dict() for c in cases]
         })
 
@@ -117,6 +133,7 @@ def get_monthly_spending():
     current_month = datetime.now().month
 
     spending = []
+    archived = archive_service.get_rollups()
 
     for i in range(12):
         month = current_month - i
@@ -142,11 +159,13 @@ def get_monthly_spending():
             extract('month', Case.updated_at) == month
         ).count()
 
+        archived_count, archived_amount = archived['by_month'].get((year, month), (0, 0))
+
         spending.append({
             'year': year,
             'month': month,
-            'total_spent': total,
-            'cases_closed': count
+            'total_spent': total + archived_amount,
+            'cases_closed': count + archived_count
         })
 
     return jsonify({'monthly_spending': list(reversed(spending))}), 200
@@ -158,12 +177,15 @@ def get_monthly_spending():
 def get_researchers_performance():
     """Get researcher performance statistics"""
     researchers = User.query.filter_by(role=UserRole.RESEARCHER, is_active=True).all()
+    archived = archive_service.get_rollups()
 
     performance = []
 
     for researcher in researchers:
+        archived_count = archived['by_researcher'].get(researcher.id, 0)
+
         # Total assigned cases
-        total_assigned = Case.query.filter_by(assigned_to=researcher.id).count()
+        total_assigned = Case.query.filter_by(assigned_to=researcher.id).count() + archived_count
 
         # Active cases
         active_cases = Case.query.filter(
@@ -180,7 +202,7 @@ def get_researchers_performance():
                 CaseStatus.PENDING_PAYMENT,
                 CaseStatus.CLOSED
             ])
-        ).count()
+        ).count() + archived_count
 
         performance.append({
             'researcher': researcher.to_dict(),
@@ -197,11 +219,9 @@ def get_researchers_performance():
 @role_required(UserRole.OWNER, UserRole.MANAGER_1, UserRole.MANAGER_2)
 def get_recent_activity():
     """Get recent case activity"""
-    from ..models.audit_log import AuditLog
+    from ..services import audit_service
 
-    recent_logs = AuditLog.query.order_by(
-        AuditLog.created_at.desc()
-    ).limit(50).all()
+    recent_logs = audit_service.query_logs().limit(50).all()
 
     return jsonify({
         'recent_activity': [log.to_dict() for log in recent_logs]
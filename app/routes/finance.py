@@ -4,11 +4,11 @@ from datetime import datetime
 from ..extensions import db
 from ..models.case import Case
 from ..models.finance_action import FinanceAction
-from ..models.case_image import CaseImage
 from ..utils.constants import UserRole, CaseStatus, FinanceStatus, ImageType
 from ..utils.decorators import role_required, get_current_user
+from ..utils.http_cache import is_fresh, not_modified, with_etag
 from ..utils.helpers import save_uploaded_file
-from ..services import audit_service, notification_service
+from ..services import case_service, audit_service, notification_service, image_service
 
 bp = Blueprint('finance', __name__, url_prefix='/api/finance')
 
@@ -21,18 +21,31 @@ def get_pending_payments():
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
 
+    try:
+        fields, include = case_service.parse_expansion(request.args, default_include=Case.INCLUDES)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
     query = Case.query.filter(
         Case.status == CaseStatus.PENDING_PAYMENT
     ).order_by(Case.updated_at.desc())
 
+    # Answer conditional requests from the page's (id, version) pairs
+    page, per_page = case_service.page_args(page, per_page)
+    etag = case_service.page_etag(query, page, per_page, fields, include)
+    if is_fresh(etag):
+        return not_modified(etag)
+
+    query = case_service.with_includes(query, include)
     pagination = query.paginate(page=page, per_page=per_page, error_out=False)
 
-    return jsonify({
-        'cases': [case.to_dict(include_details=True) for case in pagination.items],
+    response = jsonify({
+        'cases': [case.to_dict(include=include, fields=fields) for case in pagination.items],
         'total': pagination.total,
         'pages': pagination.pages,
         'current_page': page
-    }), 200
+    })
+    return with_etag(response, etag)
 
 
 @bp.route('/cases/<int:case_id>/confirm-ready', methods=['POST'])
@@ -66,10 +79,9 @@ def confirm_ready_to_pay(case_id):
     if 'notes' in data:
         finance_action.notes = data['notes']
 
-    db.session.commit()
-
     audit_service.log_payment_confirmed(case, current_user)
     notification_service.notify_payment_confirmed(case)
+    db.session.commit()
 
     return jsonify({
         'message': 'Payment confirmed as ready',
@@ -112,13 +124,12 @@ def mark_as_paid(case_id):
                 return jsonify({'error': 'Invalid file type'}), 400
 
             # Also save as case image
-            case_image = CaseImage(
+            image_service.create_case_image(
                 case_id=case.id,
                 image_path=proof_path,
                 image_type=ImageType.PAYMENT_PROOF,
                 uploaded_by=current_user.id
             )
-            db.session.add(case_image)
     else:
         data = request.get_json() or {}
         notes = data.get('notes')
@@ -134,10 +145,9 @@ def mark_as_paid(case_id):
     # Close the case
     case.status = CaseStatus.CLOSED
 
-    db.session.commit()
-
     audit_service.log_case_closed(case, current_user)
     notification_service.notify_case_closed(case)
+    db.session.commit()
 
     return jsonify({
         'message': 'Case marked as paid and closed',
@@ -1,13 +1,13 @@
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, Response, request, jsonify, send_file
 from flask_jwt_extended import jwt_required
-import os
 from ..extensions import db
 from ..models.case import Case
 from ..models.case_image import CaseImage
 from ..utils.constants import UserRole, ImageType
 from ..utils.decorators import role_required, get_current_user
-from ..utils.helpers import save_uploaded_file, delete_file
-from ..services import audit_service
+from ..utils.helpers import save_uploaded_file, delete_file, get_full_path
+from ..utils.zip_stream import stream_zip, file_entry
+from ..services import audit_service, image_service
 
 bp = Blueprint('images', __name__, url_prefix='/api')
 
@@ -51,13 +51,12 @@ def upload_images(case_id):
         if file:
             image_path = save_uploaded_file(file, image_type)
             if image_path:
-                case_image = CaseImage(
+                case_image = image_service.create_case_image(
                     case_id=case.id,
                     image_path=image_path,
                     image_type=image_type,
                     uploaded_by=current_user.id
                 )
-                db.session.add(case_image)
                 uploaded_images.append(case_image)
 
                 # Log
@@ -92,6 +91,32 @@ def get_case_images(case_id):
     }), 200
 
 
+@bp.route('/cases/<int:case_id>/images/archive', methods=['GET'])
+@jwt_required()
+def download_case_archive(case_id):
+    """Download every file of a case as a ZIP archive streamed from disk"""
+    current_user = get_current_user()
+    case = Case.query.get(case_id)
+
+    if not case:
+        return jsonify({'error': 'Case not found'}), 404
+
+    # Check permissions
+    if current_user.role == UserRole.RESEARCHER and case.assigned_to != current_user.id:
+        return jsonify({'error': 'Access denied'}), 403
+
+    files = image_service.get_archive_files(case)
+
+    # Files are only opened while the response is being sent; missing ones are skipped
+    entries = (entry for entry in (file_entry(name, path) for name, path in files) if entry)
+
+    return Response(
+        stream_zip(entries),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename="{case.case_number}.zip"'}
+    )
+
+
 @bp.route('/images/<int:image_id>', methods=['GET'])
 @jwt_required()
 def get_image(image_id):
@@ -108,15 +133,17 @@ def get_image(image_id):
     if current_user.role == UserRole.RESEARCHER and case.assigned_to != current_user.id:
         return jsonify({'error': 'Access denied'}), 403
 
-    # Construct full path
-    base_path = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-    full_path = os.path.join(base_path, image.image_path)
-
-    if not os.path.exists(full_path):
+    # Stored metadata saves a type sniff, and the digest makes a strong ETag
+    try:
+        return send_file(
+            get_full_path(image.image_path),
+            mimetype=image.mime_type,
+            etag=image.sha256 or True,
+            conditional=True
+        )
+    except FileNotFoundError:
         return jsonify({'error': 'File not found'}), 404
 
-    return send_file(full_path)
-
 
 @bp.route('/images/<int:image_id>/info', methods=['GET'])
 @jwt_required()
@@ -155,9 +182,6 @@ def delete_image(image_id):
         if image.uploaded_by != current_user.id:
             return jsonify({'error': 'You can only delete your own images'}), 403
 
-    # Delete file from storage
-    delete_file(image.image_path)
-
     # Log before deleting from DB
     audit_service.log_image_deleted(case, current_user, image_id)
 
@@ -165,4 +189,8 @@ def delete_image(image_id):
     db.session.delete(image)
     db.session.commit()
 
+    # Delete file from storage once the row is gone, so a failed commit
+    # never leaves a row pointing at a missing file
+    delete_file(image.image_path)
+
     return jsonify({'message': 'Image deleted successfully'}), 200
@@ -1,12 +1,15 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
+from sqlalchemy.orm.attributes import set_committed_value
 from ..extensions import db
 from ..models.notification import Notification
-from ..models.user import User
 from ..utils.decorators import get_current_user
+from ..services import notification_service
 
 bp = Blueprint('notifications', __name__, url_prefix='/api/notifications')
 
+MAX_BULK_IDS = 500
+
 
 @bp.route('/fcm-token', methods=['POST'])
 @jwt_required()
@@ -27,16 +30,8 @@ def register_fcm_token():
     if platform not in ['ios', 'android']:
         platform = 'android'
 
-    # IMPORTANT: Clear this FCM token from any other users first
-    # This ensures one device token is only associated with one user
-    User.query.filter(
-        User.fcm_token == fcm_token,
-        User.id != current_user.id
-    ).update({'fcm_token': None, 'fcm_platform': None})
-
-    # Update current user's FCM token
-    current_user.fcm_token = fcm_token
-    current_user.fcm_platform = platform
+    # Also clears this FCM token from any other user
+    notification_service.set_fcm_token(current_user, fcm_token, platform)
     db.session.commit()
 
     return jsonify({
@@ -51,8 +46,7 @@ def remove_fcm_token():
     """Remove FCM token (on logout)"""
     current_user = get_current_user()
 
-    current_user.fcm_token = None
-    current_user.fcm_platform = None
+    notification_service.clear_fcm_token(current_user)
     db.session.commit()
 
     return jsonify({'message': 'FCM token removed successfully'}), 200
@@ -112,8 +106,9 @@ def mark_as_read(notification_id):
     if notification.user_id != current_user.id:
         return jsonify({'error': 'Access denied'}), 403
 
-    notification.is_read = True
+    notification_service.mark_read(current_user, ids=[notification.id])
     db.session.commit()
+    set_committed_value(notification, 'is_read', True)
 
     return jsonify({
         'message': 'Notification marked as read',
@@ -127,16 +122,69 @@ def mark_all_as_read():
     """Mark all notifications as read"""
     current_user = get_current_user()
 
-    Notification.query.filter_by(
-        user_id=current_user.id,
-        is_read=False
-    ).update({'is_read': True})
-
+    notification_service.mark_read(current_user)
     db.session.commit()
 
     return jsonify({'message': 'All notifications marked as read'}), 200
 
 
+def _parse_bulk_selection(data):
+    """Read `ids` and/or `case_id` from a bulk request body"""
+    if not data:
+        raise ValueError('No data provided')
+
+    ids = data.get('ids')
+    case_id = data.get('case_id')
+
+    if ids is None and case_id is None:
+        raise ValueError('ids or case_id is required')
+
+    if ids is not None:
+        if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+            raise ValueError('ids must be a list of integers')
+        if len(ids) > MAX_BULK_IDS:
+            raise ValueError(f'At most {MAX_BULK_IDS} ids per request')
+
+    if case_id is not None and not isinstance(case_id, int):
+        raise ValueError('case_id must be an integer')
+
+    return ids, case_id
+
+
+@bp.route('/bulk-read', methods=['PUT'])
+@jwt_required()
+def bulk_mark_as_read():
+    """Mark notifications as read by id list or by case"""
+    current_user = get_current_user()
+
+    try:
+        ids, case_id = _parse_bulk_selection(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    count = notification_service.mark_read(current_user, ids=ids, case_id=case_id)
+    db.session.commit()
+
+    return jsonify({'message': 'Notifications marked as read', 'updated': count}), 200
+
+
+@bp.route('/bulk-delete', methods=['POST'])
+@jwt_required()
+def bulk_delete():
+    """Delete notifications by id list or by case"""
+    current_user = get_current_user()
+
+    try:
+        ids, case_id = _parse_bulk_selection(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    count = notification_service.delete_notifications(current_user, ids=ids, case_id=case_id)
+    db.session.commit()
+
+    return jsonify({'message': 'Notifications deleted', 'deleted': count}), 200
+
+
 @bp.route('/<int:notification_id>', methods=['DELETE'])
 @jwt_required()
 def delete_notification(notification_id):
@@ -151,7 +199,7 @@ def delete_notification(notification_id):
     if notification.user_id != current_user.id:
         return jsonify({'error': 'Access denied'}), 403
 
-    db.session.delete(notification)
+    notification_service.delete_notifications(current_user, ids=[notification.id])
     db.session.commit()
 
     return jsonify({'message': 'Notification deleted'}), 200
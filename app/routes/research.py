@@ -3,11 +3,10 @@ from flask_jwt_extended import jwt_required
 from ..extensions import db
 from ..models.case import Case
 from ..models.researcher_report import ResearcherReport
-from ..models.case_image import CaseImage
 from ..utils.constants import UserRole, CaseStatus, Recommendation, ImageType
 from ..utils.decorators import role_required, get_current_user
 from ..utils.helpers import save_uploaded_file
-from ..services import case_service, audit_service, notification_service, approval_service
+from ..services import case_service, audit_service, notification_service, approval_service, image_service
 
 bp = Blueprint('research', __name__, url_prefix='/api/research')
 
@@ -112,13 +111,12 @@ def submit_investigation(case_id):
             if image_file:
                 image_path = save_uploaded_file(image_file, ImageType.INVESTIGATION)
                 if image_path:
-                    case_image = CaseImage(
+                    image_service.create_case_image(
                         case_id=case.id,
                         image_path=image_path,
                         image_type=ImageType.INVESTIGATION,
                         uploaded_by=current_user.id
                     )
-                    db.session.add(case_image)
 
     # Update case status
     case.status = CaseStatus.PENDING_APPROVAL
@@ -126,11 +124,10 @@ def submit_investigation(case_id):
     # Create approval records for required managers
     approval_service.create_approval_records(case)
 
-    db.session.commit()
-
     # Log and notify
     audit_service.log_investigation_submitted(case, current_user)
     notification_service.notify_investigation_submitted(case)
+    db.session.commit()
 
     return jsonify({
         'message': 'Investigation submitted successfully',
@@ -178,9 +175,8 @@ def update_investigation(case_id):
         except ValueError:
             return jsonify({'error': 'Invalid recommendation'}), 400
 
-    db.session.commit()
-
     audit_service.log_investigation_updated(case, current_user)
+    db.session.commit()
 
     return jsonify({
         'message': 'Investigation updated successfully',
@@ -6,6 +6,7 @@ from ..models.case import Case
 from ..utils.constants import UserRole, CaseStatus
 from ..utils.decorators import role_required, get_current_user
 from ..utils.validators import validate_email, validate_username, validate_password
+from ..services import archive_service
 
 bp = Blueprint('users', __name__, url_prefix='/api/users')
 
@@ -139,6 +140,7 @@ def update_user(user_id):
 def list_researchers():
     """List all researchers with their case load"""
     researchers = User.query.filter_by(role=UserRole.RESEARCHER, is_active=True).all()
+    archived = archive_service.get_rollups()
 
     result = []
     for researcher in researchers:
@@ -153,6 +155,7 @@ def list_researchers():
 
         # Count total cases
         total_cases = Case.query.filter_by(assigned_to=researcher.id).count()
+        total_cases += archived['by_researcher'].get(researcher.id, 0)
 
         researcher_data = researcher.to_dict()
         researcher_data['active_cases'] = active_cases
@@ -1,10 +1,14 @@
 from ..extensions import db
 from ..models.manager_approval import ManagerApproval
-from ..models.case import Case
+from ..models.versioning import touch
 from ..utils.constants import (
-    CaseType, CaseStatus, ApprovalDecision, UserRole,
+    CaseType, CaseStatus, ApprovalDecision,
     REQUIRED_MANAGERS_DONATION, REQUIRED_MANAGERS_MEDICAL
 )
+from ..utils.sql import insert_ignore
+
+# Functions here stage changes in the session and never commit; the
+# caller commits once, and the case version guards that commit.
 
 
 def get_required_managers(case_type):
@@ -15,40 +19,126 @@ def get_required_managers(case_type):
         return REQUIRED_MANAGERS_MEDICAL
 
 
-def create_approval_records(case):
-    """Create pending approval records for all required managers"""
-    required_roles = get_required_managers(case.case_type)
+def load_approvals(case):
+    """Load a case's approvals with their managers in one query
+
+    Returns:
+        dict: manager role value -> ManagerApproval
+    """
+    approvals = ManagerApproval.query.options(
+        db.joinedload(ManagerApproval.manager)
+    ).filter(ManagerApproval.case_id == case.id).all()
 
-    for role in required_roles:
-        existing = ManagerApproval.query.filter_by(
+    return {approval.manager_role: approval for approval in approvals}
+
+
+def create_approval_records(case):
+    """Create pending approval records for all required managers
+
+    One INSERT that skips roles which already have a record.
+    """
+    rows = [
+        {
+            'case_id': case.id,
+            'manager_id': None,  # Will be set when manager approves
+            'manager_role': role.value,
+            'decision': ApprovalDecision.PENDING.name
+        }
+        for role in get_required_managers(case.case_type)
+    ]
+
+    dialect_name = db.session.get_bind().dialect.name
+    statement = insert_ignore(ManagerApproval.__table__, dialect_name, ['case_id', 'manager_role'], list(rows[0]))
+    db.session.execute(statement, rows)
+    touch(case)
+
+
+def reset_approvals(case, except_role=None):
+    """Reset approvals to pending with one UPDATE (when a manager rejects)"""
+    statement = db.update(ManagerApproval).where(ManagerApproval.case_id == case.id)
+    if except_role is not None:
+        statement = statement.where(ManagerApproval.manager_role != except_role)
+
+    db.session.execute(statement.values(
+        decision=ApprovalDecision.PENDING,
+        amount_suggested=None,
+        rejection_reason=None,
+        suggestion=None
+    ))
+    touch(case)
+
+
+def _get_or_create_approval(case, user, approvals):
+    approval = approvals.get(user.role.value)
+    if not approval:
+        approval = ManagerApproval(
             case_id=case.id,
-            manager_role=role.value
-        ).first()
+            manager_id=user.id,
+            manager_role=user.role.value
+        )
+        db.session.add(approval)
+        approvals[user.role.value] = approval
+    return approval
+
+
+def record_approval(case, user, amount):
+    """Stage a manager's approval, finalizing the case if it is the last one
+
+    The caller commits once. Any change to the case or its approvals
+    bumps Case.version, so that commit fails with StaleDataError if
+    another manager changed the case since it was read. Finalization
+    therefore happens exactly once.
+
+    Returns:
+        tuple: (approval, finalized, error message or None)
+    """
+    approvals = load_approvals(case)
+
+    # All managers must agree on the same amount
+    for role, other in approvals.items():
+        if role != user.role.value and other.decision == ApprovalDecision.APPROVED \
+                and other.amount_suggested != amount:
+            return None, False, f'Amount must match other approvals. Expected: {other.amount_suggested}'
+
+    approval = _get_or_create_approval(case, user, approvals)
+    approval.manager_id = user.id
+    approval.decision = ApprovalDecision.APPROVED
+    approval.amount_suggested = amount
+    approval.rejection_reason = None
+    approval.suggestion = None
+
+    finalized = _all_approved(case, approvals)
+    if finalized:
+        case.amount_approved = amount
+        case.status = CaseStatus.PENDING_PAYMENT
+
+    return approval, finalized, None
+
 
-        if not existing:
-            approval = ManagerApproval(
-                case_id=case.id,
-                manager_id=None,  # Will be set when manager approves
-                manager_role=role.value,
-                decision=ApprovalDecision.PENDING
-            )
-            db.session.add(approval)
+def record_rejection(case, user, reason, suggestion=None):
+    """Stage a manager's rejection and reset the other approvals to pending
 
-    db.session.commit()
+    Like record_approval, the case version guards the caller's commit.
 
+    Returns:
+        ManagerApproval: The rejecting manager's approval record
+    """
+    # Write the case row first, so its version check runs (and its row
+    # lock is taken) before the approvals are touched, in the same order
+    # as an approval's flush
+    case.status = CaseStatus.REJECTED
+    db.session.flush()
 
-def reset_approvals(case):
-    """Reset all approvals to pending (when one manager rejects)"""
-    approvals = ManagerApproval.query.filter_by(case_id=case.id).all()
+    reset_approvals(case, except_role=user.role.value)
 
-    for approval in approvals:
-        approval.decision = ApprovalDecision.PENDING
-        approval.amount_suggested = None
-        approval.rejection_reason = None
-        approval.suggestion = None
+    approval = _get_or_create_approval(case, user, load_approvals(case))
+    approval.manager_id = user.id
+    approval.decision = ApprovalDecision.REJECTED
+    approval.amount_suggested = None
+    approval.rejection_reason = reason
+    approval.suggestion = suggestion
 
-    case.status = CaseStatus.PENDING_APPROVAL
-    db.session.commit()
+    return approval
 
 
 def can_manager_approve(user, case):
@@ -66,32 +156,25 @@ def can_manager_approve(user, case):
     return True, None
 
 
-def check_all_approved(case):
-    """Check if all required managers have approved"""
-    required_roles = get_required_managers(case.case_type)
-
-    for role in required_roles:
-        approval = ManagerApproval.query.filter_by(
-            case_id=case.id,
-            manager_role=role.value
-        ).first()
+def _all_approved(case, approvals):
+    return all(
+        role.value in approvals and approvals[role.value].decision == ApprovalDecision.APPROVED
+        for role in get_required_managers(case.case_type)
+    )
 
-        if not approval or approval.decision != ApprovalDecision.APPROVED:
-            return False
 
-    return True
+def check_all_approved(case):
+    """Check if all required managers have approved"""
+    return _all_approved(case, load_approvals(case))
 
 
 def get_approval_status(case):
     """Get detailed approval status for a case"""
-    required_roles = get_required_managers(case.case_type)
+    approvals = load_approvals(case)
     status = []
 
-    for role in required_roles:
-        approval = ManagerApproval.query.filter_by(
-            case_id=case.id,
-            manager_role=role.value
-        ).first()
+    for role in get_required_managers(case.case_type):
+        approval = approvals.get(role.value)
 
         status.append({
             'role': role.value,
@@ -101,24 +184,3 @@ def get_approval_status(case):
         })
 
     return status
-
-
-def finalize_approval(case):
-    """Finalize case approval - set amount and status"""
-    approvals = ManagerApproval.query.filter_by(
-        case_id=case.id,
-        decision=ApprovalDecision.APPROVED
-    ).all()
-
-    if not approvals:
-        return False
-
-    # All managers should agree on the same amount
-    # Use the first approval's amount (they should all be the same)
-    amount = approvals[0].amount_suggested
-
-    case.amount_approved = amount
-    case.status = CaseStatus.APPROVED
-    db.session.commit()
-
-    return True
@@ -0,0 +1,332 @@
+import os
+from datetime import datetime
+from flask import current_app, g
+from sqlalchemy.orm import Session
+from ..extensions import db
+from ..models.case import Case
+from ..models.case_image import CaseImage
+from ..models.researcher_report import ResearcherReport
+from ..models.manager_approval import ManagerApproval
+from ..models.finance_action import FinanceAction
+from ..models.audit_log import AuditLog
+from ..models.notification import Notification
+from ..models.user import User
+from ..models.archived_case_rollup import ArchivedCaseRollup
+from ..utils.constants import CaseStatus
+
+
+ARCHIVE_BIND = 'archive'
+
+# Tables holding a case's rows, children first so deletes respect foreign keys
+CHILD_TABLES = [
+    CaseImage.__table__,
+    ResearcherReport.__table__,
+    ManagerApproval.__table__,
+    FinanceAction.__table__,
+    AuditLog.__table__,
+    Notification.__table__,
+]
+
+
+def init_app(app):
+    """Register the archive bind and close per-request archive sessions"""
+    uri = app.config.get('ARCHIVE_DATABASE_URI')
+    if uri:
+        binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+        binds.setdefault(ARCHIVE_BIND, uri)
+        app.config['SQLALCHEMY_BINDS'] = binds
+
+    @app.teardown_appcontext
+    def close_archive_session(exception=None):
+        session = g.pop('archive_session', None)
+        if session is not None:
+            session.close()
+
+
+def get_engine():
+    """Get the archive engine, or None if no archive is configured"""
+    return db.engines.get(ARCHIVE_BIND)
+
+
+def is_available():
+    """Check if an archive exists to read from, without creating the file"""
+    engine = get_engine()
+    if engine is None:
+        return False
+    if engine.dialect.name == 'sqlite':
+        return bool(engine.url.database) and os.path.exists(engine.url.database)
+    return True
+
+
+def get_session():
+    """Get an ORM session on the archive for the current request"""
+    if 'archive_session' not in g:
+        g.archive_session = Session(bind=get_engine())
+    return g.archive_session
+
+
+def ensure_schema():
+    """Create the archive tables (the same schema as the live database)"""
+    from ..utils.schema import ensure_schema as ensure_tables
+
+    engine = get_engine()
+    db.metadata.create_all(engine)
+    ensure_tables(db, engine)
+
+
+def _insertable_columns(table):
+    # Generated columns are computed by the database and cannot be inserted
+    return [column for column in table.columns if column.computed is None]
+
+
+def _select_rows(connection, table, where):
+    columns = _insertable_columns(table)
+    result = connection.execute(db.select(*columns).where(where))
+    return [dict(row._mapping) for row in result]
+
+
+def _replace_rows(connection, table, rows):
+    if rows:
+        connection.execute(table.insert().prefix_with('OR REPLACE'), rows)
+
+
+def copy_rows(table, where):
+    """Copy live rows matching `where` into the same archive table"""
+    rows = _select_rows(db.session.connection(), table, where)
+    with get_engine().begin() as archive:
+        _replace_rows(archive, table, rows)
+
+
+def _months_ago(months, now=None):
+    now = now or datetime.utcnow()
+    year, month = divmod(now.year * 12 + now.month - 1 - months, 12)
+    return now.replace(year=year, month=month + 1, day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _rollup_deltas(case_rows):
+    deltas = {}
+    for row in case_rows:
+        closed_at = row['updated_at'] or row['created_at']
+        key = (row['case_type'], row['assigned_to'], closed_at.year, closed_at.month)
+        count, amount = deltas.get(key, (0, 0.0))
+        deltas[key] = (count + 1, amount + (row['amount_approved'] or 0))
+    return deltas
+
+
+def _apply_rollups(deltas, sign):
+    for (case_type, assigned_to, year, month), (count, amount) in deltas.items():
+        rollup = ArchivedCaseRollup.query.filter_by(
+            case_type=case_type,
+            assigned_to=assigned_to,
+            closed_year=year,
+            closed_month=month
+        ).first()
+
+        if not rollup:
+            rollup = ArchivedCaseRollup(
+                case_type=case_type,
+                assigned_to=assigned_to,
+                closed_year=year,
+                closed_month=month,
+                case_count=0,
+                amount_total=0
+            )
+            db.session.add(rollup)
+
+        rollup.case_count += sign * count
+        rollup.amount_total += sign * amount
+
+        if rollup.case_count <= 0:
+            db.session.delete(rollup)
+
+
+def _newest_row_case_ids():
+    # SQLite (and MySQL after a restart) hand out max(id) + 1, so deleting
+    # the newest row of a table would let its id be reused and collide
+    # with the archived copy. Cases owning a newest row stay until newer
+    # rows exist.
+    case_ids = {db.session.query(db.func.max(Case.id)).scalar()}
+    for table in CHILD_TABLES:
+        newest_id = db.select(db.func.max(table.c.id)).scalar_subquery()
+        case_ids.add(db.session.execute(
+            db.select(table.c.case_id).where(table.c.id == newest_id)
+        ).scalar())
+    case_ids.discard(None)
+    return case_ids
+
+
+def _archive_batch(case_ids):
+    cases_table = Case.__table__
+    users_table = User.__table__
+    hot = db.session.connection()
+
+    case_rows = _select_rows(hot, cases_table, cases_table.c.id.in_(case_ids))
+    child_rows = [
+        (table, _select_rows(hot, table, table.c.case_id.in_(case_ids)))
+        for table in CHILD_TABLES
+    ]
+
+    # Users referenced by the archived rows, so the archived dossiers
+    # still resolve creator/researcher names; credentials are not copied
+    user_ids = {row['created_by'] for row in case_rows} | {row['assigned_to'] for row in case_rows}
+    for table, rows in child_rows:
+        for column in ('user_id', 'uploaded_by', 'researcher_id', 'manager_id', 'finance_manager_id'):
+            if column in table.c:
+                user_ids.update(row[column] for row in rows)
+    user_ids.discard(None)
+    user_rows = _select_rows(hot, users_table, users_table.c.id.in_(user_ids))
+    for row in user_rows:
+        row.update(password_hash='', fcm_token=None, fcm_platform=None)
+
+    # Copy first; replacing makes a rerun after a crash between the two
+    # transactions harmless
+    with get_engine().begin() as archive:
+        _replace_rows(archive, users_table, user_rows)
+        _replace_rows(archive, cases_table, case_rows)
+        for table, rows in child_rows:
+            _replace_rows(archive, table, rows)
+
+    _apply_rollups(_rollup_deltas(case_rows), sign=1)
+    for table in CHILD_TABLES:
+        db.session.execute(table.delete().where(table.c.case_id.in_(case_ids)))
+    db.session.execute(cases_table.delete().where(cases_table.c.id.in_(case_ids)))
+    db.session.commit()
+
+    return len(case_rows)
+
+
+def archive_closed_cases(months=None, batch_size=200, limit=None):
+    """Move cases closed more than `months` months ago to the archive
+
+    Each batch is copied to the archive in one transaction, then removed
+    from the live tables together with the rollup update in another.
+
+    Returns:
+        int: Number of cases archived
+    """
+    if months is None:
+        months = current_app.config['ARCHIVE_AFTER_MONTHS']
+
+    ensure_schema()
+    cutoff = _months_ago(months)
+    keep_ids = _newest_row_case_ids()
+    archived = 0
+
+    while limit is None or archived < limit:
+        size = batch_size if limit is None else min(batch_size, limit - archived)
+        case_ids = db.session.execute(
+            db.select(Case.id)
+            .where(Case.status == CaseStatus.CLOSED, Case.updated_at < cutoff, Case.id.notin_(keep_ids))
+            .order_by(Case.id)
+            .limit(size)
+        ).scalars().all()
+
+        if not case_ids:
+            break
+
+        archived += _archive_batch(case_ids)
+
+    db.session.close()
+    return archived
+
+
+def restore_case(case_number):
+    """Move an archived case and its rows back into the live tables
+
+    Returns:
+        bool: True if the case was found in the archive and restored
+
+    Raises:
+        ValueError: If a different live case already uses its id
+    """
+    if not is_available():
+        return False
+
+    cases_table = Case.__table__
+    engine = get_engine()
+
+    with engine.connect() as archive:
+        case_rows = _select_rows(archive, cases_table, cases_table.c.case_number == case_number)
+        if not case_rows:
+            return False
+        case_id = case_rows[0]['id']
+        child_rows = [
+            (table, _select_rows(archive, table, table.c.case_id == case_id))
+            for table in CHILD_TABLES
+        ]
+
+    # A crash after this commit leaves the case in both databases; a
+    # rerun then only has to clear it from the archive
+    live_case = db.session.get(Case, case_id)
+    if live_case and live_case.case_number != case_number:
+        raise ValueError(f'Case id {case_id} is already used by {live_case.case_number}')
+
+    if not live_case:
+        db.session.execute(cases_table.insert(), case_rows)
+        for table, rows in child_rows:
+            if rows:
+                db.session.execute(table.insert(), rows)
+        _apply_rollups(_rollup_deltas(case_rows), sign=-1)
+        db.session.commit()
+
+    with engine.begin() as archive:
+        for table in CHILD_TABLES:
+            archive.execute(table.delete().where(table.c.case_id == case_id))
+        archive.execute(cases_table.delete().where(cases_table.c.id == case_id))
+
+    return True
+
+
+def get_case(case_id):
+    """Load an archived case (with lazy-loading relationships), or None"""
+    if not is_available():
+        return None
+    return get_session().get(Case, case_id)
+
+
+def get_cases_query():
+    """Query archived cases through the archive session, or None"""
+    if not is_available():
+        return None
+    return get_session().query(Case)
+
+
+def last_case_number(pattern):
+    """Get the newest archived case number matching a LIKE pattern"""
+    if not is_available():
+        return None
+    return get_session().query(Case.case_number).filter(
+        Case.case_number.like(pattern)
+    ).order_by(Case.id.desc()).limit(1).scalar()
+
+
+def get_rollups():
+    """Summarize archived case totals for the dashboard
+
+    Returns:
+        dict: total count and amount, plus breakdowns by type,
+        (year, month) and researcher
+    """
+    rows = db.session.query(
+        ArchivedCaseRollup.case_type,
+        ArchivedCaseRollup.assigned_to,
+        ArchivedCaseRollup.closed_year,
+        ArchivedCaseRollup.closed_month,
+        ArchivedCaseRollup.case_count,
+        ArchivedCaseRollup.amount_total
+    ).all()
+
+    rollups = {'count': 0, 'amount': 0, 'by_type': {}, 'by_month': {}, 'by_researcher': {}}
+
+    for case_type, assigned_to, year, month, count, amount in rows:
+        rollups['count'] += count
+        rollups['amount'] += amount
+        rollups['by_type'][case_type] = rollups['by_type'].get(case_type, 0) + count
+
+        month_count, month_amount = rollups['by_month'].get((year, month), (0, 0))
+        rollups['by_month'][(year, month)] = (month_count + count, month_amount + amount)
+
+        if assigned_to:
+            rollups['by_researcher'][assigned_to] = rollups['by_researcher'].get(assigned_to, 0) + count
+
+    return rollups
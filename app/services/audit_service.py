@@ -1,20 +1,25 @@
+import base64
+from datetime import datetime
 from ..extensions import db
 from ..models.audit_log import AuditLog
 from ..utils.constants import AuditAction
 
 
-def log_action(case_id, user_id, action, details=None):
-    """Create an audit log entry"""
+def log_action(case_id, user, action, details=None):
+    """Stage an audit log entry with a snapshot of the acting user
+
+    The entry is saved by the caller's commit, together with the change
+    it records.
+    """
     audit_log = AuditLog(
         case_id=case_id,
-        user_id=user_id,
         action=action
     )
+    audit_log.set_actor(user)
     if details:
         audit_log.set_details(details)
 
     db.session.add(audit_log)
-    db.session.commit()
     return audit_log
 
 
@@ -22,7 +27,7 @@ def log_case_created(case, user):
     """Log case creation"""
     return log_action(
         case_id=case.id,
-        user_id=user.id,
+        user=user,
         action=AuditAction.CASE_CREATED,
         details={
             'case_number': case.case_number,
@@ -36,7 +41,7 @@ def log_case_updated(case, user, changes):
     """Log case update"""
     return log_action(
         case_id=case.id,
-        user_id=user.id,
+        user=user,
         action=AuditAction.CASE_UPDATED,
         details={
             'changes': changes,
@@ -49,7 +54,7 @@ def log_case_assigned(case, user, researcher):
     """Log case assignment"""
     return log_action(
         case_id=case.id,
-        user_id=user.id,
+        user=user,
         action=AuditAction.CASE_ASSIGNED,
         details={
             'assigned_to': researcher.full_name,
@@ -62,7 +67,7 @@ def log_case_reassigned(case, user, old_researcher, new_researcher):
     """Log case reassignment"""
     return log_action(
         case_id=case.id,
-        user_id=user.id,
+        user=user,
         action=AuditAction.CASE_REASSIGNED,
         details={
             'from_researcher': old_researcher.full_name if old_researcher else None,
@@ -76,7 +81,7 @@ def log_investigation_submitted(case, researcher):
     """Log investigation submission"""
     return log_action(
         case_id=case.id,
-        user_id=researcher.id,
+        user=researcher,
         action=AuditAction.INVESTIGATION_SUBMITTED,
         details={
             'researcher': researcher.full_name,
@@ -89,7 +94,7 @@ def log_investigation_updated(case, researcher):
     """Log investigation update"""
     return log_action(
         case_id=case.id,
-        user_id=researcher.id,
+        user=researcher,
         action=AuditAction.INVESTIGATION_UPDATED,
         details={
             'researcher': researcher.full_name
@@ -101,7 +106,7 @@ def log_case_approved(case, manager, amount):
     """Log case approval"""
     return log_action(
         case_id=case.id,
-        user_id=manager.id,
+        user=manager,
         action=AuditAction.CASE_APPROVED,
         details={
             'manager': manager.full_name,
@@ -115,7 +120,7 @@ def log_case_rejected(case, manager, reason, suggestion):
     """Log case rejection"""
     return log_action(
         case_id=case.id,
-        user_id=manager.id,
+        user=manager,
         action=AuditAction.CASE_REJECTED,
         details={
             'manager': manager.full_name,
@@ -130,7 +135,7 @@ def log_payment_confirmed(case, finance_manager):
     """Log payment confirmation"""
     return log_action(
         case_id=case.id,
-        user_id=finance_manager.id,
+        user=finance_manager,
         action=AuditAction.PAYMENT_CONFIRMED,
         details={
             'finance_manager': finance_manager.full_name,
@@ -143,7 +148,7 @@ def log_case_closed(case, user):
     """Log case closure"""
     return log_action(
         case_id=case.id,
-        user_id=user.id,
+        user=user,
         action=AuditAction.CASE_CLOSED,
         details={
             'closed_by': user.full_name,
@@ -156,7 +161,7 @@ def log_image_uploaded(case, user, image_type):
     """Log image upload"""
     return log_action(
         case_id=case.id,
-        user_id=user.id,
+        user=user,
         action=AuditAction.IMAGE_UPLOADED,
         details={
             'uploaded_by': user.full_name,
@@ -169,10 +174,111 @@ def log_image_deleted(case, user, image_id):
     """Log image deletion"""
     return log_action(
         case_id=case.id,
-        user_id=user.id,
+        user=user,
         action=AuditAction.IMAGE_DELETED,
         details={
             'deleted_by': user.full_name,
             'image_id': image_id
         }
     )
+
+
+def encode_cursor(log):
+    """Encode the keyset position after a log entry"""
+    raw = f'{log.created_at.isoformat()}|{log.id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Decode a cursor into (created_at, id); raises ValueError if malformed"""
+    try:
+        created_at, log_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(log_id)
+    except ValueError as e:
+        raise ValueError('Invalid cursor') from e
+
+
+def query_logs(case_id=None, user_id=None, action=None, since=None, until=None, cursor=None,
+               manager_role=None, image_type=None, min_amount=None, max_amount=None, base_query=None):
+    """Build an audit log query, newest first, in keyset order
+
+    Each filter is backed by one of the indexes on AuditLog, including
+    the generated columns extracted from details. Rows carry their actor
+    snapshot, so serializing them issues no extra queries. base_query
+    defaults to the live logs; pass one from the archive session to read
+    archived logs.
+    """
+    query = AuditLog.query if base_query is None else base_query
+
+    if case_id is not None:
+        query = query.filter(AuditLog.case_id == case_id)
+    if user_id is not None:
+        query = query.filter(AuditLog.user_id == user_id)
+    if action is not None:
+        query = query.filter(AuditLog.action == action)
+    if since is not None:
+        query = query.filter(AuditLog.created_at >= since)
+    if until is not None:
+        query = query.filter(AuditLog.created_at < until)
+
+    if manager_role is not None:
+        query = query.filter(AuditLog.detail_manager_role == manager_role)
+    if image_type is not None:
+        query = query.filter(AuditLog.detail_image_type == image_type)
+    if min_amount is not None:
+        query = query.filter(AuditLog.detail_amount >= min_amount)
+    if max_amount is not None:
+        query = query.filter(AuditLog.detail_amount <= max_amount)
+
+    if cursor is not None:
+        created_at, log_id = cursor
+        query = query.filter(db.tuple_(AuditLog.created_at, AuditLog.id) < (created_at, log_id))
+
+    return query.order_by(AuditLog.created_at.desc(), AuditLog.id.desc())
+
+
+def backfill_actors(batch_size=1000):
+    """Copy the current user name and role into log rows written before snapshots
+
+    Returns:
+        int: Number of rows updated
+    """
+    from ..models.user import User
+    from ..utils.constants import UserRole
+
+    users = User.__table__
+    logs = AuditLog.__table__
+
+    # Enum columns store member names; snapshots hold the role value
+    role_value = db.case(
+        {role.name: role.value for role in UserRole},
+        value=db.select(users.c.role).where(users.c.id == logs.c.user_id).scalar_subquery()
+    )
+
+    total = 0
+    last_id = 0
+    while True:
+        batch_ids = db.session.execute(
+            db.select(logs.c.id)
+            .where(logs.c.actor_name.is_(None), logs.c.id > last_id)
+            .order_by(logs.c.id)
+            .limit(batch_size)
+        ).scalars().all()
+
+        if not batch_ids:
+            break
+
+        result = db.session.execute(
+            logs.update()
+            .where(logs.c.id.in_(batch_ids))
+            .values(
+                actor_name=db.select(users.c.full_name).where(users.c.id == logs.c.user_id).scalar_subquery(),
+                actor_role=role_value
+            )
+        )
+        db.session.commit()
+
+        total += result.rowcount
+        last_id = batch_ids[-1]
+
+    return total
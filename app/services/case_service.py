@@ -1,8 +1,15 @@
 from datetime import datetime
+from sqlalchemy.exc import IntegrityError
 from ..extensions import db
 from ..models.case import Case
 from ..utils.constants import CaseType, CaseStatus
 from ..utils.helpers import generate_case_number
+from ..utils.http_cache import make_etag
+
+# Functions here stage changes in the session; the route commits once
+# per request.
+
+CASE_NUMBER_ATTEMPTS = 5
 
 
 def create_case(case_type, created_by, screenshot_path=None, beneficiary_data=None):
@@ -27,10 +34,20 @@ def create_case(case_type, created_by, screenshot_path=None, beneficiary_data=No
                 case.beneficiary_id_number, case.beneficiary_address]):
             case.status = CaseStatus.PENDING_DATA
 
-    db.session.add(case)
-    db.session.commit()
-
-    return case
+    # Flush for the id the audit entry and notifications refer to. Two
+    # requests can pick the same number; the later insert then fails on
+    # the unique index and takes the next one. Nothing else is staged
+    # yet, so rolling back loses nothing.
+    for attempt in range(CASE_NUMBER_ATTEMPTS):
+        db.session.add(case)
+        try:
+            db.session.flush()
+            return case
+        except IntegrityError:
+            db.session.rollback()
+            if attempt == CASE_NUMBER_ATTEMPTS - 1:
+                raise
+            case.case_number = generate_case_number(case_type, db)
 
 
 def update_case(case, data):
@@ -59,7 +76,6 @@ def update_case(case, data):
             changes['case_type'] = {'from': case.case_type.value, 'to': new_type.value}
             case.case_type = new_type
 
-    db.session.commit()
     return changes
 
 
@@ -67,39 +83,33 @@ def assign_case(case, researcher_id):
     """Assign case to a researcher"""
     case.assigned_to = researcher_id
     case.status = CaseStatus.ASSIGNED
-    db.session.commit()
 
 
 def reassign_case(case, new_researcher_id):
     """Reassign case to a different researcher"""
     old_researcher_id = case.assigned_to
     case.assigned_to = new_researcher_id
-    db.session.commit()
     return old_researcher_id
 
 
 def move_to_investigating(case):
     """Move case to investigating status"""
     case.status = CaseStatus.INVESTIGATING
-    db.session.commit()
 
 
 def move_to_pending_approval(case):
     """Move case to pending approval status"""
     case.status = CaseStatus.PENDING_APPROVAL
-    db.session.commit()
 
 
 def move_to_pending_payment(case):
     """Move case to pending payment status"""
     case.status = CaseStatus.PENDING_PAYMENT
-    db.session.commit()
 
 
 def close_case(case):
     """Close the case"""
     case.status = CaseStatus.CLOSED
-    db.session.commit()
 
 
 def get_cases_for_user(user):
@@ -114,15 +124,37 @@ def get_cases_for_user(user):
     return Case.query.order_by(Case.created_at.desc())
 
 
-def search_cases(query_string, user):
-    """Search cases by various fields"""
+def filter_cases(query, status=None, case_type=None):
+    """Apply the status/type list filters; unknown values are ignored"""
+    if status:
+        try:
+            query = query.filter(Case.status == CaseStatus(status))
+        except ValueError:
+            pass
+
+    if case_type:
+        try:
+            query = query.filter(Case.case_type == CaseType(case_type))
+        except ValueError:
+            pass
+
+    return query
+
+
+def search_cases(query_string, user, base_query=None):
+    """Search cases by various fields
+
+    base_query defaults to the live cases; pass a query from another
+    session (e.g. the archive) to search there instead.
+    """
     from ..utils.constants import UserRole
 
-    base_query = Case.query
+    if base_query is None:
+        base_query = Case.query
 
     # Filter for researchers
     if user.role == UserRole.RESEARCHER:
-        base_query = base_query.filter_by(assigned_to=user.id)
+        base_query = base_query.filter(Case.assigned_to == user.id)
 
     # Search across multiple fields
     search = f'%{query_string}%'
@@ -137,3 +169,78 @@ def search_cases(query_string, user):
     ).order_by(Case.created_at.desc())
 
     return results
+
+
+def parse_expansion(args, default_include=()):
+    """Read sparse fieldsets from query args: ?fields=a,b&include=images,report
+
+    Returns:
+        tuple: (fields or None, tuple of include names)
+
+    Raises:
+        ValueError: On unknown field or include names
+    """
+    fields = None
+    if args.get('fields'):
+        fields = [name.strip() for name in args['fields'].split(',') if name.strip()]
+        unknown = [name for name in fields if name not in Case.FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+    if 'include' not in args:
+        return fields, tuple(default_include)
+
+    include = tuple(name.strip() for name in args['include'].split(',') if name.strip())
+    unknown = [name for name in include if name not in Case.INCLUDES]
+    if unknown:
+        raise ValueError(f"Unknown include: {', '.join(unknown)}")
+
+    return fields, include
+
+
+def with_includes(query, include):
+    """Eager-load only the relationships named in include"""
+    from ..models.case_image import CaseImage
+    from ..models.manager_approval import ManagerApproval
+    from ..models.researcher_report import ResearcherReport
+    from ..models.finance_action import FinanceAction
+
+    # Each relationship plus the user its to_dict names
+    loaders = {
+        'creator': db.selectinload(Case.creator),
+        'researcher': db.selectinload(Case.researcher),
+        'images': db.selectinload(Case.images).selectinload(CaseImage.uploader),
+        'report': db.selectinload(Case.report).selectinload(ResearcherReport.researcher),
+        'approvals': db.selectinload(Case.approvals).selectinload(ManagerApproval.manager),
+        'finance': db.selectinload(Case.finance_action).selectinload(FinanceAction.finance_manager),
+        'timeline': db.selectinload(Case.audit_logs),
+    }
+
+    options = [loaders[name] for name in include]
+    return query.options(*options) if options else query
+
+
+def get_case_version(case_id):
+    """Look up (version, assigned_to) for a live case by primary key, or None"""
+    return db.session.query(Case.version, Case.assigned_to).filter(Case.id == case_id).first()
+
+
+def page_args(page, per_page, default_per_page=20):
+    """Normalize page arguments the way paginate(error_out=False) does"""
+    return max(page, 1), per_page if per_page > 0 else default_per_page
+
+
+def page_etag(query, page, per_page, *variant):
+    """ETag for one page of a case query, from (id, version) pairs only
+
+    One query over the same filters and order as the page: no relationship
+    is loaded and nothing is serialized.
+    """
+    rows = query.with_entities(Case.id, Case.version, db.func.count().over()).limit(
+        per_page
+    ).offset((page - 1) * per_page).all()
+
+    total = rows[0][2] if rows else query.order_by(None).count()
+    versions = ','.join(f'{case_id}:{version}' for case_id, version, _ in rows)
+
+    return make_etag(page, per_page, total, versions, *variant)
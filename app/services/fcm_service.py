@@ -1,6 +1,14 @@
+import logging
 import os
+import time
 import firebase_admin
 from firebase_admin import credentials, messaging
+from ..middleware import metrics
+
+logger = logging.getLogger(__name__)
+# Successful sends are the bulk of push logging; sample them with
+# LOG_SAMPLE_RATES
+sent_logger = logging.getLogger(f'{__name__}.sent')
 
 # Initialize Firebase Admin SDK
 _firebase_app = None
@@ -29,15 +37,15 @@ def init_firebase():
     if cred_path:
         cred = credentials.Certificate(cred_path)
         _firebase_app = firebase_admin.initialize_app(cred)
-        print(f"Firebase initialized with credentials from: {cred_path}")
+        logger.info('Firebase initialized with credentials from %s', cred_path)
     else:
         # Try to initialize without credentials (for environments with default credentials)
         try:
             _firebase_app = firebase_admin.initialize_app()
-            print("Firebase initialized with default credentials")
+            logger.info('Firebase initialized with default credentials')
         except Exception as e:
-            print(f"Warning: Could not initialize Firebase: {e}")
-            print("Push notifications will not work until Firebase is configured.")
+            logger.warning('Could not initialize Firebase, push notifications will not work '
+                           'until it is configured: %s', e)
             return None
 
     return _firebase_app
@@ -58,13 +66,17 @@ def send_push_notification(fcm_token, title, body, data=None, platform='android'
         bool: True if successful, False otherwise
     """
     if not fcm_token:
+        metrics.observe_fcm_send('skipped')
         return False
 
     # Initialize Firebase if not already done
     if init_firebase() is None:
-        print("Firebase not initialized, skipping push notification")
+        logger.info('Firebase not initialized, skipping push notification')
+        metrics.observe_fcm_send('skipped')
         return False
 
+    started = time.perf_counter()
+
     try:
         # Create the message
         message = messaging.Message(
@@ -104,15 +116,18 @@ def send_push_notification(fcm_token, title, body, data=None, platform='android'
 
         # Send the message
         response = messaging.send(message)
-        print(f"Successfully sent push notification: {response}")
+        metrics.observe_fcm_send('success', time.perf_counter() - started)
+        sent_logger.info('Sent push notification %s', response)
         return True
 
     except messaging.UnregisteredError:
-        print(f"FCM token is no longer valid: {fcm_token[:20]}...")
+        metrics.observe_fcm_send('failure', time.perf_counter() - started)
+        logger.info('FCM token is no longer valid: %s...', fcm_token[:20])
         # Token is invalid, should be removed from database
         return False
     except Exception as e:
-        print(f"Error sending push notification: {e}")
+        metrics.observe_fcm_send('failure', time.perf_counter() - started)
+        logger.warning('Error sending push notification: %s', e)
         return False
 
 
@@ -0,0 +1,87 @@
+import os
+from ..extensions import db
+from ..models.case_image import CaseImage
+from ..utils.file_metadata import extract_metadata
+from ..utils.helpers import get_full_path
+
+
+def read_metadata(image_path):
+    """Read metadata for a stored upload, or None if the file is missing"""
+    try:
+        return extract_metadata(get_full_path(image_path))
+    except OSError:
+        return None
+
+
+def create_case_image(case_id, image_path, image_type, uploaded_by):
+    """Create a case image record with its file metadata"""
+    case_image = CaseImage(
+        case_id=case_id,
+        image_path=image_path,
+        image_type=image_type,
+        uploaded_by=uploaded_by
+    )
+
+    metadata = read_metadata(image_path)
+    if metadata:
+        case_image.set_metadata(metadata)
+
+    db.session.add(case_image)
+    return case_image
+
+
+def get_archive_files(case):
+    """List (archive name, full path) pairs for every stored file of a case"""
+    files = []
+    seen = set()
+
+    if case.initial_screenshot:
+        name = os.path.basename(case.initial_screenshot)
+        files.append((f'initial_screenshot/{name}', get_full_path(case.initial_screenshot)))
+        seen.add(case.initial_screenshot)
+
+    images = CaseImage.query.filter_by(case_id=case.id).order_by(CaseImage.id).all()
+    for image in images:
+        if image.image_path in seen:
+            continue
+        seen.add(image.image_path)
+        name = os.path.basename(image.image_path)
+        files.append((f'{image.image_type.value}/{image.id}_{name}', get_full_path(image.image_path)))
+
+    return files
+
+
+def backfill_metadata(batch_size=500):
+    """Fill metadata for images uploaded before it was captured
+
+    Walks rows without a digest in id order, one batch per transaction.
+    Rows whose file is missing are skipped and counted.
+
+    Returns:
+        dict: Counts of updated and missing rows
+    """
+    updated = 0
+    missing = 0
+    last_id = 0
+
+    while True:
+        images = CaseImage.query.filter(
+            CaseImage.sha256.is_(None),
+            CaseImage.id > last_id
+        ).order_by(CaseImage.id).limit(batch_size).all()
+
+        if not images:
+            break
+
+        for image in images:
+            metadata = read_metadata(image.image_path)
+            if metadata:
+                image.set_metadata(metadata)
+                updated += 1
+            else:
+                missing += 1
+
+        last_id = images[-1].id
+        db.session.commit()
+
+    return {'updated': updated, 'missing': missing}
@@ -1,37 +1,72 @@
+import logging
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
 from ..extensions import db
+from ..middleware import metrics
+from ..middleware.query_instrumentation import timed
+from ..models.case import Case
 from ..models.notification import Notification
 from ..models.user import User
 from ..utils.constants import UserRole
 from .fcm_service import send_push_to_user
+from . import write_coordinator
 
+logger = logging.getLogger(__name__)
 
-def create_notification(user_id, title, message, case_id=None):
-    """Create a notification for a user and send push notification"""
-    # Save to database
+# Session.info key for (user, notification) pairs waiting on the commit
+PENDING_PUSHES = 'pending_pushes'
+
+
+def create_notification(user_id, title, message, case_id=None, case_number=None):
+    """Stage a notification for a user
+
+    The push goes out once the caller's commit succeeds.
+    """
     notification = Notification(
         user_id=user_id,
         title=title,
         message=message,
-        case_id=case_id
+        case_id=case_id,
+        case_number=case_number
     )
     db.session.add(notification)
-    db.session.commit()
 
-    # Send push notification
-    try:
-        user = User.query.get(user_id)
-        if user and user.fcm_token:
-            data = {'notification_id': str(notification.id)}
-            if case_id:
-                data['case_id'] = str(case_id)
-            send_push_to_user(user, title, message, data)
-    except Exception as e:
-        print(f"Error sending push notification: {e}")
+    user = db.session.get(User, user_id)
+    if user and user.fcm_token:
+        db.session.info.setdefault(PENDING_PUSHES, []).append((user, notification))
+        metrics.push_outbox_changed(1)
 
     return notification
 
 
-def notify_managers_1_2(title, message, case_id=None):
+@event.listens_for(Session, 'after_commit')
+def _send_pending_pushes(session):
+    """Send the pushes of the notifications this commit saved"""
+    pending = session.info.pop(PENDING_PUSHES, [])
+    if not pending:
+        return
+
+    with timed('push'):
+        for user, notification in pending:
+            try:
+                data = {'notification_id': str(notification.id)}
+                if notification.case_id:
+                    data['case_id'] = str(notification.case_id)
+                send_push_to_user(user, notification.title, notification.message, data)
+            except Exception:
+                logger.exception('Error sending push for notification %s', notification.id)
+            finally:
+                metrics.push_outbox_changed(-1)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _drop_pending_pushes(session):
+    metrics.push_outbox_changed(-len(session.info.pop(PENDING_PUSHES, [])))
+
+
+def notify_managers_1_2(title, message, case_id=None, case_number=None):
     """Notify manager 1 and 2"""
     managers = User.query.filter(
         User.role.in_([UserRole.MANAGER_1, UserRole.MANAGER_2]),
@@ -39,7 +74,7 @@ def notify_managers_1_2(title, message, case_id=None):
     ).all()
 
     for manager in managers:
-        create_notification(manager.id, title, message, case_id)
+        create_notification(manager.id, title, message, case_id, case_number)
 
 
 def notify_case_created(case):
@@ -47,7 +82,8 @@ def notify_case_created(case):
     notify_managers_1_2(
         title='حالة جديدة',
         message=f'تم إنشاء حالة جديدة برقم {case.case_number}',
-        case_id=case.id
+        case_id=case.id,
+        case_number=case.case_number
     )
 
 
@@ -57,7 +93,8 @@ def notify_case_assigned(case, researcher):
         user_id=researcher.id,
         title='حالة جديدة مُسندة إليك',
         message=f'تم إسناد الحالة رقم {case.case_number} إليك للبحث',
-        case_id=case.id
+        case_id=case.id,
+        case_number=case.case_number
     )
 
 
@@ -68,14 +105,16 @@ def notify_case_reassigned(case, old_researcher, new_researcher):
             user_id=old_researcher.id,
             title='تم إعادة إسناد الحالة',
             message=f'تم إعادة إسناد الحالة رقم {case.case_number} إلى باحث آخر',
-            case_id=case.id
+            case_id=case.id,
+            case_number=case.case_number
         )
 
     create_notification(
         user_id=new_researcher.id,
         title='حالة جديدة مُسندة إليك',
         message=f'تم إسناد الحالة رقم {case.case_number} إليك للبحث',
-        case_id=case.id
+        case_id=case.id,
+        case_number=case.case_number
     )
 
 
@@ -87,7 +126,8 @@ def notify_investigation_submitted(case):
     notify_managers_1_2(
         title='تم تقديم تقرير البحث',
         message=f'تم تقديم تقرير البحث للحالة رقم {case.case_number}',
-        case_id=case.id
+        case_id=case.id,
+        case_number=case.case_number
     )
 
     # Notify manager 3 or 4 based on case type
@@ -102,7 +142,8 @@ def notify_investigation_submitted(case):
             user_id=manager.id,
             title='حالة تحتاج موافقتك',
             message=f'الحالة رقم {case.case_number} تحتاج موافقتك',
-            case_id=case.id
+            case_id=case.id,
+            case_number=case.case_number
         )
 
 
@@ -114,7 +155,8 @@ def notify_case_approved(case):
             user_id=finance_manager.id,
             title='حالة معتمدة تحتاج صرف',
             message=f'الحالة رقم {case.case_number} معتمدة وتحتاج صرف مبلغ {case.amount_approved}',
-            case_id=case.id
+            case_id=case.id,
+            case_number=case.case_number
         )
 
 
@@ -125,7 +167,8 @@ def notify_case_rejected(case, managers_to_notify):
             user_id=manager_id,
             title='تم رفض الحالة',
             message=f'تم رفض الحالة رقم {case.case_number} وتحتاج مراجعة',
-            case_id=case.id
+            case_id=case.id,
+            case_number=case.case_number
         )
 
 
@@ -137,7 +180,8 @@ def notify_payment_confirmed(case):
             user_id=owner.id,
             title='تم تأكيد الدفع',
             message=f'تم تأكيد صرف مبلغ {case.amount_approved} للحالة رقم {case.case_number}',
-            case_id=case.id
+            case_id=case.id,
+            case_number=case.case_number
         )
 
 
@@ -149,12 +193,135 @@ def notify_case_closed(case):
             user_id=owner.id,
             title='تم إغلاق الحالة',
             message=f'تم إغلاق الحالة رقم {case.case_number} بنجاح',
-            case_id=case.id
+            case_id=case.id,
+            case_number=case.case_number
         )
 
     # Notify managers 1 and 2
     notify_managers_1_2(
         title='تم إغلاق الحالة',
         message=f'تم إغلاق الحالة رقم {case.case_number} بنجاح',
-        case_id=case.id
+        case_id=case.id,
+        case_number=case.case_number
     )
+
+
+def mark_read(user, ids=None, case_id=None, wait=True):
+    """Mark a user's notifications as read, by id list and/or case
+
+    Goes through the write coordinator; with wait=False the count is
+    not known and None is returned.
+
+    Returns:
+        int: Number of notifications updated
+    """
+    statement = db.update(Notification).where(
+        *_selection(user, ids, case_id), Notification.is_read == False
+    ).values(is_read=True)
+    return _rowcount(write_coordinator.write(statement, wait=wait))
+
+
+def delete_notifications(user, ids=None, case_id=None, wait=True):
+    """Delete a user's notifications, by id list and/or case
+
+    Returns:
+        int: Number of notifications deleted (None with wait=False)
+    """
+    statement = db.delete(Notification).where(*_selection(user, ids, case_id))
+    return _rowcount(write_coordinator.write(statement, wait=wait))
+
+
+def _selection(user, ids, case_id):
+    conditions = [Notification.user_id == user.id]
+    if ids is not None:
+        conditions.append(Notification.id.in_(ids))
+    if case_id is not None:
+        conditions.append(Notification.case_id == case_id)
+    return conditions
+
+
+def _rowcount(rowcounts):
+    return rowcounts[0] if rowcounts is not None else None
+
+
+def set_fcm_token(user, fcm_token, platform):
+    """Give a device token to the user, taking it from any other user
+
+    One device token is only associated with one user.
+    """
+    write_coordinator.write(
+        db.update(User).where(User.fcm_token == fcm_token, User.id != user.id)
+        .values(fcm_token=None, fcm_platform=None),
+        db.update(User).where(User.id == user.id)
+        .values(fcm_token=fcm_token, fcm_platform=platform),
+        wait=True
+    )
+
+
+def clear_fcm_token(user):
+    """Stop sending pushes to the user's device"""
+    write_coordinator.write(
+        db.update(User).where(User.id == user.id).values(fcm_token=None, fcm_platform=None),
+        wait=True
+    )
+
+
+def prune_read_notifications(days=None, batch_size=1000, archive=False):
+    """Delete (or move to the archive) read notifications older than `days`
+
+    Works in batches of ids so each transaction stays short.
+
+    Returns:
+        int: Number of notifications removed
+    """
+    from . import archive_service
+
+    if days is None:
+        days = current_app.config['NOTIFICATION_RETENTION_DAYS']
+
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    table = Notification.__table__
+    removed = 0
+
+    if archive:
+        archive_service.ensure_schema()
+
+    while True:
+        ids = db.session.execute(
+            db.select(Notification.id)
+            .where(Notification.is_read == True, Notification.created_at < cutoff)
+            .order_by(Notification.id)
+            .limit(batch_size)
+        ).scalars().all()
+
+        if not ids:
+            break
+
+        if archive:
+            archive_service.copy_rows(table, table.c.id.in_(ids))
+
+        db.session.execute(table.delete().where(table.c.id.in_(ids)))
+        db.session.commit()
+        removed += len(ids)
+
+    return removed
+
+
+def backfill_case_numbers():
+    """Copy case numbers onto notifications created before they were stored
+
+    Returns:
+        int: Number of notifications updated
+    """
+    case_number = db.select(Case.case_number).where(
+        Case.id == Notification.case_id
+    ).scalar_subquery()
+
+    result = db.session.execute(
+        db.update(Notification)
+        .where(Notification.case_id.isnot(None), Notification.case_number.is_(None))
+        .values(case_number=case_number)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return result.rowcount
@@ -0,0 +1,146 @@
+import heapq
+import os
+import shutil
+import time
+from ..extensions import db
+from ..models.case import Case
+from ..models.case_image import CaseImage
+from ..models.finance_action import FinanceAction
+from ..utils.helpers import BASE_PATH
+from . import archive_service
+
+
+QUARANTINE_FOLDER = '.quarantine'
+
+
+def _sorted_column(column, dialect_name):
+    """Order by raw code points so SQL order matches Python's sorted()"""
+    if dialect_name == 'postgresql':
+        return column.collate('C')
+    return column
+
+
+def _referenced_paths(prefix, dialect_name):
+    columns = [Case.initial_screenshot, CaseImage.image_path, FinanceAction.proof_image_path]
+
+    selects = [
+        db.select(column.label('path')).where(column.like(f'{prefix}%'))
+        for column in columns
+    ]
+    union = db.union(*selects).subquery()
+    return db.select(union.c.path).order_by(_sorted_column(union.c.path, dialect_name))
+
+
+def _iter_archived_paths(prefix, yield_per):
+    engine = archive_service.get_engine()
+    query = _referenced_paths(prefix, engine.dialect.name)
+    with engine.connect() as connection:
+        for (path,) in connection.execute(query.execution_options(yield_per=yield_per)):
+            yield path
+
+
+def iter_referenced_names(folder, yield_per=1000):
+    """Yield file names referenced from the database for one upload folder, sorted
+
+    Archived cases keep their files under uploads/, so the archive's
+    references are merged in as well.
+    """
+    prefix = f'uploads/{folder}/'
+    query = _referenced_paths(prefix, db.engine.dialect.name)
+    streams = [(path for (path,) in db.session.execute(query.execution_options(yield_per=yield_per)))]
+    if archive_service.is_available():
+        streams.append(_iter_archived_paths(prefix, yield_per))
+
+    for path in heapq.merge(*streams):
+        yield path[len(prefix):]
+
+
+def iter_orphans(folder, grace_seconds):
+    """Merge the sorted directory listing against the sorted referenced names
+
+    Yields (name, size) for files that nothing references and that are
+    older than the grace period, so uploads whose request has not
+    committed yet are left alone.
+    """
+    directory = os.path.join(BASE_PATH, 'uploads', folder)
+    if not os.path.isdir(directory):
+        return
+
+    with os.scandir(directory) as entries:
+        names = sorted(
+            entry.name for entry in entries
+            if entry.is_file(follow_symlinks=False) and not entry.name.startswith('.')
+        )
+
+    cutoff = time.time() - grace_seconds
+    referenced = iter_referenced_names(folder)
+    current_ref = next(referenced, None)
+
+    for name in names:
+        while current_ref is not None and current_ref < name:
+            current_ref = next(referenced, None)
+
+        if current_ref == name:
+            continue
+
+        try:
+            stat = os.stat(os.path.join(directory, name))
+        except FileNotFoundError:
+            continue
+
+        if stat.st_mtime > cutoff:
+            continue
+
+        yield name, stat.st_size
+
+
+def _remove_batch(folder, batch, quarantine):
+    directory = os.path.join(BASE_PATH, 'uploads', folder)
+    quarantine_dir = os.path.join(BASE_PATH, 'uploads', QUARANTINE_FOLDER, folder)
+    if quarantine:
+        os.makedirs(quarantine_dir, exist_ok=True)
+
+    reclaimed = 0
+    for name, size in batch:
+        source = os.path.join(directory, name)
+        try:
+            if quarantine:
+                shutil.move(source, os.path.join(quarantine_dir, name))
+            else:
+                os.remove(source)
+        except FileNotFoundError:
+            continue
+        reclaimed += size
+
+    return reclaimed
+
+
+def collect_folder(folder, grace_seconds=3600, batch_size=500, quarantine=True, dry_run=False):
+    """Remove orphaned uploads from one upload folder
+
+    Orphans are deleted, or moved under uploads/.quarantine/<folder>,
+    in batches of batch_size.
+
+    Returns:
+        dict: Orphan count and reclaimed bytes for the folder
+    """
+    orphans = 0
+    reclaimed = 0
+    batch = []
+
+    for name, size in iter_orphans(folder, grace_seconds):
+        orphans += 1
+        if dry_run:
+            reclaimed += size
+            continue
+
+        batch.append((name, size))
+        if len(batch) >= batch_size:
+            reclaimed += _remove_batch(folder, batch, quarantine)
+            batch = []
+
+    if batch:
+        reclaimed += _remove_batch(folder, batch, quarantine)
+
+    return {'folder': folder, 'orphans': orphans, 'reclaimed_bytes': reclaimed}
+
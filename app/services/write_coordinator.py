@@ -0,0 +1,160 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from flask import current_app
+from ..extensions import db
+
+logger = logging.getLogger(__name__)
+
+# Group commit for small, independent writes (marking notifications read,
+# FCM token changes). With WRITE_COORDINATOR_ENABLED, request threads
+# queue their statements and one background thread per worker process
+# commits them together, so concurrent requests share one transaction
+# (and one fsync) instead of queueing on SQLite's write lock one by one.
+#
+# Only writes that need no other row of the request's unit of work go
+# through here; case changes and their audit entries commit with the
+# request as before.
+
+_STOP = object()
+
+
+class WriteCoordinator:
+    """Background thread committing queued writes in groups
+
+    A group is whatever is queued when the previous commit finishes, plus
+    what arrives within max_delay of its first write, up to max_batch
+    writes; so a write is committed at most max_delay plus one group
+    commit after it is queued, once the queue keeps up.
+    """
+
+    def __init__(self, engine, max_delay=0, max_batch=200):
+        self.engine = engine
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._thread = None
+
+    def submit(self, statements):
+        """Queue statements committed together; returns a Future of their rowcounts"""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((statements, future))
+        return future
+
+    def _ensure_started(self):
+        # Threads do not survive fork, so each worker process starts its
+        # own (with a fresh queue, whose lock may have been held at fork)
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            self._thread = threading.Thread(target=self._run, name='write-coordinator', daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def stop(self, timeout=5):
+        """Commit what is queued and stop the thread"""
+        if self._pid != os.getpid():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._pid = None
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._commit(batch)
+
+    def _commit(self, batch):
+        try:
+            with self.engine.begin() as connection:
+                results = [_execute(connection, statements) for statements, _ in batch]
+        except Exception:
+            # One failing write must not fail the others: commit each
+            # on its own so only the failing one reports the error
+            for statements, future in batch:
+                self._commit_one(statements, future)
+            return
+
+        for (_, future), rowcounts in zip(batch, results):
+            future.set_result(rowcounts)
+
+    def _commit_one(self, statements, future):
+        try:
+            with self.engine.begin() as connection:
+                future.set_result(_execute(connection, statements))
+        except Exception as e:
+            future.set_exception(e)
+
+
+def _execute(connection, statements):
+    return [connection.execute(statement).rowcount for statement in statements]
+
+
+def _log_failure(future):
+    error = future.exception()
+    if error is not None:
+        logger.error('Queued write failed', exc_info=error)
+
+
+def init_app(app):
+    """Create the app's coordinator when WRITE_COORDINATOR_ENABLED is set"""
+    if not app.config.get('WRITE_COORDINATOR_ENABLED'):
+        return
+
+    with app.app_context():
+        coordinator = WriteCoordinator(
+            db.engine,
+            max_delay=app.config['WRITE_COORDINATOR_MAX_DELAY_MS'] / 1000,
+            max_batch=app.config['WRITE_COORDINATOR_MAX_BATCH']
+        )
+    app.extensions['write_coordinator'] = coordinator
+    atexit.register(coordinator.stop)
+
+
+def write(*statements, wait=False):
+    """Run small independent write statements in one transaction
+
+    With the coordinator enabled they are committed with other requests'
+    writes; pass wait=True to block until that commit (read-your-writes).
+    Otherwise they run in the request's session and are committed by the
+    request's own commit.
+
+    Returns:
+        list: Rowcount of each statement, or None when queued without waiting
+    """
+    coordinator = current_app.extensions.get('write_coordinator')
+    if coordinator is None:
+        return [db.session.execute(statement).rowcount for statement in statements]
+
+    future = coordinator.submit(statements)
+    if not wait:
+        # Nobody reads this future, so a failure would otherwise be lost
+        future.add_done_callback(_log_failure)
+        return None
+    return future.result(timeout=current_app.config['WRITE_COORDINATOR_WAIT_TIMEOUT'])
@@ -0,0 +1,111 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+# Engine profiles, chosen with DATABASE_PROFILE:
+#   sqlite - WAL journal, synchronous=NORMAL, a busy timeout so writers
+#            queue for the lock instead of failing with "database is
+#            locked", a memory-mapped file, a larger page cache and
+#            foreign keys enforced; set on every new connection
+#   server - a sized connection pool with pre-ping and recycling, and a
+#            per-statement timeout (PostgreSQL, MySQL)
+#   none   - driver defaults
+#   auto   - sqlite or server, from the database URL
+PROFILES = ('auto', 'sqlite', 'server', 'none')
+
+
+def resolve_profile(uri, profile='auto'):
+    """Get the profile to use for a database URL"""
+    if profile not in PROFILES:
+        raise ValueError(f'Unknown DATABASE_PROFILE {profile!r}, expected one of {", ".join(PROFILES)}')
+    if profile != 'auto':
+        return profile
+    return 'sqlite' if make_url(uri).get_backend_name() == 'sqlite' else 'server'
+
+
+def sqlite_pragmas(config, foreign_keys=True):
+    """PRAGMAs run on each new SQLite connection, in order"""
+    return [
+        ('journal_mode', 'WAL'),
+        # In WAL mode NORMAL only syncs at checkpoints; a power cut can
+        # lose the last commits but never corrupts the database
+        ('synchronous', 'NORMAL'),
+        ('busy_timeout', config['SQLITE_BUSY_TIMEOUT_MS']),
+        ('mmap_size', config['SQLITE_MMAP_SIZE']),
+        # Negative sizes are in KiB rather than pages
+        ('cache_size', -config['SQLITE_CACHE_SIZE_KB']),
+        ('foreign_keys', 'ON' if foreign_keys else 'OFF'),
+    ]
+
+
+def server_engine_options(uri, config):
+    """Pool and timeout options for a server database"""
+    options = {
+        'pool_size': config['DATABASE_POOL_SIZE'],
+        'max_overflow': config['DATABASE_MAX_OVERFLOW'],
+        'pool_timeout': config['DATABASE_POOL_TIMEOUT'],
+        'pool_recycle': config['DATABASE_POOL_RECYCLE'],
+        'pool_pre_ping': True,
+    }
+
+    timeout = config['DATABASE_STATEMENT_TIMEOUT_MS']
+    backend = make_url(uri).get_backend_name()
+    if timeout and backend == 'postgresql':
+        options['connect_args'] = {'options': f'-c statement_timeout={timeout}'}
+    elif timeout and backend in ('mysql', 'mariadb'):
+        # MySQL only limits SELECT statements
+        options['connect_args'] = {'init_command': f'SET SESSION max_execution_time={timeout}'}
+
+    return options
+
+
+def init_app(app):
+    """Set the engine options of the selected profile
+
+    Call before db.init_app, which creates the engines.
+    """
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    profile = resolve_profile(uri, app.config.get('DATABASE_PROFILE', 'auto'))
+    app.extensions['engine_profile'] = profile
+
+    if profile == 'server':
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            **server_engine_options(uri, app.config),
+            **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+        }
+
+
+def _set_pragmas(engine, pragmas):
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas:
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+
+def register_connect_hooks(app, db):
+    """Run the profile's PRAGMAs on new SQLite connections
+
+    Call after db.init_app. The archive bind keeps foreign keys off: its
+    rows are copied in with INSERT OR REPLACE, which would otherwise
+    delete referenced users.
+    """
+    if app.extensions.get('engine_profile') != 'sqlite':
+        return
+
+    with app.app_context():
+        for bind_key, engine in db.engines.items():
+            if engine.dialect.name != 'sqlite':
+                continue
+            _set_pragmas(engine, sqlite_pragmas(app.config, foreign_keys=bind_key is None))
+
+
+def dispose_engines(app, db):
+    """Drop pooled connections inherited from a parent process
+
+    Call in a forked worker before it touches the database. The parent's
+    connections are left open for the parent (close=False).
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
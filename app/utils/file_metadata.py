@@ -0,0 +1,72 @@
+import hashlib
+import mimetypes
+import re
+from PIL import Image, UnidentifiedImageError
+
+
+CHUNK_SIZE = 64 * 1024
+
+PDF_PAGE_PATTERN = re.compile(rb'/Type\s*/Page(?![a-zA-Z])')
+PDF_COUNT_PATTERN = re.compile(rb'/Count\s+(\d+)')
+
+
+def extract_metadata(full_path):
+    """Read a stored upload once and return its metadata
+
+    Returns a dict with file_size, mime_type, width, height, page_count
+    and sha256. Fields that do not apply to the file are None.
+    """
+    metadata = {
+        'file_size': 0,
+        'mime_type': None,
+        'width': None,
+        'height': None,
+        'page_count': None,
+        'sha256': None
+    }
+
+    digest = hashlib.sha256()
+    header = b''
+    page_objects = 0
+    max_count = 0
+    tail = b''
+
+    with open(full_path, 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            metadata['file_size'] += len(chunk)
+            if not header:
+                header = chunk[:8]
+
+            if header.startswith(b'%PDF'):
+                # Keep a small overlap so tokens split across chunks are still found
+                window = tail + chunk
+                page_objects += len(PDF_PAGE_PATTERN.findall(window)) - len(PDF_PAGE_PATTERN.findall(tail))
+                for count in PDF_COUNT_PATTERN.findall(window):
+                    max_count = max(max_count, int(count))
+                tail = chunk[-32:]
+
+    metadata['sha256'] = digest.hexdigest()
+
+    if header.startswith(b'%PDF'):
+        metadata['mime_type'] = 'application/pdf'
+        # Page objects can live inside compressed object streams, in which
+        # case the page tree's /Count is the best remaining hint
+        metadata['page_count'] = page_objects or max_count or None
+        return metadata
+
+    try:
+        # Image.open only parses the header, the pixel data is never decoded
+        with Image.open(full_path) as img:
+            metadata['width'], metadata['height'] = img.size
+            metadata['mime_type'] = Image.MIME.get(img.format)
+    except (UnidentifiedImageError, OSError):
+        pass
+
+    if not metadata['mime_type']:
+        metadata['mime_type'] = mimetypes.guess_type(full_path)[0]
+
+    return metadata
@@ -1,13 +1,20 @@
 import os
+import time
 import uuid
 from datetime import datetime
 from werkzeug.utils import secure_filename
 from flask import current_app
 from .constants import CaseType, ImageType
+from ..middleware import metrics
 
 
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'pdf'}
 
+UPLOAD_FOLDERS = ['screenshots', 'investigations', 'payment_proofs']
+
+# Stored upload paths ('uploads/<folder>/<name>') are relative to the project root
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 
 def allowed_file(filename):
     """Check if file extension is allowed"""
@@ -27,8 +34,16 @@ def generate_case_number(case_type, db):
         Case.case_number.like(f'{prefix}-{year}-%')
     ).order_by(Case.id.desc()).first()
 
-    if last_case:
-        last_number = int(last_case.case_number.split('-')[-1])
+    last_numbers = [last_case.case_number] if last_case else []
+
+    # Archived cases keep their numbers, so they must not be handed out again
+    from ..services import archive_service
+    archived_number = archive_service.last_case_number(f'{prefix}-{year}-%')
+    if archived_number:
+        last_numbers.append(archived_number)
+
+    if last_numbers:
+        last_number = max(int(number.split('-')[-1]) for number in last_numbers)
         new_number = last_number + 1
     else:
         new_number = 1
@@ -52,26 +67,26 @@ def save_uploaded_file(file, image_type):
     else:
         folder = 'investigations'
 
-    upload_folder = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
-        'uploads',
-        folder
-    )
+    upload_folder = os.path.join(BASE_PATH, 'uploads', folder)
 
     os.makedirs(upload_folder, exist_ok=True)
     file_path = os.path.join(upload_folder, unique_filename)
+    started = time.perf_counter()
     file.save(file_path)
+    metrics.observe_upload(image_type, os.path.getsize(file_path), time.perf_counter() - started)
 
     return os.path.join('uploads', folder, unique_filename)
 
 
+def get_full_path(file_path):
+    """Resolve a stored upload path to an absolute filesystem path"""
+    return os.path.join(BASE_PATH, file_path)
+
+
 def delete_file(file_path):
     """Delete a file from storage"""
     if file_path:
-        full_path = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
-            file_path
-        )
+        full_path = get_full_path(file_path)
         if os.path.exists(full_path):
             os.remove(full_path)
             return True
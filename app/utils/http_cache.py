@@ -0,0 +1,30 @@
+import hashlib
+from flask import Response, request
+
+
+def make_etag(*parts):
+    """Hash the parts that determine a representation into an ETag value"""
+    raw = '|'.join(str(part) for part in parts)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def is_fresh(etag):
+    """Check if the client's If-None-Match already has this representation
+
+    If-None-Match uses weak comparison, so tags weakened by compression
+    still match.
+    """
+    return request.if_none_match.contains_weak(etag)
+
+
+def not_modified(etag):
+    """Build a 304 response for a conditional request"""
+    return with_etag(Response(status=304), etag)
+
+
+def with_etag(response, etag):
+    """Set a strong ETag and make clients revalidate before reuse"""
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
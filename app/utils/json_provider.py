@@ -0,0 +1,71 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def _default(obj):
+    """Serialize the types our models hand back besides plain JSON"""
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+class UTF8JSONProvider(DefaultJSONProvider):
+    """JSON provider that writes raw UTF-8 instead of \\uXXXX escapes
+
+    Arabic text is two bytes per character instead of six. Uses orjson
+    when it is installed, otherwise the standard library. Datetimes are
+    written as ISO 8601 and enums as their values in both cases.
+    """
+
+    ensure_ascii = False
+    sort_keys = True
+    use_orjson = orjson is not None
+
+    def dumps(self, obj, **kwargs):
+        if self.use_orjson and not kwargs:
+            return self._orjson_dumps(obj).decode('utf-8')
+
+        kwargs.setdefault('default', _default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if self.use_orjson and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+
+        if self.use_orjson:
+            body = self._orjson_dumps(obj, indent=indent) + b'\n'
+        elif indent:
+            body = self.dumps(obj, indent=2) + '\n'
+        else:
+            body = self.dumps(obj, separators=(',', ':')) + '\n'
+
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+    def _orjson_dumps(self, obj, indent=False):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option)
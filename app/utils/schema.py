@@ -0,0 +1,30 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateColumn
+
+
+def ensure_schema(db, engine=None):
+    """Bring existing tables up to date with the models.
+
+    ``db.create_all()`` only creates missing tables, so columns and indexes
+    added to a model later never reach a database that already exists.
+    This adds the missing columns (nullable, or with a server default)
+    with ``ALTER TABLE`` and creates any missing indexes.
+    """
+    engine = engine or db.engine
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+
+    with engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+
+            existing_columns = {c['name'] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                column_ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column_ddl}'))
+
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
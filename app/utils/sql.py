@@ -0,0 +1,63 @@
+from sqlalchemy import and_, bindparam, exists, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+
+class json_field(FunctionElement):
+    """Scalar field of a JSON column, rendered for the active dialect
+
+    Used as the expression of generated columns, so it renders with
+    literal names, e.g. json_extract(details, '$.amount') on SQLite.
+    """
+    name = 'json_field'
+    inherit_cache = True
+
+    def __init__(self, column_name, key, type_):
+        self.column_name = column_name
+        self.key = key
+        self.type = type_
+        super().__init__()
+
+
+@compiles(json_field)
+def _compile_json_field(element, compiler, **kw):
+    return f"json_extract({element.column_name}, '$.{element.key}')"
+
+
+@compiles(json_field, 'mysql')
+def _compile_json_field_mysql(element, compiler, **kw):
+    return f"json_unquote(json_extract({element.column_name}, '$.{element.key}'))"
+
+
+@compiles(json_field, 'postgresql')
+def _compile_json_field_postgresql(element, compiler, **kw):
+    sql_type = compiler.dialect.type_compiler_instance.process(element.type)
+    return f"CAST(({element.column_name} ->> '{element.key}') AS {sql_type})"
+
+
+def insert_ignore(table, dialect_name, index_elements, columns):
+    """INSERT that skips rows conflicting on a unique key
+
+    ON CONFLICT DO NOTHING on SQLite and PostgreSQL, INSERT IGNORE on
+    MySQL, and INSERT ... SELECT ... WHERE NOT EXISTS elsewhere.
+    ``columns`` are the keys of the rows; pass the rows to ``execute``.
+    """
+    if dialect_name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert(table).on_conflict_do_nothing(index_elements=index_elements)
+
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert(table).on_conflict_do_nothing(index_elements=index_elements)
+
+    if dialect_name in ('mysql', 'mariadb'):
+        return table.insert().prefix_with('IGNORE')
+
+    # Each row is selected only when no row with its key exists yet; a
+    # concurrent insert of the same key can still fail on the unique index
+    params = {name: bindparam(name, type_=table.c[name].type) for name in columns}
+    existing = select(table.c[index_elements[0]]).where(
+        and_(*(table.c[name] == params[name] for name in index_elements))
+    )
+    rows = select(*params.values()).where(~exists(existing))
+    return table.insert().from_select(list(columns), rows)
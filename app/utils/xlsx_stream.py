@@ -0,0 +1,113 @@
+import re
+from datetime import datetime
+from xml.sax.saxutils import escape
+from .zip_stream import stream_zip
+
+
+# Control characters are not allowed in XML 1.0
+ILLEGAL_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+# Text starting with these is run as a formula by Excel and LibreOffice
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+ROWS_PER_CHUNK = 500
+
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+
+ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+
+SHEET_END = '</sheetData></worksheet>'
+
+
+def escape_formula(value):
+    """Prefix user-entered text that a spreadsheet would run as a formula"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _cell(value):
+    if value is None:
+        return '<c/>'
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f'<c><v>{value}</v></c>'
+    if isinstance(value, datetime):
+        value = value.strftime('%Y-%m-%d %H:%M:%S')
+    text = escape(escape_formula(ILLEGAL_XML_CHARS.sub('', str(value))))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _sheet_chunks(headers, rows):
+    yield SHEET_START.encode('utf-8')
+
+    buffer = ['<row>' + ''.join(_cell(h) for h in headers) + '</row>']
+    for row in rows:
+        buffer.append('<row>' + ''.join(_cell(v) for v in row) + '</row>')
+        if len(buffer) >= ROWS_PER_CHUNK:
+            yield ''.join(buffer).encode('utf-8')
+            buffer = []
+
+    buffer.append(SHEET_END)
+    yield ''.join(buffer).encode('utf-8')
+
+
+def stream_xlsx(headers, rows, sheet_name='Sheet1'):
+    """Yield a single-sheet XLSX workbook as byte chunks
+
+    Cells are written as inline strings, so there is no shared-strings
+    table to hold in memory, and the sheet is deflated into the ZIP
+    container as rows arrive.
+    """
+    def part(name, content):
+        return {'arcname': name, 'chunks': [content.encode('utf-8')]}
+
+    entries = [
+        part('[Content_Types].xml', CONTENT_TYPES),
+        part('_rels/.rels', ROOT_RELS),
+        part('xl/workbook.xml', WORKBOOK.format(name=escape(sheet_name))),
+        part('xl/_rels/workbook.xml.rels', WORKBOOK_RELS),
+        {'arcname': 'xl/worksheets/sheet1.xml', 'chunks': _sheet_chunks(headers, rows)},
+    ]
+
+    return stream_zip(entries)
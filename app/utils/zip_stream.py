@@ -0,0 +1,97 @@
+import os
+import time
+import zipfile
+
+
+CHUNK_SIZE = 64 * 1024
+
+# Formats that are already compressed gain nothing from deflate
+COMPRESSED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'pdf', 'zip', 'xlsx'}
+
+
+class _ChunkBuffer:
+    """Write-only sink that ZipFile writes into and the generator drains.
+
+    It has no tell() or seek(), so ZipFile streams: every entry gets a
+    data descriptor and nothing is ever rewritten in place.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def is_compressed(filename):
+    """Check if a file's format is already compressed"""
+    return filename.rsplit('.', 1)[-1].lower() in COMPRESSED_EXTENSIONS
+
+
+def file_entry(arcname, full_path):
+    """Build an archive entry for a file on disk, or None if it is missing"""
+    try:
+        stat = os.stat(full_path)
+    except FileNotFoundError:
+        return None
+
+    def read_chunks():
+        with open(full_path, 'rb') as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+    return {
+        'arcname': arcname,
+        'chunks': read_chunks(),
+        'size': stat.st_size,
+        'mtime': stat.st_mtime,
+        'compress': not is_compressed(arcname)
+    }
+
+
+def stream_zip(entries):
+    """Yield a ZIP archive as byte chunks while it is being built
+
+    Each entry is a dict with 'arcname' and 'chunks' (an iterable of bytes),
+    plus optional 'size' (if known), 'mtime' and 'compress'. Memory use is
+    bounded by one chunk per entry, whatever the archive size, and no
+    temporary files are written.
+    """
+    sink = _ChunkBuffer()
+
+    with zipfile.ZipFile(sink, mode='w', allowZip64=True) as archive:
+        for entry in entries:
+            mtime = time.localtime(entry.get('mtime') or time.time())
+            info = zipfile.ZipInfo(entry['arcname'], date_time=mtime[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED if entry.get('compress', True) else zipfile.ZIP_STORED
+            info.external_attr = 0o644 << 16
+
+            size = entry.get('size')
+            if size is not None:
+                info.file_size = size
+
+            with archive.open(info, mode='w', force_zip64=size is None) as member:
+                for chunk in entry['chunks']:
+                    member.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+
+            data = sink.drain()
+            if data:
+                yield data
+
+    # Central directory
+    yield sink.drain()
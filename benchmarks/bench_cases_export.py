@@ -0,0 +1,57 @@
+"""
+Memory and throughput benchmark for GET /api/cases/export.
+
+Seeds N cases (100k by default) with bulk inserts, then streams the CSV
+and XLSX exports through the test client and reports rows/s, output
+size and peak traced Python allocation while streaming. Peak memory
+should stay flat as --rows grows; only the time should scale.
+
+Run with: python -m benchmarks.bench_cases_export --rows 100000
+"""
+import argparse
+import tracemalloc
+
+from app.extensions import db
+from benchmarks.common import temporary_app, login, bulk_insert_cases, Timer
+
+
+def measure_export(client, headers, export_format):
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    total_bytes = 0
+
+    with Timer() as timer:
+        response = client.get(f'/api/cases/export?format={export_format}', headers=headers, buffered=False)
+        for chunk in response.response:
+            total_bytes += len(chunk)
+        response.close()
+
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return timer.elapsed, total_bytes, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000, help='Number of cases to seed')
+    args = parser.parse_args()
+
+    with temporary_app() as app:
+        with app.app_context():
+            with Timer() as seed_timer:
+                bulk_insert_cases(args.rows)
+            db.session.remove()
+        print(f'Seeded {args.rows} cases in {seed_timer.elapsed:.1f}s')
+
+        client = app.test_client()
+        headers = login(client, 'owner')
+
+        print(f"{'format':<8}{'seconds':>10}{'rows/s':>12}{'MiB out':>10}{'peak MiB':>10}")
+        for export_format in ('csv', 'xlsx'):
+            elapsed, total_bytes, peak = measure_export(client, headers, export_format)
+            print(f'{export_format:<8}{elapsed:>10.2f}{args.rows / elapsed:>12.0f}'
+                  f'{total_bytes / 2**20:>10.1f}{peak / 2**20:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
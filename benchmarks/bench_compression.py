@@ -0,0 +1,80 @@
+"""
+CPU cost versus bytes saved for response compression.
+
+Seeds cases, encodes case-list payloads of several sizes the way the
+API does, then compresses each with gzip and brotli at a few levels.
+Reports microseconds of CPU per KB of input and the share of bytes
+saved, to choose COMPRESSION_GZIP_LEVEL / COMPRESSION_BROTLI_QUALITY
+and COMPRESSION_MIN_SIZE.
+
+Run with: python -m benchmarks.bench_compression --rows 5000
+"""
+import argparse
+import time
+import zlib
+
+from app.extensions import db
+from app.models.case import Case
+from app.middleware import compression
+from benchmarks.common import temporary_app, bulk_insert_cases
+
+PAYLOAD_SIZES = [512, 1024, 4 * 1024, 32 * 1024, 256 * 1024]
+
+
+def codecs():
+    for level in (1, 6, 9):
+        yield f'gzip-{level}', lambda data, level=level: _gzip(data, level)
+    if compression.brotli is not None:
+        for quality in (1, 4, 6, 11):
+            yield f'br-{quality}', lambda data, quality=quality: compression.brotli.compress(data, quality=quality)
+
+
+def _gzip(data, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def payload_of_size(app, case_dicts, size):
+    """Encode the shortest case list at least `size` bytes long"""
+    for count in range(1, len(case_dicts) + 1):
+        data = app.json.dumps({'cases': case_dicts[:count]}).encode('utf-8')
+        if len(data) >= size:
+            return data
+    return data
+
+
+def measure(codec, data, min_seconds=0.2):
+    runs = 0
+    start = time.process_time()
+    while True:
+        compressed = codec(data)
+        runs += 1
+        elapsed = time.process_time() - start
+        if elapsed >= min_seconds:
+            return elapsed / runs, len(compressed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5000, help='Number of cases to seed')
+    args = parser.parse_args()
+
+    with temporary_app() as app:
+        with app.app_context():
+            bulk_insert_cases(args.rows)
+            case_dicts = [case.to_dict() for case in Case.query.order_by(Case.id).limit(2000)]
+            db.session.remove()
+
+        print(f"{'payload':>9}{'codec':>10}{'us/KB':>9}{'out bytes':>11}{'saved':>8}")
+        for size in PAYLOAD_SIZES:
+            data = payload_of_size(app, case_dicts, size)
+            for name, codec in codecs():
+                seconds, out_size = measure(codec, data)
+                per_kb = seconds * 1e6 / (len(data) / 1024)
+                saved = 1 - out_size / len(data)
+                print(f'{len(data):>9}{name:>10}{per_kb:>9.1f}{out_size:>11}{saved:>8.0%}')
+            print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Concurrent reads and writes under each engine profile.
+
+For each profile, seeds a fresh SQLite file, then starts worker
+processes (like gunicorn workers) that all hit the same database for a
+fixed time: readers page through GET /api/cases, writers update a
+case's beneficiary name with PUT /api/cases/<id>, which commits the
+change and its audit entry. Reports throughput, latency percentiles and
+failed requests ("database is locked" surfaces as a 500).
+
+  none   - driver defaults: rollback journal, full fsync
+  sqlite - WAL, synchronous=NORMAL, busy_timeout, mmap, cache, foreign keys
+
+Run with: python -m benchmarks.bench_engine_profiles --readers 4 --writers 4 --seconds 10
+"""
+import argparse
+import multiprocessing
+import random
+import time
+from collections import Counter
+
+from app import create_app
+from app.config import Config
+from app.extensions import db
+from app.models.case import Case
+from app.utils.constants import CaseStatus
+from benchmarks.common import temporary_app, login, bulk_insert_cases, percentile
+
+
+def worker(config, role, case_ids, seconds, seed, barrier, results):
+    app = create_app(type('BenchmarkConfig', (Config,), config))
+    client = app.test_client()
+    headers = login(client, 'manager1')
+    rng = random.Random(seed)
+    latencies = []
+    statuses = Counter()
+
+    barrier.wait()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        if role == 'reader':
+            response = client.get(f'/api/cases?page={rng.randint(1, 50)}&per_page=20', headers=headers)
+        else:
+            case_id = rng.choice(case_ids)
+            response = client.put(f'/api/cases/{case_id}', headers=headers,
+                                  json={'name': f'مستفيد {rng.randint(0, 10 ** 6)}'})
+        latencies.append(time.perf_counter() - start)
+        statuses[response.status_code] += 1
+
+    results.put((role, latencies, dict(statuses)))
+
+
+def run_profile(profile, args):
+    with temporary_app(DATABASE_PROFILE=profile) as app:
+        with app.app_context():
+            bulk_insert_cases(args.rows)
+            case_ids = db.session.execute(
+                db.select(Case.id).where(Case.status != CaseStatus.CLOSED)
+            ).scalars().all()
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+
+        config = {key: app.config[key] for key in
+                  ('SQLALCHEMY_DATABASE_URI', 'ARCHIVE_DATABASE_URI', 'DATABASE_PROFILE')}
+        context = multiprocessing.get_context('fork')
+        roles = ['reader'] * args.readers + ['writer'] * args.writers
+        barrier = context.Barrier(len(roles))
+        results = context.Queue()
+        processes = [
+            context.Process(target=worker, args=(config, role, case_ids, args.seconds, i, barrier, results))
+            for i, role in enumerate(roles)
+        ]
+        for process in processes:
+            process.start()
+        collected = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+    for role in ('reader', 'writer'):
+        latencies = [value for r, values, _ in collected if r == role for value in values]
+        statuses = Counter()
+        for r, _, counts in collected:
+            if r == role:
+                statuses.update(counts)
+        failed = sum(n for code, n in statuses.items() if code >= 500)
+        print(f'{profile:<8}{role + "s":<9}{len(latencies) / args.seconds:>8.0f}'
+              f'{percentile(latencies, 0.5) * 1000:>8.1f}{percentile(latencies, 0.95) * 1000:>8.1f}'
+              f'{percentile(latencies, 0.99) * 1000:>8.1f}{failed:>8}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5000, help='Number of cases to seed')
+    parser.add_argument('--readers', type=int, default=4, help='Reading worker processes')
+    parser.add_argument('--writers', type=int, default=4, help='Writing worker processes')
+    parser.add_argument('--seconds', type=float, default=10, help='Duration per profile')
+    parser.add_argument('--profiles', default='none,sqlite', help='Comma-separated profiles to compare')
+    args = parser.parse_args()
+
+    print(f"{'profile':<8}{'role':<9}{'req/s':>8}{'p50 ms':>8}{'p95 ms':>8}{'p99 ms':>8}{'failed':>8}")
+    for profile in args.profiles.split(','):
+        run_profile(profile, args)
+
+
+if __name__ == '__main__':
+    main()
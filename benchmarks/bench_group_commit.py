@@ -0,0 +1,101 @@
+"""
+Write throughput of per-request commits versus the write coordinator.
+
+Request threads each flip notifications' read flag as fast as they can
+for a fixed time, the way mark-as-read requests do:
+
+  per-request - the statement runs in the thread's session, which
+                commits it (WRITE_COORDINATOR_ENABLED off)
+  grouped     - the statement goes through the write coordinator and the
+                thread waits for its group commit (read-your-writes)
+
+Reports committed writes per second and the latency each caller saw,
+for each engine profile and thread count.
+
+Run with: python -m benchmarks.bench_group_commit --threads 1,8,32 --seconds 5
+"""
+import argparse
+import random
+import threading
+import time
+
+from app.extensions import db
+from app.models.notification import Notification
+from app.models.user import User
+from app.services import write_coordinator
+from benchmarks.common import temporary_app, percentile
+
+NOTIFICATIONS = 10000
+
+
+def seed_notifications():
+    user = User.query.first()
+    db.session.execute(Notification.__table__.insert(), [
+        {'user_id': user.id, 'title': 'bench', 'message': f'notification {i}', 'is_read': False}
+        for i in range(NOTIFICATIONS)
+    ])
+    db.session.commit()
+    return db.session.execute(db.select(Notification.id)).scalars().all()
+
+
+def flip(notification_id):
+    return db.update(Notification).where(Notification.id == notification_id).values(
+        is_read=db.not_(Notification.is_read)
+    )
+
+
+def writer(app, ids, seconds, seed, barrier, latencies):
+    rng = random.Random(seed)
+    barrier.wait()
+    deadline = time.perf_counter() + seconds
+
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        with app.app_context():
+            write_coordinator.write(flip(rng.choice(ids)), wait=True)
+            db.session.commit()
+        latencies.append(time.perf_counter() - start)
+
+
+def run(profile, grouped, threads, seconds):
+    with temporary_app(DATABASE_PROFILE=profile, WRITE_COORDINATOR_ENABLED=grouped) as app:
+        with app.app_context():
+            ids = seed_notifications()
+            db.session.remove()
+
+        barrier = threading.Barrier(threads)
+        latencies = []
+        workers = [
+            threading.Thread(target=writer, args=(app, ids, seconds, i, barrier, latencies))
+            for i in range(threads)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        coordinator = app.extensions.get('write_coordinator')
+        if coordinator is not None:
+            coordinator.stop()
+
+    mode = 'grouped' if grouped else 'per-request'
+    print(f'{profile:<8}{mode:<13}{threads:>8}{len(latencies) / seconds:>10.0f}'
+          f'{percentile(latencies, 0.5) * 1000:>8.2f}{percentile(latencies, 0.99) * 1000:>8.2f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', default='1,8,32', help='Comma-separated thread counts')
+    parser.add_argument('--seconds', type=float, default=5, help='Duration per run')
+    parser.add_argument('--profiles', default='none,sqlite', help='Comma-separated engine profiles')
+    args = parser.parse_args()
+
+    print(f"{'profile':<8}{'mode':<13}{'threads':>8}{'writes/s':>10}{'p50 ms':>8}{'p99 ms':>8}")
+    for profile in args.profiles.split(','):
+        for threads in [int(n) for n in args.threads.split(',')]:
+            for grouped in (False, True):
+                run(profile, grouped, threads, args.seconds)
+
+
+if __name__ == '__main__':
+    main()
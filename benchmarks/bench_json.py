@@ -0,0 +1,74 @@
+"""
+Encode-time and payload-size benchmark for the JSON provider.
+
+Seeds N cases (Arabic names and addresses), serializes a page of case
+dicts with Flask's default provider (ASCII escapes), the UTF-8 provider
+on the standard library and the UTF-8 provider on orjson, then fetches
+GET /api/cases through the test client with each provider.
+
+Run with: python -m benchmarks.bench_json --rows 5000 --per-page 100
+"""
+import argparse
+from flask.json.provider import DefaultJSONProvider
+
+from app.extensions import db
+from app.models.case import Case
+from app.utils import json_provider
+from app.utils.json_provider import UTF8JSONProvider
+from benchmarks.common import temporary_app, login, bulk_insert_cases, Timer
+
+
+class StdlibUTF8JSONProvider(UTF8JSONProvider):
+    use_orjson = False
+
+
+def providers(app):
+    """(label, provider) pairs to compare"""
+    yield 'flask default', DefaultJSONProvider(app)
+    yield 'utf-8 stdlib', StdlibUTF8JSONProvider(app)
+    if json_provider.orjson is not None:
+        yield 'utf-8 orjson', UTF8JSONProvider(app)
+
+
+def encode_loop(provider, payload, repeat):
+    with Timer() as timer:
+        for _ in range(repeat):
+            body = provider.dumps(payload)
+    return timer.elapsed / repeat, len(body.encode('utf-8'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5000, help='Number of cases to seed')
+    parser.add_argument('--per-page', type=int, default=100, help='Cases per list page')
+    parser.add_argument('--repeat', type=int, default=200, help='Encodings per measurement')
+    args = parser.parse_args()
+
+    with temporary_app() as app:
+        with app.app_context():
+            bulk_insert_cases(args.rows)
+            cases = Case.query.order_by(Case.id).limit(args.per_page).all()
+            payload = {'cases': [case.to_dict() for case in cases], 'total': args.rows}
+            db.session.remove()
+
+        client = app.test_client()
+        headers = login(client, 'owner')
+        url = f'/api/cases?per_page={args.per_page}'
+
+        print(f"{'provider':<16}{'encode ms':>11}{'bytes':>10}{'request ms':>12}{'body bytes':>12}")
+        for label, provider in providers(app):
+            app.json = provider
+            encode_seconds, size = encode_loop(provider, payload, args.repeat)
+
+            client.get(url, headers=headers)  # warm up
+            with Timer() as timer:
+                for _ in range(20):
+                    response = client.get(url, headers=headers)
+            body_size = len(response.data)
+
+            print(f'{label:<16}{encode_seconds * 1000:>11.2f}{size:>10}'
+                  f'{timer.elapsed / 20 * 1000:>12.1f}{body_size:>12}')
+
+
+if __name__ == '__main__':
+    main()
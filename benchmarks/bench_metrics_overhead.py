@@ -0,0 +1,74 @@
+"""
+Per-request cost of the Prometheus metrics.
+
+Times the same requests through the test client with METRICS_ENABLED
+off and on (alternating rounds, keeping the fastest of each), and the
+raw cost of one histogram observation. Metrics are kept in process
+memory by default; run with PROMETHEUS_MULTIPROC_DIR set to an empty
+directory to measure the multiprocess (gunicorn) mode, where samples go
+to memory-mapped files:
+
+    PROMETHEUS_MULTIPROC_DIR=$(mktemp -d) python -m benchmarks.bench_metrics_overhead
+
+Run with: python -m benchmarks.bench_metrics_overhead --requests 2000
+"""
+import argparse
+import os
+import time
+
+from app.extensions import db
+from app.middleware import metrics
+from benchmarks.common import temporary_app, login, bulk_insert_cases
+
+ENDPOINTS = [
+    ('unread count', '/api/notifications/unread-count'),
+    ('case list', '/api/cases?per_page=20'),
+]
+
+
+def time_requests(client, headers, path, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        client.get(path, headers=headers)
+    return (time.perf_counter() - start) / count
+
+
+def time_observation(count=100000):
+    child = metrics.HTTP_SECONDS.labels('bench', 'bench.endpoint', 'GET', '200')
+    start = time.perf_counter()
+    for _ in range(count):
+        child.observe(0.01)
+    return (time.perf_counter() - start) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000, help='Requests per endpoint and round')
+    parser.add_argument('--rounds', type=int, default=3, help='Alternating off/on rounds')
+    args = parser.parse_args()
+
+    mode = 'multiprocess' if 'PROMETHEUS_MULTIPROC_DIR' in os.environ else 'in-process'
+    print(f'metrics mode: {mode}')
+    print(f'one histogram observation: {time_observation() * 1e6:.2f} us\n')
+
+    apps = {}
+    with temporary_app(METRICS_ENABLED=False) as off_app, temporary_app(METRICS_ENABLED=True) as on_app:
+        for name, app in (('off', off_app), ('on', on_app)):
+            with app.app_context():
+                bulk_insert_cases(500)
+                db.session.remove()
+            client = app.test_client()
+            apps[name] = (client, login(client, 'manager1'))
+
+        print(f"{'endpoint':<14}{'off us':>10}{'on us':>10}{'overhead':>10}")
+        for label, path in ENDPOINTS:
+            best = {'off': float('inf'), 'on': float('inf')}
+            for _ in range(args.rounds):
+                for name, (client, headers) in apps.items():
+                    best[name] = min(best[name], time_requests(client, headers, path, args.requests))
+            overhead = best['on'] - best['off']
+            print(f"{label:<14}{best['off'] * 1e6:>10.0f}{best['on'] * 1e6:>10.0f}{overhead * 1e6:>+10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Commits and queries per workflow step.
+
+Drives one case through the whole workflow over the API (create, update,
+assign, investigate, three approvals, confirm ready, mark paid) and
+counts, per request, the SQL statements sent and the transactions
+committed. On SQLite every commit is at least one fsync of the journal,
+so the commit count is the fsync count.
+
+Run with: python -m benchmarks.bench_unit_of_work --cases 20
+"""
+import argparse
+import io
+from collections import defaultdict
+
+from PIL import Image
+from sqlalchemy import event
+
+from app.extensions import db
+from benchmarks.common import temporary_app, login, remove_uploaded_files, Timer
+
+
+def png():
+    buffer = io.BytesIO()
+    Image.new('RGB', (40, 30), 'white').save(buffer, 'PNG')
+    buffer.seek(0)
+    return buffer
+
+
+def workflow(client, headers, researcher_id):
+    """Yield (step name, response) for one case, start to finish"""
+    response = client.post('/api/cases', headers=headers['owner'], content_type='multipart/form-data',
+                           data={'case_type': 'donation', 'screenshot': (png(), 's.png')})
+    yield 'create case', response
+    case_id = response.get_json()['case']['id']
+
+    yield 'update case', client.put(f'/api/cases/{case_id}', headers=headers['manager1'],
+                                    json={'name': 'محمد العلي', 'phone': '0500000000'})
+    yield 'assign', client.post(f'/api/cases/{case_id}/assign', headers=headers['manager1'],
+                                json={'researcher_id': researcher_id})
+    yield 'investigate', client.post(
+        f'/api/research/cases/{case_id}/investigation', headers=headers['researcher1'],
+        content_type='multipart/form-data',
+        data={'verified_name': 'محمد العلي', 'recommendation': 'deserves',
+              'images_count': '1', 'image_0': (png(), 'a.png')})
+    for manager in ('manager1', 'manager2', 'manager3'):
+        yield f'approve ({manager})', client.post(f'/api/approvals/cases/{case_id}/approve',
+                                                  headers=headers[manager], json={'amount': 500})
+    yield 'confirm ready', client.post(f'/api/finance/cases/{case_id}/confirm-ready', headers=headers['manager5'], json={})
+    yield 'mark paid', client.post(f'/api/finance/cases/{case_id}/mark-paid', headers=headers['manager5'],
+                                   content_type='multipart/form-data', data={'proof': (png(), 'p.png')})
+    yield 'get case', client.get(f'/api/cases/{case_id}', headers=headers['owner'])
+
+
+def run_workflows(client, headers, researcher_id, cases, counters, totals, order):
+    for _ in range(cases):
+        steps = workflow(client, headers, researcher_id)
+        while True:
+            counters.update(queries=0, commits=0)
+            with Timer() as timer:
+                try:
+                    name, response = next(steps)
+                except StopIteration:
+                    break
+            if response.status_code >= 400:
+                raise SystemExit(f'{name} failed: {response.status_code} {response.get_data(as_text=True)}')
+            if name not in totals:
+                order.append(name)
+            totals[name][0] += counters['queries']
+            totals[name][1] += counters['commits']
+            totals[name][2] += timer.elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cases', type=int, default=20, help='Cases taken through the workflow')
+    args = parser.parse_args()
+
+    with temporary_app() as app:
+        counters = {'queries': 0, 'commits': 0}
+
+        with app.app_context():
+            engine = db.engine
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def count_query(*_):
+            counters['queries'] += 1
+
+        @event.listens_for(engine, 'commit')
+        def count_commit(*_):
+            counters['commits'] += 1
+
+        client = app.test_client()
+        headers = {name: login(client, name) for name in
+                   ('owner', 'manager1', 'manager2', 'manager3', 'manager5', 'researcher1')}
+        researcher_id = client.get('/api/auth/me', headers=headers['researcher1']).get_json()['user']['id']
+
+        totals = defaultdict(lambda: [0, 0, 0.0])
+        order = []
+        try:
+            run_workflows(client, headers, researcher_id, args.cases, counters, totals, order)
+        finally:
+            with app.app_context():
+                remove_uploaded_files()
+
+        print(f"{'step':<20}{'queries':>9}{'commits':>9}{'ms':>8}")
+        sums = [0, 0, 0.0]
+        for name in order:
+            queries, commits, seconds = (value / args.cases for value in totals[name])
+            sums = [sums[0] + queries, sums[1] + commits, sums[2] + seconds]
+            print(f'{name:<20}{queries:>9.1f}{commits:>9.1f}{seconds * 1000:>8.1f}')
+        print(f"{'whole workflow':<20}{sums[0]:>9.1f}{sums[1]:>9.1f}{sums[2] * 1000:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+"""
+Throughput and latency of the gunicorn worker models.
+
+Seeds a temporary database, starts gunicorn with gunicorn.conf.py for
+each worker model, and drives it over HTTP from client threads with a
+mix of case lists, dashboard statistics and case updates (writes).
+Reports req/s, p50/p95/p99 latency and failed requests per model.
+
+Models are given as class:workers[xthreads], e.g. sync:3 or gthread:2x4;
+the defaults are what gunicorn.conf.py derives from this machine's CPUs
+plus a single-process gthread variant.
+
+The client runs on the same machine, so on few cores it competes with
+the server for CPU; compare models against each other, not absolutes.
+
+Run with: python -m benchmarks.bench_worker_models --clients 16 --seconds 15
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+
+from app.extensions import db
+from app.models.case import Case
+from app.utils.constants import CaseStatus
+from benchmarks.common import temporary_app, bulk_insert_cases, percentile, DEFAULT_PASSWORDS
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def default_models():
+    cpus = multiprocessing.cpu_count()
+    return [f'sync:{cpus * 2 + 1}', f'gthread:{cpus + 1}x4', 'gthread:1x8']
+
+
+def parse_model(spec):
+    worker_class, _, size = spec.partition(':')
+    workers, _, threads = size.partition('x')
+    return worker_class, int(workers), int(threads or 1)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(config, model, port):
+    worker_class, workers, threads = model
+    env = dict(
+        os.environ,
+        DATABASE_URL=config['SQLALCHEMY_DATABASE_URI'],
+        ARCHIVE_DATABASE_URL=config['ARCHIVE_DATABASE_URI'],
+        GUNICORN_BIND=f'127.0.0.1:{port}',
+        GUNICORN_WORKER_CLASS=worker_class,
+        WEB_CONCURRENCY=str(workers),
+        GUNICORN_THREADS=str(threads),
+        GUNICORN_ACCESS_LOG='',
+        GUNICORN_LOG_LEVEL='warning',
+        LOG_LEVEL='WARNING',
+    )
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'run:app'],
+        cwd=PROJECT_ROOT, env=env
+    )
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError('gunicorn did not start')
+
+
+def request(connection, method, path, headers, body=None):
+    connection.request(method, path, body=json.dumps(body) if body is not None else None,
+                       headers={**headers, 'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    response.read()
+    return response.status
+
+
+def login(port):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    connection.request('POST', '/api/auth/login', headers={'Content-Type': 'application/json'},
+                       body=json.dumps({'username': 'manager1', 'password': DEFAULT_PASSWORDS['manager1']}))
+    token = json.loads(connection.getresponse().read())['access_token']
+    connection.close()
+    return {'Authorization': f'Bearer {token}'}
+
+
+def client(port, headers, case_ids, write_share, seconds, seed, barrier, latencies, statuses):
+    rng = random.Random(seed)
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    barrier.wait()
+    deadline = time.perf_counter() + seconds
+
+    while time.perf_counter() < deadline:
+        roll = rng.random()
+        start = time.perf_counter()
+        try:
+            if roll < write_share:
+                status = request(connection, 'PUT', f'/api/cases/{rng.choice(case_ids)}', headers,
+                                 {'name': f'مستفيد {rng.randint(0, 10 ** 6)}'})
+            elif roll < 0.8:
+                status = request(connection, 'GET', f'/api/cases?page={rng.randint(1, 50)}&per_page=20', headers)
+            else:
+                status = request(connection, 'GET', '/api/dashboard/statistics', headers)
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+            status = 'error'
+        latencies.append(time.perf_counter() - start)
+        statuses[status] += 1
+
+    connection.close()
+
+
+def run_model(config, case_ids, spec, args):
+    model = parse_model(spec)
+    port = free_port()
+    server = start_server(config, model, port)
+    try:
+        headers = login(port)
+        barrier = threading.Barrier(args.clients)
+        latencies = []
+        statuses = Counter()
+        threads = [
+            threading.Thread(target=client, args=(port, headers, case_ids, args.write_share, args.seconds,
+                                                  i, barrier, latencies, statuses))
+            for i in range(args.clients)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        server.terminate()
+        server.wait()
+
+    failed = sum(n for status, n in statuses.items() if status == 'error' or status >= 500)
+    print(f'{spec:<14}{len(latencies) / args.seconds:>8.0f}{percentile(latencies, 0.5) * 1000:>8.1f}'
+          f'{percentile(latencies, 0.95) * 1000:>8.1f}{percentile(latencies, 0.99) * 1000:>8.1f}{failed:>8}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5000, help='Number of cases to seed')
+    parser.add_argument('--clients', type=int, default=16, help='Concurrent client connections')
+    parser.add_argument('--seconds', type=float, default=15, help='Duration per model')
+    parser.add_argument('--write-share', type=float, default=0.1, help='Share of requests that update a case')
+    parser.add_argument('--models', default=','.join(default_models()),
+                        help='Comma-separated class:workers[xthreads] specs')
+    args = parser.parse_args()
+
+    with temporary_app() as app:
+        with app.app_context():
+            bulk_insert_cases(args.rows)
+            case_ids = db.session.execute(
+                db.select(Case.id).where(Case.status != CaseStatus.CLOSED)
+            ).scalars().all()
+            db.session.remove()
+        config = {key: app.config[key] for key in ('SQLALCHEMY_DATABASE_URI', 'ARCHIVE_DATABASE_URI')}
+
+        print(f"{'model':<14}{'req/s':>8}{'p50 ms':>8}{'p95 ms':>8}{'p99 ms':>8}{'failed':>8}")
+        for spec in args.models.split(','):
+            run_model(config, case_ids, spec, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Benchmarks build the app on a throwaway SQLite database so they never
+touch charity.db. Run them from the project root, e.g.:
+    python -m benchmarks.bench_cases_export --rows 100000
+"""
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+from contextlib import contextmanager
+
+from app import create_app
+from app.config import Config
+from app.extensions import db
+from app.models.case import Case
+from app.models.user import User
+from app.utils.constants import UserRole, CaseType, CaseStatus
+
+
+DEFAULT_PASSWORDS = {
+    'owner': 'owner123',
+    'manager1': 'manager123',
+    'manager2': 'manager123',
+    'manager3': 'manager123',
+    'manager4': 'manager123',
+    'manager5': 'manager123',
+    'researcher1': 'researcher123',
+}
+
+BENEFICIARY_NAMES = ['محمد العلي', 'فاطمة الحسن', 'أحمد السالم', 'مريم الناصر', 'خالد الراشد']
+ADDRESSES = ['شارع الملك فهد، حي النزهة، جدة', 'حي الروضة، الرياض', 'شارع فلسطين، حي الجامعة، جدة']
+
+
+@contextmanager
+def temporary_app(**config_overrides):
+    """Create the app on a temporary SQLite file, removed afterwards"""
+    tmp_dir = tempfile.mkdtemp(prefix='charity-bench-')
+    overrides = {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}",
+        'ARCHIVE_DATABASE_URI': f"sqlite:///{os.path.join(tmp_dir, 'bench_archive.db')}",
+        # Keep per-request log lines out of the results
+        'LOG_LEVEL': 'WARNING',
+    }
+    overrides.update(config_overrides)
+    config_class = type('BenchmarkConfig', (Config,), overrides)
+
+    try:
+        yield create_app(config_class)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def login(client, username, password=None):
+    """Log in through the API and return authorization headers"""
+    response = client.post('/api/auth/login', json={
+        'username': username,
+        'password': password or DEFAULT_PASSWORDS[username]
+    })
+    token = response.get_json()['access_token']
+    return {'Authorization': f'Bearer {token}'}
+
+
+def bulk_insert_cases(count, batch_size=5000, seed=42):
+    """Insert count cases with Core executemany batches (call inside an app context)"""
+    rng = random.Random(seed)
+    owner = User.query.filter_by(role=UserRole.OWNER).first()
+    researcher = User.query.filter_by(role=UserRole.RESEARCHER).first()
+    statuses = list(CaseStatus)
+    base_date = datetime.utcnow() - timedelta(days=365)
+
+    inserted = 0
+    while inserted < count:
+        rows = []
+        for i in range(inserted, min(inserted + batch_size, count)):
+            case_type = rng.choice([CaseType.MEDICAL, CaseType.DONATION])
+            status = rng.choice(statuses)
+            created_at = base_date + timedelta(minutes=i)
+            rows.append({
+                'case_number': f"{'MED' if case_type == CaseType.MEDICAL else 'DON'}-BENCH-{i:07d}",
+                'case_type': case_type.name,
+                'status': status.name,
+                'beneficiary_name': rng.choice(BENEFICIARY_NAMES),
+                'beneficiary_phone': f'05{rng.randint(10000000, 99999999)}',
+                'beneficiary_id_number': str(rng.randint(1000000000, 2999999999)),
+                'beneficiary_address': rng.choice(ADDRESSES),
+                'amount_approved': rng.choice([1000.0, 2500.0, 5000.0]) if status == CaseStatus.CLOSED else None,
+                'created_by': owner.id,
+                'assigned_to': researcher.id if status not in (CaseStatus.NEW, CaseStatus.PENDING_DATA) else None,
+                'created_at': created_at,
+                'updated_at': created_at,
+            })
+        db.session.execute(Case.__table__.insert(), rows)
+        db.session.commit()
+        inserted += len(rows)
+
+    return inserted
+
+
+def remove_uploaded_files():
+    """Delete the upload files referenced by the benchmark database
+
+    Uploads are always stored under the project's uploads/ folder, so
+    benchmarks that go through upload endpoints clean up after themselves.
+    (Call inside an app context.)
+    """
+    from app.services.upload_gc_service import iter_referenced_names
+    from app.utils.helpers import UPLOAD_FOLDERS, get_full_path
+
+    for folder in UPLOAD_FOLDERS:
+        for name in list(iter_referenced_names(folder)):
+            try:
+                os.remove(get_full_path(f'uploads/{folder}/{name}'))
+            except FileNotFoundError:
+                pass
+
+
+def percentile(values, share):
+    """Nearest-rank percentile of a list of numbers, e.g. share=0.95"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(share * len(ordered))) - 1))
+    return ordered[index]
+
+
+class Timer:
+    """Context manager measuring wall time in seconds"""
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
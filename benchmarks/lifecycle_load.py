@@ -0,0 +1,298 @@
+"""
+End-to-end load test of the whole case lifecycle.
+
+Builds the app on a temporary SQLite database, seeds researchers (and
+background cases for the read traffic), gives every user an FCM token
+and stubs the FCM sender, so it runs offline while still exercising the
+push path. Then, concurrently:
+
+  workflow clients - each drives cases through create, assign,
+                     investigate with images, three approvals (retrying
+                     on 409), confirm ready and mark paid
+  read clients     - case lists, pending approvals, dashboard
+                     statistics, notifications and unread counts
+
+Reports throughput and p50/p95/p99 per endpoint, then checks:
+  - no request failed with a 5xx
+  - case numbers are unique and every workflow case got one
+  - every workflow case is closed and paid, with all required approvals
+    at the same amount
+  - finalization happened exactly once per case: one approval audit
+    entry per manager and one "approved" notification to finance
+  - every committed notification was pushed exactly once, and nothing
+    else was pushed
+
+Run with: python -m benchmarks.lifecycle_load --workflow-clients 4 --cases-per-client 10 --read-clients 4
+"""
+import argparse
+import io
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+
+from PIL import Image
+from werkzeug.security import generate_password_hash
+
+from app.extensions import db
+from app.models.audit_log import AuditLog
+from app.models.case import Case
+from app.models.finance_action import FinanceAction
+from app.models.manager_approval import ManagerApproval
+from app.models.notification import Notification
+from app.models.user import User
+from app.services import approval_service, fcm_service
+from app.utils.constants import UserRole, CaseType, CaseStatus, ApprovalDecision, FinanceStatus, AuditAction
+from benchmarks.common import temporary_app, login, bulk_insert_cases, remove_uploaded_files, percentile, Timer
+
+APPROVED_TITLE = 'حالة معتمدة تحتاج صرف'
+RESEARCHER_PASSWORD = 'researcher123'
+
+
+class Recorder:
+    """Latency and status per endpoint, shared by the client threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+
+    def call(self, label, send):
+        start = time.perf_counter()
+        response = send()
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.latencies[label].append(elapsed)
+            self.statuses[label][response.status_code] += 1
+        return response
+
+    def report(self, seconds):
+        print(f"{'endpoint':<42}{'count':>7}{'req/s':>8}{'p50 ms':>8}{'p95 ms':>8}{'p99 ms':>8}  statuses")
+        for label in sorted(self.latencies):
+            values = self.latencies[label]
+            statuses = ' '.join(f'{code}={n}' for code, n in sorted(self.statuses[label].items()))
+            print(f'{label:<42}{len(values):>7}{len(values) / seconds:>8.1f}{percentile(values, 0.5) * 1000:>8.1f}'
+                  f'{percentile(values, 0.95) * 1000:>8.1f}{percentile(values, 0.99) * 1000:>8.1f}  {statuses}')
+
+    def server_errors(self):
+        return {label: sum(n for code, n in statuses.items() if code >= 500)
+                for label, statuses in self.statuses.items()
+                if any(code >= 500 for code in statuses)}
+
+
+def png(color='white'):
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 48), color).save(buffer, 'PNG')
+    buffer.seek(0)
+    return buffer
+
+
+def stub_fcm(pushes, lock):
+    """Record pushes instead of calling Firebase"""
+    def send_push_notification(fcm_token, title, body, data=None, platform='android'):
+        with lock:
+            pushes.append(int(data['notification_id']))
+        return True
+
+    fcm_service.send_push_notification = send_push_notification
+
+
+def seed_users(researchers):
+    """Add researchers (sharing one password hash) and give everyone an FCM token"""
+    password_hash = generate_password_hash(RESEARCHER_PASSWORD, method='pbkdf2:sha256')
+    for i in range(researchers):
+        db.session.add(User(
+            username=f'load_researcher{i}', email=f'load_researcher{i}@charity.org',
+            full_name=f'Load Researcher {i}', phone=f'05{i:08d}',
+            role=UserRole.RESEARCHER, password_hash=password_hash
+        ))
+    db.session.flush()
+    for user in User.query.all():
+        user.fcm_token = f'token-{user.id}'
+    db.session.commit()
+
+
+def approve(recorder, client, headers, case_id, retries=5):
+    for _ in range(retries + 1):
+        response = recorder.call('POST /approvals/cases/<id>/approve', lambda: client.post(
+            f'/api/approvals/cases/{case_id}/approve', headers=headers, json={'amount': 750}))
+        if response.status_code != 409:
+            return response
+    return response
+
+
+def workflow_client(app, recorder, tokens, researcher, cases, seed, barrier, created):
+    client = app.test_client()
+    rng = random.Random(seed)
+    barrier.wait()
+
+    for _ in range(cases):
+        case_type = rng.choice([CaseType.DONATION, CaseType.MEDICAL])
+        creator = rng.choice(['owner', 'manager1', 'manager2'])
+        if creator == 'owner':
+            response = recorder.call('POST /cases', lambda: client.post(
+                '/api/cases', headers=tokens['owner'], content_type='multipart/form-data',
+                data={'case_type': case_type.value, 'name': 'مستفيد', 'screenshot': (png('gray'), 's.png')}))
+        else:
+            response = recorder.call('POST /cases', lambda: client.post(
+                '/api/cases', headers=tokens[creator], json={'case_type': case_type.value, 'name': 'مستفيد'}))
+        if response.status_code != 201:
+            continue
+        case = response.get_json()['case']
+        case_id = case['id']
+        created.append(case_id)
+
+        recorder.call('POST /cases/<id>/assign', lambda: client.post(
+            f'/api/cases/{case_id}/assign', headers=tokens['manager1'], json={'researcher_id': researcher['id']}))
+
+        recorder.call('POST /research/cases/<id>/investigation', lambda: client.post(
+            f'/api/research/cases/{case_id}/investigation', headers=researcher['headers'],
+            content_type='multipart/form-data',
+            data={'verified_name': 'مستفيد', 'opinion': 'يستحق', 'recommendation': 'deserves',
+                  'images_count': '2', 'image_0': (png('red'), 'a.png'), 'image_1': (png('blue'), 'b.png')}))
+
+        third = 'manager3' if case_type == CaseType.DONATION else 'manager4'
+        for manager in ['manager1', 'manager2', third]:
+            approve(recorder, client, tokens[manager], case_id)
+
+        recorder.call('POST /finance/cases/<id>/confirm-ready', lambda: client.post(
+            f'/api/finance/cases/{case_id}/confirm-ready', headers=tokens['manager5'], json={}))
+        recorder.call('POST /finance/cases/<id>/mark-paid', lambda: client.post(
+            f'/api/finance/cases/{case_id}/mark-paid', headers=tokens['manager5'], json={'notes': 'load'}))
+
+
+def read_client(app, recorder, tokens, seed, barrier, stop):
+    client = app.test_client()
+    rng = random.Random(seed)
+    requests = [
+        ('GET /cases', 'manager1', lambda: f'/api/cases?page={rng.randint(1, 20)}&per_page=20'),
+        ('GET /approvals/pending', 'manager2', lambda: '/api/approvals/pending'),
+        ('GET /dashboard/statistics', 'owner', lambda: '/api/dashboard/statistics'),
+        ('GET /notifications', 'manager1', lambda: '/api/notifications?per_page=20'),
+        ('GET /notifications/unread-count', 'manager5', lambda: '/api/notifications/unread-count'),
+    ]
+    barrier.wait()
+
+    while not stop.is_set():
+        label, user, path = rng.choice(requests)
+        recorder.call(label, lambda: client.get(path(), headers=tokens[user]))
+
+
+def check_invariants(case_ids, pushes):
+    problems = []
+
+    numbers = db.session.execute(db.select(Case.case_number)).scalars().all()
+    duplicates = [number for number, n in Counter(numbers).items() if n > 1]
+    if duplicates:
+        problems.append(f'duplicate case numbers: {duplicates[:5]}')
+
+    for case_id in case_ids:
+        case = db.session.get(Case, case_id)
+        label = case.case_number if case else f'case {case_id}'
+        if case is None or case.status != CaseStatus.CLOSED:
+            problems.append(f'{label}: not closed ({case.status.value if case else "missing"})')
+            continue
+
+        required = {role.value for role in approval_service.get_required_managers(case.case_type)}
+        approved = ManagerApproval.query.filter_by(case_id=case_id, decision=ApprovalDecision.APPROVED).all()
+        if {a.manager_role for a in approved} != required or {a.amount_suggested for a in approved} != {750}:
+            problems.append(f'{label}: closed without matching approvals')
+
+        finance = FinanceAction.query.filter_by(case_id=case_id).first()
+        if finance is None or finance.status != FinanceStatus.PAID:
+            problems.append(f'{label}: closed but not paid')
+
+        approvals_logged = AuditLog.query.filter_by(case_id=case_id, action=AuditAction.CASE_APPROVED).count()
+        if approvals_logged != len(required):
+            problems.append(f'{label}: {approvals_logged} approval audit entries, expected {len(required)}')
+
+        notices = Notification.query.filter_by(case_id=case_id, title=APPROVED_TITLE).count()
+        if notices != 1:
+            problems.append(f'{label}: finalized with {notices} approval notifications')
+
+    notification_ids = set(db.session.execute(db.select(Notification.id)).scalars())
+    pushed = Counter(pushes)
+    repeated = [nid for nid, n in pushed.items() if n > 1]
+    if repeated:
+        problems.append(f'{len(repeated)} notifications pushed more than once')
+    if set(pushed) - notification_ids:
+        problems.append(f'{len(set(pushed) - notification_ids)} pushes for notifications that were not committed')
+    if notification_ids - set(pushed):
+        problems.append(f'{len(notification_ids - set(pushed))} committed notifications never pushed')
+
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workflow-clients', type=int, default=4, help='Concurrent workflow clients')
+    parser.add_argument('--cases-per-client', type=int, default=10, help='Cases each workflow client drives')
+    parser.add_argument('--read-clients', type=int, default=4, help='Concurrent read-only clients')
+    parser.add_argument('--background-cases', type=int, default=2000, help='Seeded cases for the read traffic')
+    parser.add_argument('--seed', type=int, default=11)
+    args = parser.parse_args()
+
+    pushes = []
+    stub_fcm(pushes, threading.Lock())
+
+    with temporary_app() as app:
+        with app.app_context():
+            bulk_insert_cases(args.background_cases)
+            seed_users(args.workflow_clients)
+            researchers = [{'id': user.id, 'username': user.username}
+                           for user in User.query.filter(User.username.like('load_researcher%')).order_by(User.id)]
+            db.session.remove()
+
+        client = app.test_client()
+        tokens = {name: login(client, name) for name in
+                  ['owner', 'manager1', 'manager2', 'manager3', 'manager4', 'manager5']}
+        for researcher in researchers:
+            researcher['headers'] = login(client, researcher['username'], RESEARCHER_PASSWORD)
+
+        recorder = Recorder()
+        created = []
+        stop = threading.Event()
+        barrier = threading.Barrier(args.workflow_clients + args.read_clients)
+        workflows = [
+            threading.Thread(target=workflow_client, args=(
+                app, recorder, tokens, researchers[i], args.cases_per_client, args.seed + i, barrier, created))
+            for i in range(args.workflow_clients)
+        ]
+        readers = [
+            threading.Thread(target=read_client, args=(app, recorder, tokens, args.seed + 100 + i, barrier, stop))
+            for i in range(args.read_clients)
+        ]
+
+        with Timer() as timer:
+            for thread in workflows + readers:
+                thread.start()
+            for thread in workflows:
+                thread.join()
+            stop.set()
+            for thread in readers:
+                thread.join()
+
+        with app.app_context():
+            problems = check_invariants(created, pushes)
+            remove_uploaded_files()
+
+    recorder.report(timer.elapsed)
+    expected = args.workflow_clients * args.cases_per_client
+    print(f'\n{len(created)}/{expected} cases through the lifecycle in {timer.elapsed:.1f}s '
+          f'({len(created) / timer.elapsed:.2f} cases/s), {len(pushes)} pushes')
+
+    if len(created) != expected:
+        problems.append(f'{expected - len(created)} case creations failed')
+    for label, count in recorder.server_errors().items():
+        problems.append(f'{label}: {count} server errors')
+
+    if problems:
+        print('FAILED')
+        for problem in problems:
+            print(f'  {problem}')
+        raise SystemExit(1)
+    print('OK: all invariants hold')
+
+
+if __name__ == '__main__':
+    main()
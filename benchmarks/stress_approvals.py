@@ -0,0 +1,159 @@
+"""
+Concurrent stress test for case approvals.
+
+Seeds donation cases waiting for approval, then for each case releases
+the three required managers (and optionally a rejecting one) at the
+same instant through a barrier. A manager that gets 409 re-reads the
+case and retries, as the mobile app does.
+
+Checks afterwards, for every case:
+  - no request failed with anything but 200/400/403/409
+  - a case is finalized (pending_payment) exactly once: one "approved"
+    notification to the finance manager, all required approvals present
+    with the same amount
+  - a rejected case has no approvals left in the approved state
+
+Run with: python -m benchmarks.stress_approvals --cases 50
+"""
+import argparse
+import random
+import threading
+from collections import Counter
+
+from app.extensions import db
+from app.models.case import Case
+from app.models.manager_approval import ManagerApproval
+from app.models.notification import Notification
+from app.models.user import User
+from app.services import approval_service
+from app.utils.constants import UserRole, CaseType, CaseStatus, ApprovalDecision
+from benchmarks.common import temporary_app, login, Timer
+
+APPROVERS = ['manager1', 'manager2', 'manager3']
+APPROVED_TITLE = 'حالة معتمدة تحتاج صرف'
+
+
+def seed_pending_cases(count):
+    owner = User.query.filter_by(role=UserRole.OWNER).first()
+    case_ids = []
+    for i in range(count):
+        case = Case(
+            case_number=f'DON-STRESS-{i:05d}',
+            case_type=CaseType.DONATION,
+            status=CaseStatus.PENDING_APPROVAL,
+            created_by=owner.id
+        )
+        db.session.add(case)
+        db.session.flush()
+        approval_service.create_approval_records(case)
+        case_ids.append(case.id)
+    db.session.commit()
+    return case_ids
+
+
+def manager_worker(app, headers, case_id, action, barrier, results, max_retries):
+    client = app.test_client()
+    barrier.wait()
+
+    for attempt in range(max_retries + 1):
+        if action == 'reject':
+            response = client.post(f'/api/approvals/cases/{case_id}/reject', headers=headers,
+                                   json={'reason': 'stress'})
+        else:
+            response = client.post(f'/api/approvals/cases/{case_id}/approve', headers=headers,
+                                   json={'amount': 500})
+        results.append(response.status_code)
+        if response.status_code != 409:
+            return
+
+
+def check_invariants(case_ids, required_roles):
+    problems = []
+    finalized = rejected = 0
+
+    for case_id in case_ids:
+        case = db.session.get(Case, case_id)
+        approvals = ManagerApproval.query.filter_by(case_id=case_id).all()
+        approved = [a for a in approvals if a.decision == ApprovalDecision.APPROVED]
+        notices = Notification.query.filter_by(case_id=case_id, title=APPROVED_TITLE).count()
+
+        if case.status == CaseStatus.PENDING_PAYMENT:
+            finalized += 1
+            if notices != 1:
+                problems.append(f'{case.case_number}: finalized with {notices} approval notifications')
+            if {a.manager_role for a in approved} != required_roles or len({a.amount_suggested for a in approved}) != 1:
+                problems.append(f'{case.case_number}: finalized without matching approvals')
+            if case.amount_approved != 500:
+                problems.append(f'{case.case_number}: amount_approved={case.amount_approved}')
+        elif case.status == CaseStatus.REJECTED:
+            rejected += 1
+            if approved:
+                problems.append(f'{case.case_number}: rejected but {len(approved)} approval(s) still approved')
+            if notices:
+                problems.append(f'{case.case_number}: rejected but has an approval notification')
+        else:
+            if notices:
+                problems.append(f'{case.case_number}: {case.status.value} with an approval notification')
+
+    return finalized, rejected, problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cases', type=int, default=50, help='Cases approved concurrently, one after another')
+    parser.add_argument('--reject-share', type=float, default=0.2,
+                        help='Share of cases where manager 1 rejects instead of approving')
+    parser.add_argument('--retries', type=int, default=5, help='Retries after a 409')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    with temporary_app() as app:
+        with app.app_context():
+            case_ids = seed_pending_cases(args.cases)
+            required_roles = {role.value for role in approval_service.get_required_managers(CaseType.DONATION)}
+            db.session.remove()
+
+        client = app.test_client()
+        tokens = {name: login(client, name) for name in APPROVERS}
+        results = []
+
+        with Timer() as timer:
+            for case_id in case_ids:
+                reject = rng.random() < args.reject_share
+                barrier = threading.Barrier(len(APPROVERS))
+                threads = [
+                    threading.Thread(target=manager_worker, args=(
+                        app, tokens[name], case_id,
+                        'reject' if reject and name == 'manager1' else 'approve',
+                        barrier, results, args.retries
+                    ))
+                    for name in APPROVERS
+                ]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+
+        with app.app_context():
+            finalized, rejected, problems = check_invariants(case_ids, required_roles)
+
+        statuses = Counter(results)
+        print(f'{len(results)} requests in {timer.elapsed:.1f}s: '
+              + ', '.join(f'{code}={n}' for code, n in sorted(statuses.items())))
+        print(f'{finalized} finalized, {rejected} rejected, {args.cases - finalized - rejected} still pending')
+
+        unexpected = {code: n for code, n in statuses.items() if code not in (200, 400, 403, 409)}
+        if unexpected:
+            problems.append(f'unexpected status codes: {unexpected}')
+
+        if problems:
+            print('FAILED')
+            for problem in problems:
+                print(f'  {problem}')
+            raise SystemExit(1)
+        print('OK: every case finalized at most once, no lost or duplicate updates')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,433 @@
+"""
+Generate a large synthetic dataset for performance work
+Run with: python generate_data.py --cases 100000 --seed 1
+
+Cases are spread evenly over --days up to now and walk the whole
+lifecycle: the older a case, the more likely it is closed (or rejected),
+while recent ones sit in the open statuses. Every case gets the rows its
+status implies (report, approvals, finance action, images, audit logs
+and notifications), written with Core executemany in batches. Image rows
+point at placeholder PNGs under uploads/, hard links of one file unless
+--no-files is given.
+
+The same --seed, --until and other arguments give the same data. The
+target database (DATABASE_URL) must not contain cases yet.
+"""
+import argparse
+import hashlib
+import io
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+from PIL import Image
+from werkzeug.security import generate_password_hash
+
+from app import create_app
+from app.extensions import db
+from app.models.audit_log import AuditLog
+from app.models.case import Case
+from app.models.case_image import CaseImage
+from app.models.finance_action import FinanceAction
+from app.models.manager_approval import ManagerApproval
+from app.models.notification import Notification
+from app.models.researcher_report import ResearcherReport
+from app.models.user import User
+from app.utils.constants import (
+    UserRole, CaseType, CaseStatus, ApprovalDecision, Recommendation,
+    FinanceStatus, AuditAction, ImageType,
+    REQUIRED_MANAGERS_DONATION, REQUIRED_MANAGERS_MEDICAL
+)
+from app.utils.helpers import get_full_path
+from seed_data import ARABIC_FIRST_NAMES, ARABIC_LAST_NAMES, ADDRESSES, CITIES, OPINIONS, REJECTION_REASONS
+
+RESEARCHER_PASSWORD = 'researcher123'
+AMOUNTS = [1000, 2000, 3000, 5000, 7000, 10000, 15000, 20000]
+
+# Status weights by case age in days: (minimum age, weights)
+STATUS_WEIGHTS = [
+    (60, {CaseStatus.CLOSED: 85, CaseStatus.REJECTED: 9, CaseStatus.PENDING_PAYMENT: 2,
+          CaseStatus.PENDING_APPROVAL: 2, CaseStatus.INVESTIGATING: 1, CaseStatus.ASSIGNED: 1}),
+    (14, {CaseStatus.CLOSED: 50, CaseStatus.REJECTED: 8, CaseStatus.PENDING_PAYMENT: 10,
+          CaseStatus.APPROVED: 5, CaseStatus.PENDING_APPROVAL: 15, CaseStatus.INVESTIGATING: 7,
+          CaseStatus.ASSIGNED: 5}),
+    (0, {CaseStatus.NEW: 10, CaseStatus.PENDING_DATA: 10, CaseStatus.ASSIGNED: 20,
+         CaseStatus.INVESTIGATING: 20, CaseStatus.PENDING_APPROVAL: 20, CaseStatus.APPROVED: 5,
+         CaseStatus.PENDING_PAYMENT: 5, CaseStatus.CLOSED: 7, CaseStatus.REJECTED: 3}),
+]
+
+# Statuses past each lifecycle step
+ASSIGNED_STATUSES = {
+    CaseStatus.ASSIGNED, CaseStatus.INVESTIGATING, CaseStatus.PENDING_APPROVAL, CaseStatus.APPROVED,
+    CaseStatus.PENDING_PAYMENT, CaseStatus.CLOSED, CaseStatus.REJECTED
+}
+REPORTED_STATUSES = ASSIGNED_STATUSES - {CaseStatus.ASSIGNED, CaseStatus.INVESTIGATING}
+APPROVED_STATUSES = {CaseStatus.APPROVED, CaseStatus.PENDING_PAYMENT, CaseStatus.CLOSED}
+
+TABLES = [Case, ResearcherReport, ManagerApproval, FinanceAction, CaseImage, AuditLog, Notification]
+
+
+def placeholder_png():
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 48), (200, 200, 200)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class PlaceholderFiles:
+    """Writes one placeholder per folder and hard-links the rest to it"""
+
+    def __init__(self, content, enabled):
+        self.content = content
+        self.enabled = enabled
+        self.sha256 = hashlib.sha256(content).hexdigest()
+        self._first = {}
+
+    def add(self, path):
+        if not self.enabled:
+            return
+        full_path = get_full_path(path)
+        folder = os.path.dirname(full_path)
+        first = self._first.get(folder)
+        if first is not None:
+            try:
+                os.link(first, full_path)
+                return
+            except OSError:
+                pass
+        os.makedirs(folder, exist_ok=True)
+        with open(full_path, 'wb') as f:
+            f.write(self.content)
+        self._first.setdefault(folder, full_path)
+
+
+class Rows:
+    """Pending rows per table, inserted with executemany when the batch fills"""
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.pending = {model: [] for model in TABLES}
+        self.size = 0
+        self.totals = {model: 0 for model in TABLES}
+
+    def add(self, model, row):
+        self.pending[model].append(row)
+        self.size += 1
+
+    def flush_if_full(self):
+        if self.size >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        # Parents first, so foreign keys hold at every statement
+        for model in TABLES:
+            rows = self.pending[model]
+            if rows:
+                db.session.execute(model.__table__.insert(), rows)
+                self.totals[model] += len(rows)
+                self.pending[model] = []
+        db.session.commit()
+        self.size = 0
+
+
+class Generator:
+    def __init__(self, args, users, now):
+        self.rng = random.Random(args.seed)
+        self.args = args
+        self.users = users
+        self.now = now
+        self.start = now - timedelta(days=args.days)
+        self.rows = Rows(args.batch_size)
+        self.files = PlaceholderFiles(placeholder_png(), not args.no_files)
+        self.case_numbers = {}
+
+    # Helpers
+
+    def later(self, moment, min_hours=0.1, max_hours=48):
+        """A moment after `moment`, but not in the future"""
+        return min(moment + timedelta(hours=self.rng.uniform(min_hours, max_hours)), self.now)
+
+    def case_number(self, case_type, created_at):
+        prefix = 'MED' if case_type == CaseType.MEDICAL else 'DON'
+        key = (prefix, created_at.year)
+        self.case_numbers[key] = self.case_numbers.get(key, 0) + 1
+        return f'{prefix}-{created_at.year}-{self.case_numbers[key]:04d}'
+
+    def status_for(self, created_at):
+        age = (self.now - created_at).days
+        weights = next(weights for min_age, weights in STATUS_WEIGHTS if age >= min_age)
+        return self.rng.choices(list(weights), list(weights.values()))[0]
+
+    def audit(self, case, user, action, at, details):
+        self.rows.add(AuditLog, {
+            'case_id': case['id'], 'user_id': user.id, 'action': action, 'details': details,
+            'created_at': at, 'actor_name': user.full_name, 'actor_role': user.role.value,
+        })
+
+    def notify(self, case, user, title, message, at):
+        # Older notifications have been read
+        is_read = (self.now - at).days > 14 or self.rng.random() < 0.5
+        self.rows.add(Notification, {
+            'user_id': user.id, 'case_id': case['id'], 'case_number': case['case_number'],
+            'title': title, 'message': message, 'is_read': is_read, 'created_at': at,
+        })
+
+    def image(self, case, user, image_type, folder, at):
+        path = f'uploads/{folder}/{self.rng.getrandbits(128):032x}_{image_type.value}.png'
+        self.files.add(path)
+        self.rows.add(CaseImage, {
+            'case_id': case['id'], 'image_path': path, 'image_type': image_type, 'uploaded_by': user.id,
+            'file_size': len(self.files.content), 'mime_type': 'image/png', 'width': 64, 'height': 48,
+            'sha256': self.files.sha256, 'created_at': at,
+        })
+        self.audit(case, user, AuditAction.IMAGE_UPLOADED, at,
+                   {'uploaded_by': user.full_name, 'image_type': image_type.value})
+        return path
+
+    # The lifecycle
+
+    def case(self, case_id, created_at):
+        rng = self.rng
+        users = self.users
+        case_type = rng.choice([CaseType.MEDICAL, CaseType.DONATION])
+        status = self.status_for(created_at)
+        creator = users[rng.choice([UserRole.OWNER, UserRole.MANAGER_1, UserRole.MANAGER_2])]
+        with_data = status != CaseStatus.NEW
+        case = {
+            'id': case_id,
+            'case_number': self.case_number(case_type, created_at),
+            'case_type': case_type,
+            'status': status,
+            'initial_screenshot': None,
+            'beneficiary_name': f'{rng.choice(ARABIC_FIRST_NAMES)} {rng.choice(ARABIC_LAST_NAMES)}' if with_data else None,
+            'beneficiary_phone': f'05{rng.randint(10000000, 99999999)}' if with_data else None,
+            'beneficiary_id_number': str(rng.randint(1000000000, 2999999999)) if with_data else None,
+            'beneficiary_address': f'{rng.choice(ADDRESSES)}، {rng.choice(CITIES)}' if with_data else None,
+            'amount_approved': None,
+            'created_by': creator.id,
+            'assigned_to': None,
+            'created_at': created_at,
+        }
+        self.rows.add(Case, case)
+
+        self.audit(case, creator, AuditAction.CASE_CREATED, created_at, {
+            'case_number': case['case_number'], 'case_type': case_type.value, 'created_by': creator.full_name
+        })
+        for manager in (users[UserRole.MANAGER_1], users[UserRole.MANAGER_2]):
+            self.notify(case, manager, 'حالة جديدة', f"تم إنشاء حالة جديدة برقم {case['case_number']}", created_at)
+        if creator.role == UserRole.OWNER:
+            case['initial_screenshot'] = self.image(case, creator, ImageType.SCREENSHOT, 'screenshots', created_at)
+
+        at = created_at
+        for _ in range(rng.randint(0, 2) if with_data else 0):
+            at = self.later(at, max_hours=12)
+            self.audit(case, users[UserRole.MANAGER_1], AuditAction.CASE_UPDATED, at, {
+                'changes': {'beneficiary_phone': case['beneficiary_phone']},
+                'updated_by': users[UserRole.MANAGER_1].full_name
+            })
+
+        if status in ASSIGNED_STATUSES:
+            at, researcher = self.assign(case, at)
+        if status in REPORTED_STATUSES:
+            at = self.investigate(case, researcher, at)
+            at = self.approvals(case, at)
+        if status in {CaseStatus.PENDING_PAYMENT, CaseStatus.CLOSED}:
+            at = self.finance(case, at)
+
+        case['updated_at'] = at
+        self.rows.flush_if_full()
+
+    def assign(self, case, at):
+        manager = self.users[UserRole.MANAGER_1]
+        researcher = self.rng.choice(self.users['researchers'])
+        if self.rng.random() < 0.1:
+            first = self.rng.choice(self.users['researchers'])
+            at = self.later(at)
+            self.audit(case, manager, AuditAction.CASE_ASSIGNED, at,
+                       {'assigned_to': first.full_name, 'assigned_by': manager.full_name})
+            at = self.later(at)
+            self.audit(case, manager, AuditAction.CASE_REASSIGNED, at, {
+                'from_researcher': first.full_name, 'to_researcher': researcher.full_name,
+                'reassigned_by': manager.full_name
+            })
+        else:
+            at = self.later(at)
+            self.audit(case, manager, AuditAction.CASE_ASSIGNED, at,
+                       {'assigned_to': researcher.full_name, 'assigned_by': manager.full_name})
+        self.notify(case, researcher, 'حالة جديدة مُسندة إليك',
+                    f"تم إسناد الحالة رقم {case['case_number']} إليك للبحث", at)
+        case['assigned_to'] = researcher.id
+        return at, researcher
+
+    def investigate(self, case, researcher, at):
+        rng = self.rng
+        at = self.later(at, 2, 96)
+        images = rng.randint(2, 6)
+        for _ in range(images):
+            self.image(case, researcher, rng.choice([ImageType.INVESTIGATION, ImageType.PROOF_DOCUMENT,
+                                                     ImageType.MEDICAL_REPORT]), 'investigations', at)
+        recommendation = Recommendation.DESERVES if rng.random() < 0.85 else Recommendation.NOT_DESERVES
+        self.rows.add(ResearcherReport, {
+            'case_id': case['id'], 'researcher_id': researcher.id,
+            'verified_name': case['beneficiary_name'], 'verified_phone': case['beneficiary_phone'],
+            'verified_id_number': case['beneficiary_id_number'], 'verified_address': case['beneficiary_address'],
+            'opinion': rng.choice(OPINIONS), 'recommendation': recommendation, 'images_count': images,
+            'created_at': at, 'updated_at': at,
+        })
+        self.audit(case, researcher, AuditAction.INVESTIGATION_SUBMITTED, at,
+                   {'researcher': researcher.full_name, 'recommendation': recommendation.value})
+        message = f"تم تقديم تقرير البحث للحالة رقم {case['case_number']}"
+        for manager in (self.users[UserRole.MANAGER_1], self.users[UserRole.MANAGER_2]):
+            self.notify(case, manager, 'تم تقديم تقرير البحث', message, at)
+        third = self.users[UserRole.MANAGER_3 if case['case_type'] == CaseType.DONATION else UserRole.MANAGER_4]
+        self.notify(case, third, 'حالة تحتاج موافقتك', f"الحالة رقم {case['case_number']} تحتاج موافقتك", at)
+        return at
+
+    def approvals(self, case, at):
+        rng = self.rng
+        status = case['status']
+        roles = REQUIRED_MANAGERS_DONATION if case['case_type'] == CaseType.DONATION else REQUIRED_MANAGERS_MEDICAL
+        amount = rng.choice(AMOUNTS)
+        rejecting = rng.randrange(len(roles)) if status == CaseStatus.REJECTED else None
+
+        decided_at = at
+        for index, role in enumerate(roles):
+            manager = self.users[role]
+            if status in APPROVED_STATUSES or (rejecting is not None and index < rejecting):
+                decision = ApprovalDecision.APPROVED
+            elif index == rejecting:
+                decision = ApprovalDecision.REJECTED
+            elif status == CaseStatus.PENDING_APPROVAL and rng.random() < 0.5:
+                decision = ApprovalDecision.APPROVED
+            else:
+                decision = ApprovalDecision.PENDING
+
+            row = {
+                'case_id': case['id'], 'manager_id': None, 'manager_role': role.value, 'decision': decision,
+                'amount_suggested': None, 'rejection_reason': None, 'created_at': at, 'updated_at': at,
+            }
+            if decision != ApprovalDecision.PENDING:
+                decided_at = self.later(decided_at)
+                row.update(manager_id=manager.id, updated_at=decided_at)
+            if decision == ApprovalDecision.APPROVED:
+                row['amount_suggested'] = amount
+                self.audit(case, manager, AuditAction.CASE_APPROVED, decided_at,
+                           {'manager': manager.full_name, 'manager_role': role.value, 'amount': amount})
+            elif decision == ApprovalDecision.REJECTED:
+                reason = rng.choice(REJECTION_REASONS)
+                row['rejection_reason'] = reason
+                self.audit(case, manager, AuditAction.CASE_REJECTED, decided_at, {
+                    'manager': manager.full_name, 'manager_role': role.value, 'reason': reason, 'suggestion': None
+                })
+                for other in (self.users[UserRole.MANAGER_1], self.users[UserRole.MANAGER_2]):
+                    self.notify(case, other, 'تم رفض الحالة',
+                                f"تم رفض الحالة رقم {case['case_number']} وتحتاج مراجعة", decided_at)
+            self.rows.add(ManagerApproval, row)
+
+        if status in APPROVED_STATUSES:
+            case['amount_approved'] = amount
+            self.notify(case, self.users[UserRole.MANAGER_5], 'حالة معتمدة تحتاج صرف',
+                        f"الحالة رقم {case['case_number']} معتمدة وتحتاج صرف مبلغ {amount}", decided_at)
+        return decided_at
+
+    def finance(self, case, at):
+        manager = self.users[UserRole.MANAGER_5]
+        owner = self.users[UserRole.OWNER]
+        at = self.later(at)
+        row = {
+            'case_id': case['id'], 'finance_manager_id': manager.id, 'status': FinanceStatus.READY_TO_PAY,
+            'proof_image_path': None, 'notes': None, 'paid_at': None, 'created_at': at,
+        }
+        if case['status'] == CaseStatus.CLOSED:
+            at = self.later(at)
+            row.update(status=FinanceStatus.PAID, notes='تم صرف المبلغ بنجاح', paid_at=at,
+                       proof_image_path=self.image(case, manager, ImageType.PAYMENT_PROOF, 'payment_proofs', at))
+            amount = case['amount_approved']
+            self.audit(case, manager, AuditAction.PAYMENT_CONFIRMED, at,
+                       {'finance_manager': manager.full_name, 'amount': amount})
+            self.notify(case, owner, 'تم تأكيد الدفع',
+                        f"تم تأكيد صرف مبلغ {amount} للحالة رقم {case['case_number']}", at)
+            self.audit(case, manager, AuditAction.CASE_CLOSED, at,
+                       {'closed_by': manager.full_name, 'final_amount': amount})
+            message = f"تم إغلاق الحالة رقم {case['case_number']} بنجاح"
+            for user in (owner, self.users[UserRole.MANAGER_1], self.users[UserRole.MANAGER_2]):
+                self.notify(case, user, 'تم إغلاق الحالة', message, at)
+        self.rows.add(FinanceAction, row)
+        return at
+
+    def run(self):
+        span = (self.now - self.start) / self.args.cases
+        first_id = (db.session.execute(db.select(db.func.max(Case.id))).scalar() or 0) + 1
+        for i in range(self.args.cases):
+            created_at = self.start + span * i + timedelta(seconds=self.rng.uniform(0, span.total_seconds()))
+            self.case(first_id + i, min(created_at, self.now))
+        self.rows.flush()
+        return self.rows.totals
+
+
+def ensure_researchers(count, seed):
+    """Add synthetic researchers (sharing one password hash) up to `count`"""
+    existing = {username for (username,) in db.session.execute(
+        db.select(User.username).where(User.username.like('synthetic_researcher%')))}
+    password_hash = generate_password_hash(RESEARCHER_PASSWORD, method='pbkdf2:sha256')
+    rng = random.Random(seed)
+    rows = []
+    for i in range(1, count + 1):
+        name = f'{rng.choice(ARABIC_FIRST_NAMES)} {rng.choice(ARABIC_LAST_NAMES)}'
+        username = f'synthetic_researcher{i}'
+        if username not in existing:
+            rows.append({
+                'username': username, 'email': f'{username}@charity.org', 'password_hash': password_hash,
+                'full_name': name, 'phone': f'05{i:08d}', 'role': UserRole.RESEARCHER, 'is_active': True,
+            })
+    if rows:
+        db.session.execute(User.__table__.insert(), rows)
+        db.session.commit()
+    return User.query.filter_by(role=UserRole.RESEARCHER, is_active=True).order_by(User.id).all()
+
+
+def load_users(args):
+    users = {}
+    for role in UserRole:
+        if role != UserRole.RESEARCHER:
+            users[role] = User.query.filter_by(role=role, is_active=True).order_by(User.id).first()
+    missing = [role.value for role, user in users.items() if user is None]
+    if missing:
+        raise SystemExit(f"No active user for roles: {', '.join(missing)}. Run the app once to create them.")
+    users['researchers'] = ensure_researchers(args.researchers, args.seed)
+    return users
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cases', type=int, default=100000, help='Cases to generate')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed; the same seed gives the same data')
+    parser.add_argument('--days', type=int, default=730, help='Spread cases over this many days')
+    parser.add_argument('--until', type=datetime.fromisoformat, default=None,
+                        help='Last moment of the data (ISO 8601); defaults to now. Fix it to repeat a dataset exactly')
+    parser.add_argument('--researchers', type=int, default=20, help='Synthetic researchers to assign cases to')
+    parser.add_argument('--batch-size', type=int, default=20000, help='Rows per executemany transaction')
+    parser.add_argument('--no-files', action='store_true', help='Do not create placeholder image files')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        existing = db.session.execute(db.select(db.func.count()).select_from(Case)).scalar()
+        if existing:
+            raise SystemExit(f'Database already has {existing} cases. Generate into an empty database.')
+
+        users = load_users(args)
+        now = args.until or datetime.utcnow().replace(microsecond=0)
+
+        started = time.perf_counter()
+        totals = Generator(args, users, now).run()
+        elapsed = time.perf_counter() - started
+
+    total = sum(totals.values())
+    for model, count in totals.items():
+        print(f'{model.__tablename__:<20}{count:>12,}')
+    print(f"{'total':<20}{total:>12,}  in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main()
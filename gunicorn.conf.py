@@ -0,0 +1,102 @@
+"""
+Gunicorn settings for production: gunicorn -c gunicorn.conf.py run:app
+
+Every setting can be overridden from the environment. Worker models:
+  gthread (default) - processes with a thread pool each; requests mostly
+                      wait on SQLite and disk, so threads overlap them
+  sync              - one request per process at a time
+See benchmarks/bench_worker_models.py for how they compare.
+"""
+import glob
+import multiprocessing
+import os
+import tempfile
+from dotenv import load_dotenv
+
+load_dotenv()
+
+cpu_count = multiprocessing.cpu_count()
+
+# With METRICS_ENABLED, workers write Prometheus samples here and
+# /metrics adds them up. It must be set before the app (and
+# prometheus_client) is imported, and is emptied on start so counters
+# from a previous run do not linger.
+metrics_enabled = os.getenv('METRICS_ENABLED', 'false').lower() == 'true'
+if metrics_enabled:
+    metrics_dir = os.environ.setdefault(
+        'PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'charity-prometheus')
+    )
+    os.makedirs(metrics_dir, exist_ok=True)
+    for stale in glob.glob(os.path.join(metrics_dir, '*.db')):
+        os.remove(stale)
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', '8000')}")
+
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+if worker_class == 'sync':
+    # Processes are the only concurrency
+    workers = int(os.getenv('WEB_CONCURRENCY', cpu_count * 2 + 1))
+    threads = 1
+else:
+    # Fewer processes (SQLite has one writer at a time anyway), each
+    # overlapping requests on threads
+    workers = int(os.getenv('WEB_CONCURRENCY', cpu_count + 1))
+    threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+# Build the app once in the master, so schema checks run once and
+# workers share its memory copy-on-write
+preload_app = True
+
+# Recycle workers after a jittered number of requests, so a slow leak
+# cannot grow without bound and workers do not all restart together
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# The app logs every request (app.access, with request and user ids), so
+# gunicorn's own access log is off unless asked for
+accesslog = os.getenv('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def post_fork(server, worker):
+    """Drop the connections the master opened while preloading
+
+    Forked workers must not share SQLite file handles or database
+    sockets with the master or with each other.
+    """
+    from app.extensions import db
+    from app.utils.engine_profiles import dispose_engines
+    from run import app
+
+    dispose_engines(app, db)
+
+
+def post_request(worker, req, environ, resp):
+    """Recycle a worker over MEMORY_MAX_RSS_MB once its requests finish
+
+    The worker stops accepting connections and exits gracefully; the
+    master starts a fresh one from the preloaded app.
+    """
+    from app.middleware.memory import over_budget, rss_bytes
+    from run import app
+
+    if worker.alive and over_budget(app):
+        worker.log.warning('Worker %s over memory budget (%d MB RSS), recycling',
+                           worker.pid, rss_bytes() // (1024 * 1024))
+        worker.alive = False
+
+
+def child_exit(server, worker):
+    """Drop a dead worker's live gauges (e.g. its push outbox)"""
+    if not metrics_enabled:
+        return
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
@@ -25,4 +25,4 @@ if __name__ == '__main__':
     print(f"Local:   http://127.0.0.1:5000")
     print(f"Network: http://{local_ip}:5000")
     print(f"{'='*50}\n")
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    app.run(debug=os.getenv('FLASK_DEBUG', '').lower() in ('1', 'true'), host='0.0.0.0', port=5000)
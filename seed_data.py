@@ -248,10 +248,10 @@ def seed_database():
             # Case created log
             log = AuditLog(
                 case_id=case.id,
-                user_id=owner.id,
                 action=AuditAction.CASE_CREATED,
                 created_at=case.created_at
             )
+            log.set_actor(owner)
             log.set_details({"message": f"تم إنشاء الحالة {case.case_number}"})
             db.session.add(log)
             logs_created += 1
@@ -259,10 +259,10 @@ def seed_database():
             if status not in [CaseStatus.NEW, CaseStatus.PENDING_DATA]:
                 log = AuditLog(
                     case_id=case.id,
-                    user_id=manager1.id,
                     action=AuditAction.CASE_ASSIGNED,
                     created_at=case.created_at + timedelta(days=1)
                 )
+                log.set_actor(manager1)
                 log.set_details({"message": "تم تعيين الباحث للحالة", "researcher_id": researcher.id})
                 db.session.add(log)
                 logs_created += 1
@@ -270,10 +270,10 @@ def seed_database():
             if status in [CaseStatus.PENDING_APPROVAL, CaseStatus.APPROVED, CaseStatus.PENDING_PAYMENT, CaseStatus.CLOSED]:
                 log = AuditLog(
                     case_id=case.id,
-                    user_id=researcher.id,
                     action=AuditAction.INVESTIGATION_SUBMITTED,
                     created_at=case.created_at + timedelta(days=3)
                 )
+                log.set_actor(researcher)
                 log.set_details({"message": "تم تقديم تقرير البحث"})
                 db.session.add(log)
                 logs_created += 1
@@ -281,10 +281,10 @@ def seed_database():
             if status == CaseStatus.CLOSED:
                 log = AuditLog(
                     case_id=case.id,
-                    user_id=manager5.id,
                     action=AuditAction.PAYMENT_CONFIRMED,
                     created_at=case.updated_at
                 )
+                log.set_actor(manager5)
                 log.set_details({"message": "تم تأكيد الدفع", "amount": case.amount_approved})
                 db.session.add(log)
                 logs_created += 1